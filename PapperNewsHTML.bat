@@ -5,8 +5,12 @@ echo ====================================================================
 echo PAPER NEWS HTML - Procesamiento automatizado para Windows
 echo ====================================================================
 
+REM Metricas por etapa de esta corrida (reporte JSON y OUT\metricas.prom para Prometheus)
+set METRICS=OUT\metricas.json
+del %METRICS% 2>nul
+
 echo [1/4] Extrayendo papers de arXiv...
-start "Extraccion Papers" /wait cmd /c "tagui AutoPapper.tag IN\xpaths.csv -t"
+python descargar_papers.py IN\xpaths.csv OUT\AutoPapper.csv --metrics %METRICS%
 if %errorlevel% neq 0 (
     echo ❌ ERROR: Falló la extracción de papers
     pause
@@ -14,7 +18,7 @@ if %errorlevel% neq 0 (
 )
 
 echo [2/4] Generando prompts para IA...
-python generar_prompts.py OUT\AutoPapper.csv OUT\Prompts.csv
+python generar_prompts.py OUT\AutoPapper.csv OUT\Prompts.csv --cache OUT\cache_resumenes.db --metrics %METRICS%
 if %errorlevel% neq 0 (
     echo ❌ ERROR: Falló la generación de prompts
     pause
@@ -22,15 +26,24 @@ if %errorlevel% neq 0 (
 )
 
 echo [3/4] Procesando con IA y generando CSV...
-start "Procesamiento IA y CSV" /wait cmd /c "tagui AICSV.tag -t"
+python procesar_prompts.py OUT\Prompts.csv OUT\ProcessedPapers.csv --metrics %METRICS%
 if %errorlevel% neq 0 (
     echo ❌ ERROR: Falló el procesamiento con IA
     pause
     exit /b 1
 )
 
+echo Combinando resúmenes nuevos con el cache...
+python cache_resumenes.py --cache OUT\cache_resumenes.db merge OUT\AutoPapper.csv OUT\ProcessedPapers.csv --metrics %METRICS%
+if %errorlevel% neq 0 (
+    echo ❌ ERROR: Falló la combinación con el cache
+    pause
+    exit /b 1
+)
+python cache_resumenes.py --cache OUT\cache_resumenes.db evict --max-age-days 30
+
 echo [4/4] Creando portal HTML...
-python generar_portal.py OUT\ProcessedPapers.csv portal_noticias.html
+python generar_portal.py OUT\ProcessedPapers.csv portal_noticias.html --archive-dir OUT\archivo --metrics %METRICS%
 if %errorlevel% neq 0 (
     echo ❌ ERROR: Falló la generación del portal
     pause
@@ -38,7 +51,7 @@ if %errorlevel% neq 0 (
 )
 
 echo Limpiando archivos temporales...
-del OUT\Prompts.csv OUT\AutoPapper.csv OUT\ProcessedPapers.csv 2>nul
+del OUT\Prompts.csv OUT\AutoPapper.csv OUT\ProcessedPapers.csv OUT\ProcessedPapers.csv.progreso 2>nul
 
 echo ====================================================================
 echo ✅ PROCESAMIENTO COMPLETADO
@@ -1,16 +1,27 @@
 #!/bin/bash
 
-# Getting the new papers from arXiv, first argument are the categories to search 
-OPENSSL_CONF="" tagui AutoPapper.tag IN/xpaths.csv -t
+# Per-stage metrics of this run (JSON report plus OUT/metricas.prom for Prometheus)
+METRICS=OUT/metricas.json
+rm -f "$METRICS"
 
-# Generating the prompts for AI processing
-python generar_prompts.py OUT/AutoPapper.csv OUT/Prompts.csv
+# Getting the new papers from arXiv listings, first argument are the categories to search
+python descargar_papers.py IN/xpaths.csv OUT/AutoPapper.csv --metrics "$METRICS"
 
-# Processing the prompts with AI to get summaries and titles
-OPENSSL_CONF="" tagui AICSV.tag -t
+# Generating the prompts for AI processing (papers already summarized are taken from the cache)
+python generar_prompts.py OUT/AutoPapper.csv OUT/Prompts.csv --cache OUT/cache_resumenes.db --metrics "$METRICS"
 
-# Creating a news portal HTML file with the processed papers
-python generar_portal.py OUT/ProcessedPapers.csv OUT/portal_noticias.html
+# Processing the prompts with the AI API to get summaries and titles (skipped if everything was cached)
+# Requires LLM_API_KEY (or DEEPSEEK_API_KEY); the browser-based AICSV.tag is still available
+if [ "$(wc -l < OUT/Prompts.csv)" -gt 1 ]; then
+    python procesar_prompts.py OUT/Prompts.csv OUT/ProcessedPapers.csv --metrics "$METRICS"
+fi
 
-# Cleaning up intermediate files
-rm OUT/Prompts.csv OUT/AutoPapper.csv OUT/ProcessedPapers.csv
\ No newline at end of file
+# Storing the fresh summaries in the cache and adding the cached ones
+python cache_resumenes.py --cache OUT/cache_resumenes.db merge OUT/AutoPapper.csv OUT/ProcessedPapers.csv --metrics "$METRICS"
+python cache_resumenes.py --cache OUT/cache_resumenes.db evict --max-age-days 30
+
+# Creating a news portal HTML file with the processed papers (and adding today to the archive)
+python generar_portal.py OUT/ProcessedPapers.csv OUT/portal_noticias.html --archive-dir OUT/archivo --metrics "$METRICS"
+
+# Cleaning up intermediate files (the summary cache is kept)
+rm -f OUT/Prompts.csv OUT/AutoPapper.csv OUT/ProcessedPapers.csv OUT/ProcessedPapers.csv.progreso
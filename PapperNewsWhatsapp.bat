@@ -5,33 +5,60 @@ echo ====================================================================
 echo PAPER NEWS WHATSAPP - Procesamiento automatizado para Windows
 echo ====================================================================
 
-echo [1/3] Extrayendo papers de arXiv...
-start "Extraccion Papers" /wait cmd /c "tagui AutoPapper.tag IN\xpaths.csv -t"
+REM Metricas por etapa de esta corrida (reporte JSON y OUT\metricas.prom para Prometheus)
+set METRICS=OUT\metricas.json
+del %METRICS% 2>nul
+
+echo [1/4] Extrayendo papers de arXiv...
+python descargar_papers.py IN\xpaths.csv OUT\AutoPapper.csv --metrics %METRICS%
 if %errorlevel% neq 0 (
     echo ❌ ERROR: Falló la extracción de papers de arXiv
     pause
     exit /b 1
 )
 
-echo [2/3] Generando prompts para IA...
-python generar_prompts.py OUT\AutoPapper.csv OUT\Prompts.csv
+echo [2/4] Generando prompts para IA...
+python generar_prompts.py OUT\AutoPapper.csv OUT\Prompts.csv --cache OUT\cache_resumenes.db --metrics %METRICS%
 if %errorlevel% neq 0 (
     echo ❌ ERROR: Falló la generación de prompts
     pause
     exit /b 1
 )
 
-echo [3/3] Procesando con IA y enviando a WhatsApp...
+echo [3/4] Procesando con IA...
+python procesar_prompts.py OUT\Prompts.csv OUT\ProcessedPapers.csv --metrics %METRICS%
+if %errorlevel% neq 0 (
+    echo ❌ ERROR: Falló el procesamiento con IA
+    pause
+    exit /b 1
+)
+
+echo Combinando resúmenes nuevos con el cache...
+python cache_resumenes.py --cache OUT\cache_resumenes.db merge OUT\AutoPapper.csv OUT\ProcessedPapers.csv --metrics %METRICS%
+if %errorlevel% neq 0 (
+    echo ❌ ERROR: Falló la combinación con el cache
+    pause
+    exit /b 1
+)
+python cache_resumenes.py --cache OUT\cache_resumenes.db evict --max-age-days 30
+
+echo [4/4] Generando mensajes y enviando a WhatsApp...
+python generar_whatsapp.py OUT\ProcessedPapers.csv OUT\WhatsappMensajes.json --metrics %METRICS%
+if %errorlevel% neq 0 (
+    echo ❌ ERROR: Falló la generación de mensajes
+    pause
+    exit /b 1
+)
 echo ⚠️  NOTA: Asegúrate de tener WhatsApp Web abierto y logueado en el perfil de TagUI
-start "Procesamiento IA y WhatsApp" /wait cmd /c "tagui AIOverview.tag -t"
+start "Envio a WhatsApp" /wait cmd /c "tagui EnviarWhatsapp.tag -t"
 if %errorlevel% neq 0 (
-    echo ❌ ERROR: Falló el procesamiento y envío a WhatsApp
+    echo ❌ ERROR: Falló el envío a WhatsApp
     pause
     exit /b 1
 )
 
 echo Limpiando archivos temporales...
-del OUT\Prompts.csv OUT\AutoPapper.csv 2>nul
+del OUT\Prompts.csv OUT\AutoPapper.csv OUT\ProcessedPapers.csv OUT\ProcessedPapers.csv.progreso OUT\WhatsappMensajes.json 2>nul
 
 echo ====================================================================
 echo ✅ PROCESAMIENTO Y ENVÍO COMPLETADO
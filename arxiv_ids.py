@@ -0,0 +1,91 @@
+"""
+arxiv_ids.py
+
+Canonical arXiv identifiers shared by every stage. Any link or text that mentions a
+paper (abs/2410.01234, pdf/2410.01234v2.pdf, arXiv:2410.01234, a link the LLM echoed
+back with an emoji prefix, a doubled protocol or a stray space) is parsed once into
+an (id, version) pair, so the ID can be used as a join key across stages.
+Numbers that only look like IDs (a DOI such as 10.1145/1234.56789) are not taken
+for one: an ID needs arXiv context or has to be the whole text.
+Parsing is memoized, since the same links go through several stages.
+
+Usage:
+    ref = parse('🔗 https://arxiv.org/pdf/2410.01234v2')
+    ref.id, ref.version          # ('2410.01234', 2)
+    ref.url('abs')               # 'https://arxiv.org/abs/2410.01234v2'
+    canonical_arxiv_id(link)     # '2410.01234' or ''
+
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+ARXIV_BASE_URL = 'https://arxiv.org'
+
+# Archives of the old-style IDs (before April 2007)
+OLD_ARCHIVES = (
+    'acc-phys', 'adap-org', 'alg-geom', 'ao-sci', 'astro-ph', 'atom-ph', 'bayes-an', 'chao-dyn',
+    'chem-ph', 'cmp-lg', 'comp-gas', 'cond-mat', 'cs', 'dg-ga', 'funct-an', 'gr-qc', 'hep-ex',
+    'hep-lat', 'hep-ph', 'hep-th', 'math', 'math-ph', 'mtrl-th', 'nlin', 'nucl-ex', 'nucl-th',
+    'patt-sol', 'physics', 'plasm-ph', 'q-alg', 'q-bio', 'quant-ph', 'solv-int', 'supr-con',
+)
+
+# Month part (YYMM) of both ID styles
+_YYMM = r'\d{2}(?:0[1-9]|1[0-2])'
+# New-style IDs (2410.01234, since 2007) and old-style ones (hep-th/9901001, math.GT/0309136)
+_ID = (r'(?:(' + _YYMM + r'\.\d{4,5})'
+       r'|((?:' + '|'.join(re.escape(a) for a in sorted(OLD_ARCHIVES, key=len, reverse=True)) + r')'
+       r'(?:\.[A-Z]{2})?/' + _YYMM + r'\d{3}))'
+       r'(?:v(\d+))?(?!\d)')
+# An ID is only taken from arXiv context: an arxiv.org link, an /abs/ or /pdf/ path,
+# an arXiv: prefix or a text that is nothing but the ID. A bare 1234.56789 is as
+# likely to be part of a DOI (10.1145/1234.56789) or a version number.
+_ID_RE = re.compile(r'(?:(?i:arxiv\.org/[a-z]+/|/(?:abs|pdf)/|arxiv:)\s*)' + _ID)
+_BARE_ID_RE = re.compile(r'\s*' + _ID + r'\s*')
+# Whitespace and control characters the LLM sometimes leaves inside a link
+_NOISE_RE = re.compile(r'[\s\x00-\x1f\x7f-\x9f]+')
+
+class ArxivId(namedtuple('ArxivId', 'id version')):
+    """A parsed arXiv identifier; version is an int or None."""
+
+    __slots__ = ()
+
+    def __str__(self):
+        return self.id if self.version is None else f"{self.id}v{self.version}"
+
+    def url(self, kind='abs'):
+        """Canonical https://arxiv.org/<kind>/<id>[v<version>] link."""
+        return f"{ARXIV_BASE_URL}/{kind}/{self}"
+
+@lru_cache(maxsize=1 << 16)
+def parse(text):
+    """
+    Return the ArxivId a link or text refers to, or None if it mentions none, or
+    mentions several different papers.
+    """
+    if not text:
+        return None
+    bare = _BARE_ID_RE.fullmatch(text)
+    if bare:
+        return _from_match(bare)
+    # Only glue the pieces back together when the text has no intact ID
+    refs = [_from_match(m) for m in _ID_RE.finditer(text)] or \
+           [_from_match(m) for m in _ID_RE.finditer(_NOISE_RE.sub('', text))]
+    # The same paper may be linked twice (abs + pdf); two different ones are ambiguous
+    if not refs or any(ref.id != refs[0].id for ref in refs):
+        return None
+    return refs[0]
+
+def _from_match(match):
+    version = match.group(3)
+    return ArxivId(match.group(1) or match.group(2), int(version) if version else None)
+
+def canonical_arxiv_id(text):
+    """Return the version-less arXiv ID found in a URL or text, or '' if none."""
+    parsed = parse(text)
+    return parsed.id if parsed else ''
+
+def link_kind(text):
+    """'pdf' when a link points to the PDF, 'abs' otherwise."""
+    return 'pdf' if text and '/pdf' in text else 'abs'
@@ -0,0 +1,8 @@
+"""
+Benchmarks for the Python stages. Run them from the repository root, e.g.:
+
+    python -m benchmarks.run --sizes 1000,10000,100000 --output OUT/bench.json
+    python -m benchmarks.run --baseline OUT/bench_base.json
+
+corpus.py generates the seeded synthetic inputs shared by every benchmark.
+"""
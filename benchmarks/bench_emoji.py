@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+bench_emoji.py
+
+Compares the grapheme-aware emoji extraction (emojis.py) with the previous
+character-class regex on synthetic titles, both in speed and in how many leading
+emoji each recognizes whole, and shows the category emoji each approach yields.
+
+Usage:
+    python -m benchmarks.bench_emoji
+    python -m benchmarks.bench_emoji --size 200000 --seed 7
+
+"""
+
+import argparse
+import random
+import re
+from collections import Counter
+
+from benchmarks.corpus import make_emoji_title, timed
+from emojis import DEFAULT_EMOJI, split_leading_emoji
+
+_LEGACY_EMOJI_RE = re.compile(r'^([🔬🤖💻🔒🧬🏥📊🔍🎯🌊📐💼🧠🤝💡🔧🚇📶🔬🆔🧮🎨🎵🎮🎪🎭🎨🎯🎲🎪🎭🏆🏅🏏🏀⚽🏈🎾🏸🏓🏑🏒🥅⛳🏹🎣🥊🥋🏔️⛰️🏕️🏜️🏝️🏟️🏛️🏗️🏘️🏚️🏠🏡🏢🏣🏤🏥🏦🏧🏨🏩🏪🏫🏬🏭🏮🏯🏰🗼🗽⛪🕌🕍🕎🔬🔭🔬🧪🧬⚗️🔬🧮🧲⚡🔋🔌💻⌨️🖥️🖨️🖱️💿💾💽📀🧮💾🔌⚡🔋🔬🧪🧬⚗️🔬🧮🧲⚡🔋])\s*(.*)$')
+
+def legacy_extract_emoji_from_title(title):
+    """The previous regex-based extract_emoji_from_title."""
+    if not title:
+        return "", title
+    match = _LEGACY_EMOJI_RE.match(title)
+    if match:
+        return match.group(1), match.group(2).strip()
+    return DEFAULT_EMOJI, title
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la extracción de emojis de títulos")
+    parser.add_argument('--size', type=int, default=200000, help='Cantidad de títulos sintéticos (default 200000).')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla del generador (default 42).')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    titles = [make_emoji_title(rng) for _ in range(args.size)]
+    print(f"Corpus: {args.size} títulos")
+
+    legacy = timed(lambda: [legacy_extract_emoji_from_title(t) for t in titles])
+    grapheme = timed(lambda: [split_leading_emoji(t) for t in titles])
+    print(f"legacy regex          : {legacy:8.3f} s")
+    print(f"split_leading_emoji   : {grapheme:8.3f} s  ({legacy / grapheme:.2f}x)")
+
+    # A leading emoji counts as recognized when the remaining title starts with a letter
+    for name, fn in (("legacy regex", legacy_extract_emoji_from_title), ("split_leading_emoji", split_leading_emoji)):
+        results = [fn(t) for t in titles]
+        whole = sum(1 for emoji, rest in results if emoji != DEFAULT_EMOJI and rest[:1].isalpha())
+        broken = sum(1 for emoji, rest in results if rest[:1] and not rest[:1].isalnum())
+        top = Counter(emoji for emoji, _ in results).most_common(1)[0]
+        print(f"{name:<22}: {whole} emojis completos, {broken} títulos con restos de emoji, más común {top[0]} ({top[1]})")
+
+    # The old get_category_emoji re-extracted from titles that were already stripped
+    stripped = [legacy_extract_emoji_from_title(t)[1] for t in titles]
+    old_category = Counter(legacy_extract_emoji_from_title(t)[0] for t in stripped).most_common(1)[0][0]
+    new_category = Counter(e for e, _ in (split_leading_emoji(t) for t in titles) if e != DEFAULT_EMOJI).most_common(1)[0][0]
+    print(f"emoji de categoría: antes {old_category}, ahora {new_category}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+bench_memoria_portal.py
+
+Measures the memory taken by the papers loaded by generar_portal.py: the slotted
+Paper records with shared category tuples against the previous per-row dicts,
+on a large synthetic ProcessedPapers.csv.
+
+Usage:
+    python -m benchmarks.bench_memoria_portal
+    python -m benchmarks.bench_memoria_portal --size 500000
+
+"""
+
+import argparse
+import contextlib
+import csv
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+import arxiv_ids
+from benchmarks import corpus
+from generar_portal import clean_text, clean_url, extract_emoji_from_title, process_csv_robust
+
+def legacy_process_csv(path):
+    """The previous loader shape: one dict and one category list per row."""
+    papers = []
+    with open(path, encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for title, category, summary, points, link, date in reader:
+            if title.lower() == 'titulo':
+                continue
+            emoji, clean_title = extract_emoji_from_title(title)
+            paper_categories = []
+            for part in category.split(';'):
+                part = part.strip()
+                if part.startswith("📂"):
+                    part = part[1:].strip()
+                if part and part not in paper_categories:
+                    paper_categories.append(part)
+            papers.append({
+                'title': clean_text(clean_title),
+                'emoji': emoji,
+                'summary': clean_text(summary),
+                'points': clean_text(points),
+                'link': clean_url(link.strip()),
+                'arxiv_id': arxiv_ids.canonical_arxiv_id(link),
+                'date': date.strip(),
+                'category': paper_categories[0],
+                'categories': paper_categories,
+            })
+    return papers
+
+def _load_quietly(load, path):
+    clean_url.cache_clear()
+    arxiv_ids.parse.cache_clear()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return load(path)
+
+def measure(load, path):
+    """(seconds, MiB still allocated while the loaded papers are alive, paper count)."""
+    # Timed without tracing (tracemalloc slows allocation-heavy code unevenly)
+    gc.collect()
+    start = time.perf_counter()
+    count = len(_load_quietly(load, path))
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    papers = _load_quietly(load, path)
+    # Drop the URL caches so only the papers themselves are counted
+    clean_url.cache_clear()
+    arxiv_ids.parse.cache_clear()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del papers
+    return seconds, current / 2**20, count
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memoria de los papers cargados por generar_portal.py")
+    parser.add_argument('--size', type=int, default=200000, help='Filas del ProcessedPapers.csv sintético (default 200000).')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla del generador (default 42).')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'ProcessedPapers.csv')
+        corpus.write_processed_csv(path, args.size, seed=args.seed)
+        print(f"Corpus: {args.size} filas, {os.path.getsize(path) / 2**20:.1f} MiB de CSV")
+
+        legacy = measure(legacy_process_csv, path)
+        slotted = measure(process_csv_robust, path)
+
+    print(f"dicts por fila (anterior) : {legacy[1]:8.1f} MiB  {legacy[0]:6.2f} s  ({legacy[2]} papers)")
+    print(f"Paper con __slots__       : {slotted[1]:8.1f} MiB  {slotted[0]:6.2f} s  ({slotted[2]} papers)")
+    print(f"Reducción: {1 - slotted[1] / legacy[1]:.1%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+bench_normalizacion.py
+
+Compares the single-pass normalizer in generar_prompts.py against the previous
+multi-pass `clean_text_one_line` implementation on a synthetic abstract corpus.
+
+Usage:
+    python -m benchmarks.bench_normalizacion
+    python -m benchmarks.bench_normalizacion --size 100000 --seed 7
+
+"""
+
+import argparse
+import html
+import random
+import re
+
+from benchmarks.corpus import CATEGORIES, make_abstract, timed
+from generar_prompts import clean_column, clean_text_one_line
+
+def legacy_clean_text_one_line(text):
+    """The seven-pass implementation replaced by the single-pass normalizer."""
+    if text is None:
+        return ""
+    text = html.unescape(text)
+    text = re.sub(r'\\texttt\{([^}]*)\}', r'\1', text)
+    text = re.sub(r'\\textbf\{([^}]*)\}', r'\1', text)
+    text = re.sub(r'\\textit\{([^}]*)\}', r'\1', text)
+    text = re.sub(r'\\text\{([^}]*)\}', r'\1', text)
+    text = re.sub(r'\\[a-zA-Z]+\{([^}]*)\}', r'\1', text)
+    text = re.sub(r'[\r\n]+', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del normalizador de texto de generar_prompts.py")
+    parser.add_argument('--size', type=int, default=100000, help='Cantidad de abstracts sintéticos (default 100000).')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla del generador (default 42).')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [make_abstract(rng) for _ in range(args.size)]
+    total_mb = sum(len(t) for t in corpus) / 1e6
+    print(f"Corpus: {args.size} abstracts, {total_mb:.1f} M caracteres")
+
+    legacy = timed(lambda: [legacy_clean_text_one_line(t) for t in corpus])
+    single = timed(lambda: [clean_text_one_line(t) for t in corpus])
+
+    print(f"legacy clean_text_one_line : {legacy:8.3f} s")
+    print(f"clean_text_one_line        : {single:8.3f} s  ({legacy / single:.2f}x)")
+
+    # Category-like column: few distinct values repeated across every row
+    categories = [rng.choice(CATEGORIES) for _ in range(args.size)]
+    legacy = timed(lambda: [legacy_clean_text_one_line(c) for c in categories])
+    column = timed(lambda: clean_column(categories))
+    print(f"legacy (category column)   : {legacy:8.3f} s")
+    print(f"clean_column (batch)       : {column:8.3f} s  ({legacy / column:.2f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+bench_paralelo.py
+
+Measures the speedup of generar_prompts.py --workers on the synthetic corpus:
+fixed batches and token-budget packing are built serially and on process pools
+of increasing size, checking that every run produces exactly the serial prompts.
+Timings include starting the pool and sending the rows to the workers.
+
+Usage:
+    python -m benchmarks.bench_paralelo
+    python -m benchmarks.bench_paralelo --size 100000 --workers 1,2,4,8
+
+"""
+
+import argparse
+import os
+
+from benchmarks import corpus
+from generar_prompts import iter_packed_prompts, iter_prompts
+
+def main():
+    cores = os.cpu_count() or 1
+    default_workers = ','.join(str(n) for n in (1, 2, 4, 8) if n == 1 or n <= cores)
+    parser = argparse.ArgumentParser(description="Benchmark del armado de prompts en paralelo (--workers)")
+    parser.add_argument('--size', type=int, default=50000, help='Cantidad de papers sintéticos (default 50000).')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla del generador (default 42).')
+    parser.add_argument('--workers', default=default_workers,
+                        help=f'Cantidades de procesos a medir, separadas por comas (default {default_workers}).')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por medición; se toma la mejor (default 3).')
+    args = parser.parse_args()
+
+    rows = [dict(zip(corpus.AUTOPAPPER_HEADER, row))
+            for row in corpus.iter_autopapper_rows(args.size, seed=args.seed, header_every=0)]
+    counts = sorted({int(n) for n in args.workers.split(',') if n.strip()})
+    print(f"Corpus: {len(rows)} papers, {cores} núcleos disponibles")
+
+    modes = (
+        ("lotes de 10", lambda w: list(iter_prompts(rows, 10, workers=w))),
+        ("empaquetado por tokens", lambda w: list(iter_packed_prompts(rows, 12000, 8000, 400, workers=w))),
+    )
+    for name, build in modes:
+        expected = build(1)
+        print(f"\n{name} ({len(expected)} prompts)")
+        print(f"{'Procesos':>8} {'Segundos':>9} {'Speedup':>8}")
+        serial = None
+        for workers in counts:
+            seconds = min(corpus.timed(lambda: build(workers)) for _ in range(args.repeat))
+            if build(workers) != expected:
+                raise SystemExit(f"Error: la salida con {workers} procesos difiere de la serial")
+            serial = serial or seconds
+            print(f"{workers:>8} {seconds:>9.3f} {serial / seconds:>7.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+corpus.py
+
+Seeded generator of realistic synthetic inputs for the benchmarks:
+
+- AutoPapper.csv (name, Description, URL, Category) with LaTeX-heavy abstracts,
+  HTML entities, line breaks, cross-listed duplicates and the repeated header
+  rows TagUI leaves behind.
+- ProcessedPapers.csv (titulo, categoria, resumen, puntos_clave, enlace,
+  fecha_procesado) with emoji titles, multi-category cells and the kind of
+  mangled links the LLM echoes back.
+
+The same seed always produces the same files, from 1k to 1M rows.
+
+Usage:
+    from benchmarks import corpus
+    corpus.write_autopapper_csv('OUT/bench_auto.csv', 100000, seed=42)
+    corpus.write_processed_csv('OUT/bench_processed.csv', 100000, seed=42)
+
+"""
+
+import csv
+import random
+import time
+
+WORDS = ("learning model neural network graph optimization agent language data "
+         "training robust efficient transformer benchmark policy reward gradient "
+         "inference sparse attention dataset evaluation method results").split()
+LATEX = [r"\textbf{%s}", r"\emph{%s}", r"\texttt{%s}", r"$\mathcal{O}(%s)$",
+         r"\textit{\textbf{%s}}", r"$%s^2$", "%s &amp; more", "%s\n", "%s  "]
+CATEGORIES = ["Machine Learning", "Artificial Intelligence", "Software Engineering",
+              "Neural and Evolutionary Computing", "Computer and Society",
+              "Engineering, Finance, and Science"]
+
+# Single code point emoji and multi code point clusters the LLM puts in titles
+SIMPLE_EMOJI = ["🤖", "💻", "🔒", "🧬", "🔬", "🧠", "📊", "🎯", "💡", "🔧"]
+CLUSTER_EMOJI = ["🏔️", "⚗️", "🖥️", "👩\u200d🔬", "👨\u200d💻", "👍🏽", "🇦🇷", "1️⃣", "🚀", "🛰️"]
+
+# Ways the LLM mangles the link it echoes back; {id} is the arXiv ID
+MESSY_LINKS = [
+    "🔗 https://arxiv.org/abs/{id}",
+    "https://arxiv.org/pdf/{id}v2",
+    "https://https://arxiv.org/abs/{id}",
+    "🔗 arxiv.org/pdf/{id}.pdf",
+    "https://xn--arxiv-abc.org https://arxiv.org/abs/{id}",
+    "//arxiv.org/abs/{id}v1",
+    "/abs/{id}",
+    "🔗 https://arxiv.org/abs/{head}. {tail}",
+]
+
+AUTOPAPPER_HEADER = ['name', 'Description', 'URL', 'Category']
+PROCESSED_HEADER = ['titulo', 'categoria', 'resumen', 'puntos_clave', 'enlace', 'fecha_procesado']
+
+def random_words(rng, n):
+    """`n` random vocabulary words joined by spaces."""
+    return ' '.join(rng.choice(WORDS) for _ in range(n))
+
+def make_abstract(rng, words=150):
+    """Build one abstract-sized string with LaTeX markup, entities and line breaks."""
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        if rng.random() < 0.05:
+            word = rng.choice(LATEX) % word
+        parts.append(word)
+    return ' '.join(parts)
+
+def make_emoji_title(rng, default_share=0.1):
+    """An LLM-style title: a simple emoji, a multi code point cluster or none."""
+    text = random_words(rng, rng.randint(5, 14)).capitalize()
+    roll = rng.random()
+    if roll < default_share:
+        return text
+    emoji = rng.choice(SIMPLE_EMOJI if roll < (1 + default_share) / 2 else CLUSTER_EMOJI)
+    return f"{emoji} {text}"
+
+def arxiv_id(i):
+    """Deterministic new-style arXiv ID for row `i` (a valid YYMM month, 100000 papers each)."""
+    month = i // 100000
+    return f"{24 + month // 12:02d}{month % 12 + 1:02d}.{i % 100000:05d}"
+
+def messy_link(rng, i):
+    """Link to paper `i` mangled the way the LLM sometimes echoes it back."""
+    ref = arxiv_id(i)
+    head, tail = ref.split('.')
+    return rng.choice(MESSY_LINKS).format(id=ref, head=head, tail=tail)
+
+def iter_autopapper_rows(size, seed=42, header_every=500, cross_list_share=0.05):
+    """Rows of a synthetic AutoPapper.csv (without the leading header)."""
+    rng = random.Random(seed)
+    for i in range(size):
+        if header_every and i and i % header_every == 0:
+            yield AUTOPAPPER_HEADER
+        row = [random_words(rng, rng.randint(6, 14)).title(), make_abstract(rng),
+               f"https://arxiv.org/pdf/{arxiv_id(i)}", rng.choice(CATEGORIES)]
+        yield row
+        if rng.random() < cross_list_share:
+            # Cross-listed: the same paper again under another category
+            yield row[:3] + [rng.choice(CATEGORIES)]
+
+def iter_processed_rows(size, seed=42, header_every=500, date="2025-08-27"):
+    """Rows of a synthetic ProcessedPapers.csv (without the leading header)."""
+    rng = random.Random(seed)
+    for i in range(size):
+        if header_every and i and i % header_every == 0:
+            yield PROCESSED_HEADER
+        categories = rng.sample(CATEGORIES, 2 if rng.random() < 0.15 else 1)
+        yield [
+            make_emoji_title(rng),
+            '; '.join(f"📂 {c}" for c in categories),
+            f"📝 {random_words(rng, 45)}",
+            f"🎯 {random_words(rng, 3)}, {random_words(rng, 3)}, {random_words(rng, 3)}",
+            messy_link(rng, i),
+            date,
+        ]
+
+def _write(path, header, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+def write_autopapper_csv(path, size, seed=42, header_every=500):
+    """Write a synthetic AutoPapper.csv with `size` papers."""
+    _write(path, AUTOPAPPER_HEADER, iter_autopapper_rows(size, seed, header_every))
+
+def write_processed_csv(path, size, seed=42, header_every=500):
+    """Write a synthetic ProcessedPapers.csv with `size` papers."""
+    _write(path, PROCESSED_HEADER, iter_processed_rows(size, seed, header_every))
+
+def timed(fn):
+    """Seconds taken by fn()."""
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+run.py
+
+Times the hot paths of generar_prompts.py and generar_portal.py on seeded
+synthetic corpora of several sizes and writes the results to a JSON file.
+With --baseline, each result is compared with a previous JSON file and any
+stage slower than the tolerance is reported as a regression (exit code 1).
+
+Benchmarks per size (corpus generation is not timed):
+    read_input_csv, clean_text_one_line, build_prompt_for_batch   (AutoPapper.csv)
+    clean_url, process_csv_robust, generate_html                  (ProcessedPapers.csv)
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 1000,10000,100000,1000000 --output OUT/bench.json
+    python -m benchmarks.run --baseline OUT/bench_base.json --tolerance 0.15
+
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime
+
+import arxiv_ids
+from benchmarks import corpus
+from generar_portal import clean_url, generate_html, process_csv_robust
+from generar_prompts import build_prompt_for_batch, chunk_list, clean_text_one_line, read_input_csv
+
+DEFAULT_OUTPUT = os.path.join('OUT', 'bench.json')
+
+def _quiet():
+    """Silence the per-run progress prints of the stages while they are timed."""
+    devnull = open(os.devnull, 'w')
+    stack = contextlib.ExitStack()
+    stack.enter_context(devnull)
+    stack.enter_context(contextlib.redirect_stdout(devnull))
+    stack.enter_context(contextlib.redirect_stderr(devnull))
+    return stack
+
+def _clear_caches():
+    clean_url.cache_clear()
+    arxiv_ids.parse.cache_clear()
+
+def best_of(fn, repeat):
+    """Smallest wall time of `repeat` runs of fn() (caches cleared before each)."""
+    times = []
+    for _ in range(repeat):
+        _clear_caches()
+        with _quiet():
+            times.append(corpus.timed(fn))
+    return min(times)
+
+def run_size(size, seed, repeat, tmp):
+    """Run every benchmark on corpora of `size` papers; returns {name: seconds}."""
+    auto_path = os.path.join(tmp, f'AutoPapper_{size}.csv')
+    processed_path = os.path.join(tmp, f'ProcessedPapers_{size}.csv')
+    html_path = os.path.join(tmp, f'portal_{size}.html')
+    corpus.write_autopapper_csv(auto_path, size, seed=seed)
+    corpus.write_processed_csv(processed_path, size, seed=seed)
+
+    with _quiet():
+        rows = read_input_csv(auto_path)
+        papers = process_csv_robust(processed_path)
+    descriptions = [r['Description'] for r in rows]
+    links = [r[4] for r in corpus.iter_processed_rows(size, seed=seed, header_every=0)]
+    batches = list(chunk_list(rows, 10))
+
+    results = {
+        'read_input_csv': best_of(lambda: read_input_csv(auto_path), repeat),
+        'clean_text_one_line': best_of(lambda: [clean_text_one_line(d) for d in descriptions], repeat),
+        'build_prompt_for_batch': best_of(lambda: [build_prompt_for_batch(b) for b in batches], repeat),
+        'clean_url': best_of(lambda: [clean_url(link) for link in links], repeat),
+        'process_csv_robust': best_of(lambda: process_csv_robust(processed_path), repeat),
+        'generate_html': best_of(lambda: generate_html(papers, html_path), repeat),
+    }
+    for path in (auto_path, processed_path, html_path):
+        os.remove(path)
+    return results
+
+def compare(results, baseline, tolerance):
+    """Print the ratio against the baseline for every shared key; returns the regressed keys."""
+    regressions = []
+    print(f"\nComparación con la línea base (tolerancia {tolerance:.0%}):")
+    for key, entry in results.items():
+        base = baseline.get('results', {}).get(key)
+        if base is None:
+            continue
+        ratio = entry['seconds'] / base['seconds'] if base['seconds'] else float('inf')
+        mark = ''
+        if ratio > 1 + tolerance:
+            mark = '  REGRESIÓN'
+            regressions.append(key)
+        elif ratio < 1 - tolerance:
+            mark = '  mejora'
+        print(f"  {key:<32} {base['seconds']:9.3f} s -> {entry['seconds']:9.3f} s  ({ratio:5.2f}x){mark}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de generar_prompts.py y generar_portal.py")
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help='Tamaños de corpus separados por comas (default 1000,10000,100000; hasta 1000000).')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla del generador (default 42).')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por medición; se toma la mejor (default 3).')
+    parser.add_argument('--output', '-o', default=DEFAULT_OUTPUT, help=f'JSON de resultados (default {DEFAULT_OUTPUT}).')
+    parser.add_argument('--baseline', default=None, help='JSON de una corrida anterior para comparar.')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Lentitud relativa tolerada antes de marcar una regresión (default 0.10).')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            print(f"Tamaño {size}:")
+            for name, seconds in run_size(size, args.seed, max(1, args.repeat), tmp).items():
+                results[f"{name}@{size}"] = {
+                    'benchmark': name,
+                    'size': size,
+                    'seconds': round(seconds, 6),
+                    'rows_per_second': round(size / seconds) if seconds else None,
+                }
+                print(f"  {name:<24} {seconds:9.3f} s  ({size / seconds if seconds else 0:,.0f} filas/s)")
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'results': results,
+    }
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+cache_resumenes.py
+
+Persistent, content-addressed cache of AI summaries stored in SQLite.
+Entries are keyed by canonical arXiv ID plus a hash of the cleaned abstract, so a
+paper that stays on the listing for several days (or a same-day rerun) is only
+summarized once, while a revised abstract produces a new entry.
+The input and processed files may be CSV or typed JSON Lines (registros_jsonl.py).
+
+Usage:
+    python cache_resumenes.py merge OUT/AutoPapper.csv OUT/ProcessedPapers.csv
+    python cache_resumenes.py evict --max-age-days 30 --max-entries 20000
+    python cache_resumenes.py stats
+
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+
+import registros_jsonl
+import telemetria
+from arxiv_ids import canonical_arxiv_id
+from generar_prompts import clean_text_one_line, input_rows
+
+DEFAULT_CACHE_PATH = os.path.join('OUT', 'cache_resumenes.db')
+
+PROCESSED_FIELDS = list(registros_jsonl.SCHEMAS['procesados'])
+
+def abstract_hash(description):
+    """Hash of the cleaned abstract; whitespace or markup noise does not change it."""
+    return hashlib.sha256(clean_text_one_line(description).encode('utf-8')).hexdigest()
+
+def row_key(row):
+    """(arxiv_id, abstract_hash) cache key for an input row (name, Description, URL, Category)."""
+    arxiv_id = canonical_arxiv_id(row.get('URL', ''))
+    if not arxiv_id:
+        return None
+    return arxiv_id, abstract_hash(row.get('Description', '') or row.get('abstract', ''))
+
+class SummaryCache:
+    """SQLite-backed store of processed summaries with hit/miss counters."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                arxiv_id TEXT NOT NULL,
+                abstract_hash TEXT NOT NULL,
+                titulo TEXT, categoria TEXT, resumen TEXT,
+                puntos_clave TEXT, enlace TEXT, fecha_procesado TEXT,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (arxiv_id, abstract_hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries(last_used);
+            CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        """)
+        self.hits = 0
+        self.misses = 0
+        # last_used refreshes are written in one transaction on close()
+        self._touched = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Persist this session's hit/miss counters and last-used times, then close the database."""
+        if self.conn is None:
+            return
+        with self.conn:
+            now = time.time()
+            self.conn.executemany("UPDATE summaries SET last_used = ? WHERE arxiv_id = ? AND abstract_hash = ?",
+                                  ((now, *key) for key in self._touched))
+            for name, value in (('hits', self.hits), ('misses', self.misses)):
+                self.conn.execute(
+                    "INSERT INTO counters(name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, value))
+        self.conn.close()
+        self.conn = None
+
+    def get(self, key):
+        """Return the cached summary dict for a (arxiv_id, abstract_hash) key, or None, counting hit/miss."""
+        summary = self.peek(key)
+        if summary is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return summary
+
+    def peek(self, key):
+        """Return the cached summary for `key` without touching the hit/miss counters."""
+        if key is None:
+            return None
+        cur = self.conn.execute(
+            f"SELECT {', '.join(PROCESSED_FIELDS)} FROM summaries WHERE arxiv_id = ? AND abstract_hash = ?", key)
+        found = cur.fetchone()
+        if found is None:
+            return None
+        self._touched.append(key)
+        return dict(zip(PROCESSED_FIELDS, found))
+
+    def contains(self, key):
+        """Like get() but only reports presence."""
+        return self.get(key) is not None
+
+    def put(self, key, summary):
+        """Store (or refresh) a processed summary dict under `key`."""
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO summaries (arxiv_id, abstract_hash, {', '.join(PROCESSED_FIELDS)}, created_at, last_used) "
+                f"VALUES (?, ?, {', '.join('?' for _ in PROCESSED_FIELDS)}, ?, ?)",
+                (*key, *(summary.get(f, '') for f in PROCESSED_FIELDS), now, now))
+
+    def evict(self, max_age_days=None, max_entries=None):
+        """Drop entries unused for `max_age_days` and/or beyond the `max_entries` most recent. Returns count removed."""
+        removed = 0
+        with self.conn:
+            if max_age_days is not None:
+                cutoff = time.time() - max_age_days * 86400
+                removed += self.conn.execute("DELETE FROM summaries WHERE last_used < ?", (cutoff,)).rowcount
+            if max_entries is not None:
+                removed += self.conn.execute(
+                    "DELETE FROM summaries WHERE rowid NOT IN "
+                    "(SELECT rowid FROM summaries ORDER BY last_used DESC LIMIT ?)", (max_entries,)).rowcount
+        if removed:
+            self.conn.execute("VACUUM")
+        return removed
+
+    def stats(self):
+        """Entry count, database size and lifetime hit/miss counters (including this session)."""
+        entries = self.conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        counters = dict(self.conn.execute("SELECT name, value FROM counters"))
+        hits = counters.get('hits', 0) + self.hits
+        misses = counters.get('misses', 0) + self.misses
+        lookups = hits + misses
+        return {
+            'entries': entries,
+            'bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+        }
+
+def iter_uncached_rows(rows, cache):
+    """Yield only the input rows whose summary is not already cached."""
+    for row in rows:
+        if not cache.contains(row_key(row)):
+            yield row
+
+def read_processed_csv(path):
+    """Read a ProcessedPapers.csv (or .jsonl) into a list of dicts, skipping duplicate header rows."""
+    if not os.path.isfile(path):
+        return []
+    rows = registros_jsonl.iter_rows(path, 'procesados')
+    return [r for r in rows if (r.get('titulo') or '').strip().lower() not in ('', 'titulo')]
+
+def write_processed_csv(rows, path):
+    """Write rows with the ProcessedPapers.csv schema (as typed JSON Lines for a .jsonl path)."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = registros_jsonl.dict_writer(f, path, 'procesados', extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+def merge(cache, input_csv, processed_csv, output_csv):
+    """
+    Store the fresh summaries of `processed_csv` in the cache and append the cached
+    summaries of every paper listed in `input_csv` that was not freshly processed.
+    Returns (fresh, stored, from_cache).
+    """
+    with open(input_csv, newline='', encoding='utf-8') as f:
+        keys = {}
+        for row in input_rows(input_csv, f):
+            key = row_key(row)
+            if key is not None:
+                keys.setdefault(key[0], key)
+
+    fresh = read_processed_csv(processed_csv)
+    fresh_ids = set()
+    stored = 0
+    for summary in fresh:
+        arxiv_id = canonical_arxiv_id(summary.get('enlace', ''))
+        fresh_ids.add(arxiv_id)
+        if arxiv_id in keys:
+            cache.put(keys[arxiv_id], summary)
+            stored += 1
+
+    merged = list(fresh)
+    for arxiv_id, key in keys.items():
+        if arxiv_id in fresh_ids:
+            continue
+        summary = cache.peek(key)
+        if summary is not None:
+            merged.append(summary)
+
+    write_processed_csv(merged, output_csv)
+    return len(fresh), stored, len(merged) - len(fresh)
+
+def print_stats(stats):
+    print(f"Entradas: {stats['entries']} ({stats['bytes'] / 1024:.1f} KiB)")
+    print(f"Aciertos: {stats['hits']}  Fallos: {stats['misses']}  Tasa de acierto: {stats['hit_rate']:.1%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache persistente de resúmenes generados por la IA.")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help=f'Ruta a la base SQLite (default {DEFAULT_CACHE_PATH}).')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_merge = sub.add_parser('merge', help='Guarda los resúmenes nuevos y agrega los cacheados al CSV procesado.')
+    p_merge.add_argument('input_csv', help='CSV de papers extraídos (AutoPapper.csv).')
+    p_merge.add_argument('processed_csv', help='CSV de papers procesados por la IA (ProcessedPapers.csv).')
+    p_merge.add_argument('--output', '-o', default=None, help='CSV combinado de salida (default: sobrescribe processed_csv).')
+    p_merge.add_argument('--metrics', default=None, help='Reporte JSON de métricas de la corrida (se combina con las otras etapas).')
+
+    p_evict = sub.add_parser('evict', help='Elimina entradas viejas o excedentes.')
+    p_evict.add_argument('--max-age-days', type=float, default=None, help='Elimina entradas sin usar hace más de N días.')
+    p_evict.add_argument('--max-entries', type=int, default=None, help='Conserva solo las N entradas usadas más recientemente.')
+
+    sub.add_parser('stats', help='Muestra tamaño y estadísticas de aciertos.')
+    args = parser.parse_args()
+
+    with SummaryCache(args.cache) as cache:
+        if args.command == 'merge':
+            if not os.path.isfile(args.input_csv):
+                print(f"Error: no se encuentra el archivo de entrada: {args.input_csv}", file=sys.stderr)
+                sys.exit(1)
+            output = args.output or args.processed_csv
+            with telemetria.stage('cache_merge', args.metrics) as metrics:
+                metrics.file_size('bytes_in', args.processed_csv)
+                fresh, stored, cached = merge(cache, args.input_csv, args.processed_csv, output)
+                metrics.set('rows_in', fresh)
+                metrics.set('rows_out', fresh + cached)
+                metrics.set('cache_stored', stored)
+                metrics.set('cache_hits', cached)
+                metrics.file_size('bytes_out', output)
+            print(f"Resúmenes nuevos: {fresh} (guardados en cache: {stored}), recuperados de cache: {cached}")
+        elif args.command == 'evict':
+            removed = cache.evict(args.max_age_days, args.max_entries)
+            print(f"Eliminadas {removed} entradas del cache")
+        print_stats(cache.stats())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+"""
+cliente_http.py
+
+Small thread-safe HTTP client shared by the Python stages: keep-alive connection
+pooling per host, a per-host concurrency cap and a global politeness rate limit.
+Only the standard library is used (http.client).
+
+Usage:
+    client = HttpClient(max_per_host=2, rate_limiter=RateLimiter(min_interval=3.0))
+    response = client.request('GET', 'https://arxiv.org/list/cs.AI/new')
+    response.raise_for_status()
+    html_text = response.text()
+
+"""
+
+import contextlib
+import http.client
+import ssl
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+
+# Errors that mean a pooled keep-alive connection was closed by the server
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                            ConnectionResetError, BrokenPipeError)
+
+class HttpError(OSError):
+    """Raised by Response.raise_for_status() for 4xx/5xx answers."""
+
+    def __init__(self, status, reason, url):
+        super().__init__(f"HTTP {status} {reason}: {url}")
+        self.status = status
+        self.reason = reason
+        self.url = url
+
+class Response:
+    """Fully read HTTP response."""
+
+    __slots__ = ('url', 'status', 'reason', 'headers', 'body')
+
+    def __init__(self, url, status, reason, headers, body):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def text(self):
+        """Body decoded with the charset announced by the server (utf-8 by default)."""
+        charset = self.headers.get_content_charset() or 'utf-8'
+        return self.body.decode(charset, errors='replace')
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HttpError(self.status, self.reason, self.url)
+        return self
+
+class RateLimiter:
+    """Global politeness limit: at most one request start every `min_interval` seconds, across all threads."""
+
+    def __init__(self, min_interval=0.0):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        """Block until the caller may start its request."""
+        if self.min_interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot)
+            self._next_slot = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+class HttpClient:
+    """
+    Keep-alive connection pool. Idle connections are reused per (scheme, host, port),
+    at most `max_per_host` requests run concurrently against one host, and every
+    request start goes through the optional shared RateLimiter.
+    """
+
+    def __init__(self, max_per_host=2, rate_limiter=None, timeout=60, headers=None):
+        self.max_per_host = max_per_host
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self._lock = threading.Lock()
+        self._idle = defaultdict(list)
+        self._slots = {}
+        self._ssl_context = ssl.create_default_context()
+        self.requests = 0
+        self.bytes_received = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close every idle pooled connection."""
+        with self._lock:
+            idle, self._idle = self._idle, defaultdict(list)
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+    def _slot(self, key):
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            return slot
+
+    def _checkout(self, key, timeout):
+        """Return (connection, reused) for a host, reusing an idle one when available."""
+        with self._lock:
+            idle = self._idle[key]
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return self._connect(key, timeout), False
+
+    def _connect(self, key, timeout):
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            self._idle[key].append(conn)
+
+    def _prepare(self, url, body, headers, timeout):
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme or 'http'
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        merged_headers = {**self.headers, **(headers or {})}
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        timeout = self.timeout if timeout is None else timeout
+        return key, path, body, merged_headers, timeout
+
+    def _send(self, key, method, path, body, headers, timeout):
+        """Send the request on a pooled connection and return (connection, response headers received)."""
+        conn, reused = self._checkout(key, timeout)
+        while True:
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive connection: retry once on a fresh one
+                conn, reused = self._connect(key, timeout), False
+            except Exception:
+                conn.close()
+                raise
+
+    def _release(self, key, conn, resp):
+        if resp.will_close or not resp.isclosed():
+            conn.close()
+        else:
+            self._checkin(key, conn)
+
+    def request(self, method, url, body=None, headers=None, timeout=None):
+        """Send a request and return the fully read Response. Network errors propagate as OSError."""
+        key, path, body, headers, timeout = self._prepare(url, body, headers, timeout)
+        with self._slot(key):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            conn, resp = self._send(key, method, path, body, headers, timeout)
+            try:
+                data = resp.read()
+            except Exception:
+                conn.close()
+                raise
+            self._release(key, conn, resp)
+
+        with self._lock:
+            self.requests += 1
+            self.bytes_received += len(data)
+        return Response(url, resp.status, resp.reason, resp.headers, data)
+
+    @contextlib.contextmanager
+    def stream(self, method, url, body=None, headers=None, timeout=None):
+        """
+        Context manager yielding the live http.client.HTTPResponse so the body can be
+        read incrementally (e.g. server-sent events). The connection goes back to the
+        pool only if the body was read to the end.
+        """
+        key, path, body, headers, timeout = self._prepare(url, body, headers, timeout)
+        with self._slot(key):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            conn, resp = self._send(key, method, path, body, headers, timeout)
+            try:
+                yield resp
+            except BaseException:
+                conn.close()
+                raise
+            self._release(key, conn, resp)
+        with self._lock:
+            self.requests += 1
+
+    def get(self, url, headers=None, timeout=None):
+        return self.request('GET', url, headers=headers, timeout=timeout)
+
+    def post(self, url, body, headers=None, timeout=None):
+        return self.request('POST', url, body=body, headers=headers, timeout=timeout)
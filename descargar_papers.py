@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""
+descargar_papers.py
+
+Downloads each category's "new" listing from arXiv in bulk (one request per
+page of up to --page-size entries) instead of opening every abstract page in a
+browser, and writes the same CSV produced by AutoPapper.tag:
+columns name, Description, URL, Category (or the same records as typed JSON
+Lines when the output path ends in .jsonl).
+Categories are fetched concurrently over a pooled keep-alive HTTP client with a
+global politeness interval between requests.
+
+With --since (and optionally --until) it backfills a date range instead: every
+category x date window is queried through the arXiv API in pages, and after each
+page the rows are appended to the output and a cursor is saved next to it, so an
+interrupted multi-hour backfill continues with --resume where it stopped. The
+output has the same columns and goes straight into generar_prompts.py.
+
+Usage:
+    python descargar_papers.py IN/xpaths.csv OUT/AutoPapper.csv
+    python descargar_papers.py IN/xpaths.csv OUT/AutoPapper.csv --cross-lists
+    python descargar_papers.py IN/xpaths.csv OUT/AutoPapper.csv --parallel 6 --delay 1
+    python descargar_papers.py IN/xpaths.csv OUT/AutoPapper.csv --base-url http://localhost:8000
+    python descargar_papers.py IN/xpaths.csv OUT/Backfill.csv --since 2025-01-01 --until 2025-03-31
+    python descargar_papers.py IN/xpaths.csv OUT/Backfill.csv --since 2025-01-01 --until 2025-03-31 --resume
+
+"""
+
+import csv
+import argparse
+import concurrent.futures
+import functools
+import json
+import os
+import re
+import sys
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+from datetime import date, timedelta
+from html.parser import HTMLParser
+
+import arxiv_ids
+import registros_jsonl
+import telemetria
+from cliente_http import HttpClient, HttpError, RateLimiter
+
+DEFAULT_BASE_URL = 'https://arxiv.org'
+DEFAULT_API_URL = 'https://export.arxiv.org/api/query'
+USER_AGENT = 'Papper-News/1.0 (+https://github.com/Maximuszoo/Papper-News)'
+
+# Category code inside the xpaths.csv selector, e.g. //*[@id="cs.AI"]
+_CATEGORY_CODE_RE = re.compile(r'@id=["\']([^"\']+)["\']')
+# "New submissions (showing 27 of 27 entries)"
+_SHOWING_RE = re.compile(r'showing\s+(?:first\s+)?(\d+)\s+of\s+(\d+)', re.IGNORECASE)
+
+def read_categories(path):
+    """Read IN/xpaths.csv and return a list of (code, name) tuples, e.g. ('cs.AI', 'Artificial Intelligence')."""
+    categories = []
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f, skipinitialspace=True)
+        next(reader, None)  # header: xpath, category
+        for row in reader:
+            if len(row) < 2 or not row[0].strip():
+                continue
+            match = _CATEGORY_CODE_RE.search(row[0])
+            if not match:
+                print(f"Advertencia: no se reconoce la categoría en '{row[0]}'. Se omite.", file=sys.stderr)
+                continue
+            categories.append((match.group(1), row[1].strip()))
+    return categories
+
+class ListingParser(HTMLParser):
+    """
+    Extracts the entries of an arXiv /list/<category>/new page.
+    Each entry is a dict with keys id, title, abstract and section, where section is
+    'new', 'cross' or 'replace' depending on the <h3> heading it appears under.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.entries = []
+        self.total_new = None
+        self.section = None
+        self._current = None
+        self._capture = None      # 'h3', 'title' or 'abstract'
+        self._capture_tag = None
+        self._depth = 0           # nesting depth of the element being captured
+        self._skip_depth = 0      # inside <span class="descriptor">
+        self._buffer = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if self._capture:
+            if tag == self._capture_tag:
+                self._depth += 1
+            if tag == 'span' and 'descriptor' in classes:
+                self._skip_depth = 1
+            elif self._skip_depth and tag == 'span':
+                self._skip_depth += 1
+            return
+        if tag == 'h3':
+            self._start_capture('h3', tag)
+        elif tag == 'dt':
+            self._current = {'id': '', 'title': '', 'abstract': '', 'section': self.section}
+        elif self._current is not None:
+            href = attrs.get('href') or ''
+            if tag == 'a' and not self._current['id'] and href.startswith('/abs/'):
+                self._current['id'] = href[len('/abs/'):].strip()
+            elif tag == 'div' and 'list-title' in classes:
+                self._start_capture('title', tag)
+            elif tag == 'p' and 'mathjax' in classes:
+                self._start_capture('abstract', tag)
+
+    def handle_endtag(self, tag):
+        if self._capture:
+            if self._skip_depth and tag == 'span':
+                self._skip_depth -= 1
+                return
+            if tag == self._capture_tag:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_capture()
+            return
+        if tag == 'dd' and self._current is not None:
+            if self._current['id']:
+                self.entries.append(self._current)
+            self._current = None
+
+    def handle_data(self, data):
+        if self._capture and not self._skip_depth:
+            self._buffer.append(data)
+
+    def _start_capture(self, kind, tag):
+        self._capture = kind
+        self._capture_tag = tag
+        self._depth = 1
+        self._skip_depth = 0
+        self._buffer = []
+
+    def _finish_capture(self):
+        text = ' '.join(''.join(self._buffer).split())
+        kind = self._capture
+        self._capture = None
+        if kind == 'h3':
+            lowered = text.lower()
+            if lowered.startswith('new submission'):
+                self.section = 'new'
+                match = _SHOWING_RE.search(text)
+                if match:
+                    self.total_new = int(match.group(2))
+            elif lowered.startswith('cross'):
+                self.section = 'cross'
+            elif lowered.startswith('replacement'):
+                self.section = 'replace'
+        elif self._current is not None:
+            self._current[kind] = text
+
+def parse_listing(html_text):
+    """Parse a listing page and return the ListingParser with its entries."""
+    parser = ListingParser()
+    parser.feed(html_text)
+    parser.close()
+    return parser
+
+def fetch(url, client, timeout=60):
+    """GET a URL through the shared pooled client and return its body decoded as text."""
+    return client.get(url, timeout=timeout).raise_for_status().text()
+
+def listing_url(base_url, code, skip, show):
+    """URL of one page of a category's "new" listing."""
+    query = urllib.parse.urlencode({'skip': skip, 'show': show})
+    return f"{base_url.rstrip('/')}/list/{urllib.parse.quote(code)}/new?{query}"
+
+def fetch_category(base_url, code, name, fetcher, page_size=2000, include_cross=False, stats=None):
+    """
+    Download every new submission of one category and return rows with the
+    AutoPapper.csv columns. Cross-listed papers are included when include_cross is set.
+    `fetcher(url)` returns the page text. If `stats` is a dict it is filled with
+    'requests' and 'bytes' counts.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault('requests', 0)
+    stats.setdefault('bytes', 0)
+    sections = {'new', 'cross'} if include_cross else {'new'}
+    rows = []
+    seen = set()
+    skip = 0
+    while True:
+        page_text = fetcher(listing_url(base_url, code, skip, page_size))
+        stats['requests'] += 1
+        stats['bytes'] += len(page_text)
+        page = parse_listing(page_text)
+        for entry in page.entries:
+            ref = arxiv_ids.parse(entry['id'])
+            if entry['section'] not in sections or ref is None or ref.id in seen:
+                continue
+            seen.add(ref.id)
+            rows.append({
+                'name': entry['title'],
+                'Description': entry['abstract'],
+                'URL': ref.url('pdf'),
+                'Category': name,
+            })
+        skip += page_size
+        # A short page is the last one; without cross-lists the heading also says
+        # how many new submissions exist, so we can stop once they are all covered
+        if len(page.entries) < page_size:
+            break
+        if not include_cross and page.total_new is not None and skip >= page.total_new:
+            break
+    return rows
+
+def fetch_all(categories, base_url, client, parallel=3, page_size=2000, include_cross=False):
+    """
+    Fetch every category concurrently over the shared client.
+    Returns a list of (code, name, rows, stats) in the order of `categories`;
+    rows is None when the category failed, with the error in stats['error'].
+    """
+    def task(category):
+        code, name = category
+        stats = {}
+        start = time.perf_counter()
+        try:
+            rows = fetch_category(base_url, code, name, functools.partial(fetch, client=client),
+                                  page_size=page_size, include_cross=include_cross, stats=stats)
+        except OSError as e:
+            rows = None
+            stats['error'] = str(e)
+        stats['seconds'] = time.perf_counter() - start
+        return code, name, rows, stats
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        return list(pool.map(task, categories))
+
+def write_papers_csv(rows, path):
+    """
+    Write rows with the AutoPapper.csv columns (all fields quoted, like TagUI's
+    csv_row), or as typed JSON Lines for a .jsonl path.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = registros_jsonl.dict_writer(f, path, 'papers', quoting=csv.QUOTE_ALL, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+# Atom namespaces of the arXiv API answers
+_ATOM = '{http://www.w3.org/2005/Atom}'
+_ARXIV = '{http://arxiv.org/schemas/atom}'
+_OPENSEARCH = '{http://a9.com/-/spec/opensearch/1.1/}'
+
+def api_query_url(api_url, code, day_from, day_to, start, max_results):
+    """arXiv API query for one page of a category's submissions between two days (inclusive)."""
+    query = f"cat:{code} AND submittedDate:[{day_from.replace('-', '')}0000 TO {day_to.replace('-', '')}2359]"
+    params = urllib.parse.urlencode({'search_query': query, 'start': start, 'max_results': max_results,
+                                     'sortBy': 'submittedDate', 'sortOrder': 'ascending'})
+    return f"{api_url}?{params}"
+
+def parse_api_page(xml_text):
+    """
+    Parse an arXiv API Atom page. Returns (total_results, entries); each entry is a
+    dict with keys id, title, abstract and primary (its primary category).
+    Raises ValueError for the error entries the API answers malformed queries with.
+    """
+    root = ET.fromstring(xml_text)
+    total = int(root.findtext(f'{_OPENSEARCH}totalResults') or 0)
+    entries = []
+    for entry in root.iter(f'{_ATOM}entry'):
+        entry_id = entry.findtext(f'{_ATOM}id') or ''
+        abstract = ' '.join((entry.findtext(f'{_ATOM}summary') or '').split())
+        if '/api/errors' in entry_id:
+            raise ValueError(f"error de la API de arXiv: {abstract}")
+        primary = entry.find(f'{_ARXIV}primary_category')
+        entries.append({
+            'id': entry_id,
+            'title': ' '.join((entry.findtext(f'{_ATOM}title') or '').split()),
+            'abstract': abstract,
+            'primary': primary.get('term', '') if primary is not None else '',
+        })
+    return total, entries
+
+def date_windows(since, until, days):
+    """Consecutive (from, to) ISO day pairs of at most `days` days covering since..until."""
+    start, end = date.fromisoformat(since), date.fromisoformat(until)
+    windows = []
+    while start <= end:
+        stop = min(start + timedelta(days=days - 1), end)
+        windows.append((start.isoformat(), stop.isoformat()))
+        start = stop + timedelta(days=1)
+    return windows
+
+def backfill_tasks(categories, since, until, window_days):
+    """Every (code, name, day_from, day_to) query of a backfill, in a fixed order."""
+    return [(code, name, day_from, day_to)
+            for code, name in categories
+            for day_from, day_to in date_windows(since, until, window_days)]
+
+def cursor_path(output_csv):
+    """Backfill cursor kept next to the output."""
+    return output_csv + '.cursor'
+
+def load_cursor(path):
+    """Read a saved cursor, or None if there is none."""
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_cursor(path, cursor):
+    """Write the cursor atomically, so an interruption never leaves it half written."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cursor, f, indent=1)
+    os.replace(tmp_path, path)
+
+def fetch_page(url, fetcher, retries=3, backoff=5.0):
+    """
+    Fetch and parse one API page, retrying network errors, 429 and 5xx answers and
+    truncated pages. Other HTTP errors (a malformed query) are raised at once.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return parse_api_page(fetcher(url))
+        except (OSError, ET.ParseError) as e:
+            if isinstance(e, HttpError) and e.status != 429 and e.status < 500:
+                raise
+            if attempt > retries:
+                raise
+            delay = backoff * (2 ** (attempt - 1))
+            print(f"  Reintento {attempt}/{retries} en {delay:.0f} s: {e}", file=sys.stderr)
+            time.sleep(delay)
+
+def _backfill_query(task, start, fetcher, api_url, page_size, include_cross, seen, metrics, on_page,
+                    empty_retries=3):
+    """
+    Page through one (code, name, day_from, day_to) query from position `start`,
+    calling on_page(rows, next_start) after each page (next_start is None once
+    the query is finished). Returns False if the API kept answering a page in
+    range with no entries, so the rest of the window could not be read.
+    """
+    code, name, day_from, day_to = task
+    empty = 0
+    while True:
+        try:
+            total, entries = fetch_page(api_query_url(api_url, code, day_from, day_to, start, page_size), fetcher)
+        except ValueError as e:
+            raise ValueError(f"{code} {day_from} a {day_to}: {e}") from e
+        if metrics is not None:
+            metrics.count('pages')
+        if not entries and start < total:
+            # The API occasionally answers a page in range with no entries: ask again
+            if empty < empty_retries:
+                empty += 1
+                continue
+            print(f"Advertencia: {code} {day_from} a {day_to}: la API devolvió {empty + 1} veces una página "
+                  f"vacía en la posición {start}/{total}; la ventana queda pendiente para --resume",
+                  file=sys.stderr)
+            return False
+        empty = 0
+        rows = []
+        for entry in entries:
+            ref = arxiv_ids.parse(entry['id'])
+            if ref is None or (not include_cross and entry['primary'] != code) or (ref.id, name) in seen:
+                continue
+            seen.add((ref.id, name))
+            rows.append({
+                'name': entry['title'],
+                'Description': entry['abstract'],
+                'URL': arxiv_ids.ArxivId(ref.id, None).url('pdf'),
+                'Category': name,
+            })
+        start += len(entries)
+        finished = not entries or start >= total
+        on_page(rows, None if finished else start)
+        print(f"{code:<12} {day_from} a {day_to}: {min(start, total)}/{total} (+{len(rows)} papers)")
+        if finished:
+            return True
+
+def backfill(tasks, fetcher, api_url, writer, cursor, cursor_file, page_size=200, include_cross=False,
+             seen=None, metrics=None):
+    """
+    Run the backfill queries from the position in `cursor`, page by page. The rows
+    of every page are written through `writer` (which must flush) before the cursor
+    is advanced and saved, so an interruption repeats at most one page; `seen`
+    holds the (arXiv ID, category) pairs already written and skips them.
+    Cross-listed papers are kept only with `include_cross`.
+    A window the API would not page through is recorded in cursor['skipped'] as
+    [task, start] and retried first on the next run; the cursor is only marked
+    done once none is left.
+    """
+    seen = set() if seen is None else seen
+    skipped = cursor.setdefault('skipped', [])
+
+    def page_writer(advance):
+        def on_page(rows, next_start):
+            writer(rows)
+            cursor['rows'] += len(rows)
+            cursor['pages'] += 1
+            advance(next_start)
+            save_cursor(cursor_file, cursor)
+        return on_page
+
+    # Windows left incomplete by an earlier run
+    for position in list(skipped):
+        def advance(next_start, position=position):
+            if next_start is not None:
+                position[1] = next_start
+        if _backfill_query(tasks[position[0]], position[1], fetcher, api_url, page_size, include_cross,
+                           seen, metrics, page_writer(advance)):
+            skipped.remove(position)
+            save_cursor(cursor_file, cursor)
+
+    def advance(next_start):
+        if next_start is None:
+            cursor['task'], cursor['start'] = cursor['task'] + 1, 0
+        else:
+            cursor['start'] = next_start
+
+    while cursor['task'] < len(tasks):
+        if not _backfill_query(tasks[cursor['task']], cursor['start'], fetcher, api_url, page_size, include_cross,
+                               seen, metrics, page_writer(advance)):
+            skipped.append([cursor['task'], cursor['start']])
+            cursor['task'], cursor['start'] = cursor['task'] + 1, 0
+            save_cursor(cursor_file, cursor)
+    cursor['done'] = not skipped
+    save_cursor(cursor_file, cursor)
+    return cursor
+
+def run_backfill(args, categories, metrics):
+    """The --since mode of main(): resumable backfill of a date range through the arXiv API."""
+    until = args.until or date.today().isoformat()
+    try:
+        tasks = backfill_tasks(categories, args.since, until, args.window_days)
+    except ValueError as e:
+        print(f"Error: fecha inválida ({e}); usar YYYY-MM-DD", file=sys.stderr)
+        sys.exit(1)
+    if not tasks:
+        print("Error: --since es posterior a --until", file=sys.stderr)
+        sys.exit(1)
+
+    # The cursor is only valid for the same query; anything else starts over
+    query = {'categories': [code for code, _ in categories], 'since': args.since, 'until': until,
+             'window_days': args.window_days, 'page_size': args.page_size, 'cross_lists': args.cross_lists}
+    cursor_file = cursor_path(args.output_csv)
+    cursor = load_cursor(cursor_file) if args.resume and os.path.isfile(args.output_csv) else None
+    if cursor is not None and cursor.get('query') != query:
+        print("Error: el cursor guardado corresponde a otro backfill; correr sin --resume para empezar de nuevo",
+              file=sys.stderr)
+        sys.exit(1)
+    if cursor is not None and cursor.get('done'):
+        print(f"El backfill ya estaba completo: {cursor['rows']} papers en {args.output_csv}")
+        return
+    seen = set()
+    if cursor is not None:
+        for row in registros_jsonl.iter_rows(args.output_csv, 'papers'):
+            seen.add((arxiv_ids.canonical_arxiv_id(row.get('URL', '')), row.get('Category')))
+        pending = len(cursor.get('skipped', []))
+        print(f"Retomando en la consulta {min(cursor['task'] + 1, len(tasks))}/{len(tasks)}, posición {cursor['start']} "
+              f"({cursor['rows']} papers ya descargados, {pending} ventanas pendientes)")
+    else:
+        cursor = {'query': query, 'task': 0, 'start': 0, 'rows': 0, 'pages': 0, 'skipped': [], 'done': False}
+    print(f"Backfill de {args.since} a {until}: {len(categories)} categorías, {len(tasks)} consultas")
+
+    directory = os.path.dirname(args.output_csv)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    resuming = bool(seen) or cursor['pages'] > 0
+    client = HttpClient(max_per_host=1, rate_limiter=RateLimiter(args.delay), headers={'User-Agent': USER_AGENT})
+    with client, open(args.output_csv, 'a' if resuming else 'w', newline='', encoding='utf-8') as f:
+        writer = registros_jsonl.dict_writer(f, args.output_csv, 'papers', quoting=csv.QUOTE_ALL, extrasaction='ignore')
+        if not resuming:
+            writer.writeheader()
+
+        def write_rows(rows):
+            writer.writerows(rows)
+            f.flush()
+
+        start = time.perf_counter()
+        try:
+            backfill(tasks, functools.partial(fetch, client=client), args.api_url, write_rows, cursor, cursor_file,
+                     page_size=args.page_size, include_cross=args.cross_lists, seen=seen, metrics=metrics)
+        except (ValueError, OSError, ET.ParseError) as e:
+            # An API error entry, an HTTP error or retries exhausted: keep the position for --resume
+            save_cursor(cursor_file, cursor)
+            metrics.count('errors')
+            print(f"Error: {e}", file=sys.stderr)
+            print(f"{cursor['rows']} papers guardados en {args.output_csv}; corregir el problema y correr con --resume",
+                  file=sys.stderr)
+            sys.exit(1)
+    metrics.set('http_requests', client.requests)
+    metrics.set('bytes_in', client.bytes_received)
+    metrics.set('rows_out', cursor['rows'])
+    metrics.file_size('bytes_out', args.output_csv)
+    metrics.set('windows_incomplete', len(cursor['skipped']))
+    if cursor['skipped']:
+        print(f"Backfill incompleto: {cursor['rows']} papers en {args.output_csv}; "
+              f"{len(cursor['skipped'])} ventanas quedaron pendientes, correr de nuevo con --resume", file=sys.stderr)
+        sys.exit(1)
+    print(f"Backfill completo: {cursor['rows']} papers en {args.output_csv} "
+          f"({cursor['pages']} páginas, {time.perf_counter() - start:.1f} s)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Descarga los papers nuevos de arXiv por categoría.")
+    parser.add_argument('categories_csv', help='CSV de categorías (IN/xpaths.csv).')
+    parser.add_argument('output_csv', help='CSV de salida con columnas name, Description, URL, Category (.jsonl: registros tipados).')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help=f'URL base del sitio de listados (default {DEFAULT_BASE_URL}).')
+    parser.add_argument('--page-size', type=int, default=None,
+                        help='Entradas pedidas por página (default 2000 en el listado, 200 en el backfill).')
+    parser.add_argument('--cross-lists', action='store_true', help='Incluir también los papers cross-listados en cada categoría.')
+    parser.add_argument('--delay', type=float, default=3.0,
+                        help='Intervalo mínimo global en segundos entre pedidos a arXiv (default 3).')
+    parser.add_argument('--parallel', '-p', type=int, default=3, help='Categorías descargadas en paralelo (default 3).')
+    parser.add_argument('--max-per-host', type=int, default=2, help='Pedidos simultáneos máximos por host (default 2).')
+    parser.add_argument('--since', default=None,
+                        help='Backfill: primer día (YYYY-MM-DD) a descargar con la API de arXiv en lugar del listado de hoy.')
+    parser.add_argument('--until', default=None, help='Backfill: último día incluido (default hoy).')
+    parser.add_argument('--window-days', type=int, default=7,
+                        help='Backfill: días por consulta; ventanas cortas evitan paginar muy profundo (default 7).')
+    parser.add_argument('--api-url', default=DEFAULT_API_URL, help=f'URL de la API de arXiv (default {DEFAULT_API_URL}).')
+    parser.add_argument('--resume', action='store_true',
+                        help='Backfill: continuar desde el cursor guardado junto a la salida (<salida>.cursor).')
+    parser.add_argument('--metrics', default=None, help='Reporte JSON de métricas de la corrida (se combina con las otras etapas).')
+    args = parser.parse_args()
+    if args.page_size is None:
+        args.page_size = 200 if args.since else 2000
+
+    with telemetria.stage('descargar', args.metrics) as metrics:
+        if not os.path.isfile(args.categories_csv):
+            print(f"Error: no se encuentra el archivo de categorías: {args.categories_csv}", file=sys.stderr)
+            sys.exit(1)
+
+        categories = read_categories(args.categories_csv)
+        if not categories:
+            print("No hay categorías válidas en el CSV. Abortando.", file=sys.stderr)
+            sys.exit(1)
+        metrics.set('categories', len(categories))
+        if args.since:
+            if args.window_days < 1 or args.page_size < 1:
+                print("Error: --window-days y --page-size deben ser al menos 1", file=sys.stderr)
+                sys.exit(1)
+            run_backfill(args, categories, metrics)
+            return
+
+        start = time.perf_counter()
+        client = HttpClient(max_per_host=args.max_per_host, rate_limiter=RateLimiter(args.delay),
+                            headers={'User-Agent': USER_AGENT})
+        with client:
+            results = fetch_all(categories, args.base_url, client, parallel=args.parallel,
+                                page_size=args.page_size, include_cross=args.cross_lists)
+        elapsed = time.perf_counter() - start
+
+        rows = []
+        print(f"{'Categoría':<12} {'Papers':>7} {'Pedidos':>8} {'KiB':>9} {'Segundos':>9}")
+        for code, name, category_rows, stats in results:
+            metrics.observe('category_fetch_seconds', stats['seconds'])
+            if category_rows is None:
+                print(f"Error al descargar {code}: {stats['error']}", file=sys.stderr)
+                metrics.count('errors')
+                continue
+            print(f"{code:<12} {len(category_rows):>7} {stats['requests']:>8} {stats['bytes'] / 1024:>9.1f} {stats['seconds']:>9.2f}")
+            rows.extend(category_rows)
+        busy = sum(stats['seconds'] for *_, stats in results)
+        print(f"Tiempo total: {elapsed:.2f} s (suma por categoría: {busy:.2f} s, {client.requests} pedidos HTTP)")
+        metrics.set('http_requests', client.requests)
+        metrics.set('bytes_in', client.bytes_received)
+        metrics.set('rows_out', len(rows))
+
+        if not rows:
+            print("No se descargó ningún paper.", file=sys.stderr)
+            sys.exit(1)
+
+        write_papers_csv(rows, args.output_csv)
+        metrics.file_size('bytes_out', args.output_csv)
+        print(f"Guardados {len(rows)} papers en {args.output_csv}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+ejecutar_pipeline.py
+
+Runs the whole pipeline (download, prompts, LLM, cache merge, portal and/or
+WhatsApp messages) as a dependency graph from a single entry point, as an
+alternative to the shell scripts. Both outputs are rendered from the same
+merged summaries, so producing both costs a single LLM pass.
+
+Every finished stage is checkpointed in OUT/pipeline_estado.json with a key
+built from its command and the content hashes of its inputs, plus the hashes
+of the outputs it produced. A rerun skips the stages whose key and outputs are
+unchanged, resumes an interrupted LLM stage prompt by prompt, and starts stages
+whose dependencies are done in parallel. Intermediate files are kept in the
+work directory so they can be inspected, as CSV or, with --format jsonl, as
+typed JSON Lines (registros_jsonl.py).
+
+Usage:
+    python ejecutar_pipeline.py
+    python ejecutar_pipeline.py --force llm
+    python ejecutar_pipeline.py --outputs portal,whatsapp
+    python ejecutar_pipeline.py --format jsonl
+    python ejecutar_pipeline.py --work-dir OUT --portal portal_noticias.html --day 2025-08-27
+    python ejecutar_pipeline.py --dry-run
+
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import date
+
+from procesar_prompts import pending_prompts, read_prompts
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = 'pipeline_estado.json'
+
+class Stage:
+    """
+    One pipeline step: a Python script run with `args`, reading `inputs` and
+    writing `outputs`. `key_extra` adds anything else its result depends on
+    (e.g. the day for the download). A `resumable` stage is rerun with --resume
+    after an interruption instead of from scratch.
+    """
+
+    def __init__(self, name, script, args, inputs=(), outputs=(), deps=(), key_extra='', resumable=False):
+        self.name = name
+        self.script = script
+        self.args = list(args)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.key_extra = key_extra
+        self.resumable = resumable
+
+    def command(self, resume=False):
+        return [sys.executable, os.path.join(HERE, self.script)] + self.args + (['--resume'] if resume else [])
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, deps={self.deps})"
+
+def file_sha256(path):
+    """SHA-256 of a file's content, or None if it does not exist."""
+    if not os.path.isfile(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def stage_key(stage):
+    """Checkpoint key: the command plus the content of every input."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([stage.script, stage.args, stage.key_extra]).encode('utf-8'))
+    for path in stage.inputs:
+        digest.update(f"{path}={file_sha256(path)}".encode('utf-8'))
+    return digest.hexdigest()
+
+def load_state(path):
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+def save_state(path, state):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def is_complete(stage, entry, key):
+    """True if the checkpoint matches the key and every output is still as produced."""
+    if not entry or entry.get('status') != 'ok' or entry.get('key') != key:
+        return False
+    return all(file_sha256(path) == entry.get('outputs', {}).get(path) for path in stage.outputs)
+
+OUTPUTS = ('portal', 'whatsapp')
+
+def build_stages(args):
+    """
+    Pipeline stages up to the merged summaries, plus one renderer per requested
+    output; every output is rendered from the same single LLM pass.
+    """
+    work = args.work_dir
+    ext = '.' + args.format
+    auto = os.path.join(work, 'AutoPapper' + ext)
+    prompts = os.path.join(work, 'Prompts' + ext)
+    processed = os.path.join(work, 'ProcessedPapers' + ext)
+    combined = os.path.join(work, 'PapersCombinados' + ext)
+    cache = os.path.join(work, 'cache_resumenes.db')
+    portal = args.portal or os.path.join(work, 'portal_noticias.html')
+    messages = os.path.join(work, 'WhatsappMensajes.json')
+    metrics = ['--metrics', args.metrics] if args.metrics else []
+
+    download_args = [args.categories, auto] + metrics
+    if args.arxiv_url:
+        download_args += ['--base-url', args.arxiv_url]
+    portal_args = [combined, portal, '--day', args.day] + metrics
+    if args.archive_dir:
+        portal_args += ['--archive-dir', args.archive_dir]
+    stages = [
+        Stage('descargar', 'descargar_papers.py', download_args,
+              inputs=[args.categories], outputs=[auto], key_extra=args.day),
+        Stage('prompts', 'generar_prompts.py', [auto, prompts, '--cache', cache] + metrics,
+              inputs=[auto], outputs=[prompts], deps=['descargar']),
+        Stage('llm', 'procesar_prompts.py', [prompts, processed] + metrics,
+              inputs=[prompts], outputs=[processed], deps=['prompts'], resumable=True),
+        Stage('cache_merge', 'cache_resumenes.py', ['--cache', cache, 'merge', auto, processed, '-o', combined] + metrics,
+              inputs=[auto, processed], outputs=[combined], deps=['llm']),
+        # The cache upkeep and the renderers only need the merged summaries, so they run side by side
+        Stage('cache_evict', 'cache_resumenes.py', ['--cache', cache, 'evict', '--max-age-days', str(args.max_age_days)],
+              deps=['cache_merge'], key_extra=args.day),
+    ]
+    if 'portal' in args.outputs:
+        stages.append(Stage('portal', 'generar_portal.py', portal_args,
+                            inputs=[combined], outputs=[portal], deps=['cache_merge']))
+    if 'whatsapp' in args.outputs:
+        stages.append(Stage('whatsapp', 'generar_whatsapp.py', [combined, messages] + metrics,
+                            inputs=[combined], outputs=[messages], deps=['cache_merge']))
+    return stages
+
+def llm_finished(stage):
+    """The LLM stage is done only when every prompt is in the progress journal."""
+    prompts_csv, output_csv = stage.inputs[0], stage.outputs[0]
+    return not pending_prompts(read_prompts(prompts_csv), output_csv)
+
+def run_stage(stage, resume):
+    """Run one stage as a subprocess; returns (returncode, seconds)."""
+    start = time.perf_counter()
+    result = subprocess.run(stage.command(resume))
+    return result.returncode, time.perf_counter() - start
+
+def run_pipeline(stages, state_path, force=(), parallel=2, dry_run=False):
+    """
+    Run `stages` in dependency order, skipping checkpointed ones and running
+    independent ones concurrently. Forcing a stage also reruns everything
+    downstream of it. Returns True if every stage finished.
+    """
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        for dep in s.deps:
+            if dep not in by_name:
+                raise ValueError(f"la etapa {s.name} depende de una etapa desconocida: {dep}")
+    forced = set(force)
+    changed = True
+    while changed:
+        changed = False
+        for s in stages:
+            if s.name not in forced and forced.intersection(s.deps):
+                forced.add(s.name)
+                changed = True
+
+    state = load_state(state_path)
+    done, failed = set(), set()
+    running = {}
+
+    def launch(pool, stage):
+        key = stage_key(stage)
+        entry = state.get(stage.name)
+        if stage.name not in forced and is_complete(stage, entry, key):
+            print(f"[{stage.name}] sin cambios, se omite")
+            done.add(stage.name)
+            return
+        resume = (stage.resumable and stage.name not in forced and entry is not None
+                  and entry.get('key') == key and entry.get('status') != 'ok')
+        if dry_run:
+            print(f"[{stage.name}] se ejecutaría{' (retomando)' if resume else ''}: {' '.join(stage.command(resume)[1:])}")
+            done.add(stage.name)
+            return
+        print(f"[{stage.name}] {'retomando' if resume else 'ejecutando'}: {' '.join(stage.command(resume)[1:])}")
+        state[stage.name] = {'key': key, 'status': 'running'}
+        save_state(state_path, state)
+        running[pool.submit(run_stage, stage, resume)] = (stage, key)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        while True:
+            settled = len(done | failed)
+            blocked = done | failed | {s.name for s, _ in running.values()}
+            for stage in stages:
+                if stage.name in blocked:
+                    continue
+                if any(dep in failed for dep in stage.deps):
+                    print(f"[{stage.name}] no se ejecuta: falló una etapa anterior", file=sys.stderr)
+                    failed.add(stage.name)
+                elif all(dep in done for dep in stage.deps):
+                    launch(pool, stage)
+            if not running:
+                if len(done | failed) == len(stages):
+                    break
+                if len(done | failed) == settled:
+                    raise ValueError("las dependencias entre etapas forman un ciclo")
+                continue
+            finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                stage, key = running.pop(future)
+                code, seconds = future.result()
+                entry = {'key': key, 'seconds': round(seconds, 3)}
+                if code != 0:
+                    entry['status'] = 'error'
+                    failed.add(stage.name)
+                    print(f"[{stage.name}] ERROR (código {code}) tras {seconds:.1f} s", file=sys.stderr)
+                elif stage.resumable and not llm_finished(stage):
+                    # Downstream stages use what was produced; the next run resumes the rest
+                    entry['status'] = 'partial'
+                    done.add(stage.name)
+                    print(f"[{stage.name}] incompleta tras {seconds:.1f} s; la próxima corrida retoma los prompts pendientes",
+                          file=sys.stderr)
+                else:
+                    entry['status'] = 'ok'
+                    entry['outputs'] = {path: file_sha256(path) for path in stage.outputs}
+                    done.add(stage.name)
+                    print(f"[{stage.name}] completada en {seconds:.1f} s")
+                state[stage.name] = entry
+                save_state(state_path, state)
+    return not failed
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecuta el pipeline completo con checkpoints y reanudación.")
+    parser.add_argument('--categories', default=os.path.join('IN', 'xpaths.csv'), help='CSV de categorías (default IN/xpaths.csv).')
+    parser.add_argument('--arxiv-url', default=None, help='URL base de los listados de arXiv (default la de descargar_papers.py).')
+    parser.add_argument('--work-dir', default='OUT', help='Directorio de archivos intermedios y del estado (default OUT).')
+    parser.add_argument('--format', choices=('csv', 'jsonl'), default='csv',
+                        help='Formato de los archivos intermedios: CSV o JSON Lines tipado (default csv).')
+    parser.add_argument('--outputs', default='portal',
+                        help='Salidas generadas con una sola pasada de IA: portal, whatsapp o portal,whatsapp (default portal).')
+    parser.add_argument('--portal', default=None, help='HTML del portal (default <work-dir>/portal_noticias.html).')
+    parser.add_argument('--archive-dir', default=os.path.join('OUT', 'archivo'), help='Archivo de varios días (default OUT/archivo; "" para omitirlo).')
+    parser.add_argument('--day', default=None, help='Día de la corrida (YYYY-MM-DD, default hoy); un día nuevo vuelve a descargar.')
+    parser.add_argument('--max-age-days', type=float, default=30, help='Antigüedad máxima de las entradas del cache (default 30).')
+    parser.add_argument('--metrics', default=None, help='Reporte JSON de métricas (default <work-dir>/metricas.json; "" para omitirlo).')
+    parser.add_argument('--force', action='append', default=[], metavar='ETAPA',
+                        help='Volver a ejecutar una etapa y las que dependen de ella (se puede repetir).')
+    parser.add_argument('--parallel', type=int, default=2, help='Etapas independientes ejecutadas a la vez (default 2).')
+    parser.add_argument('--dry-run', action='store_true', help='Solo mostrar qué etapas se ejecutarían.')
+    args = parser.parse_args()
+
+    args.day = args.day or date.today().isoformat()
+    if args.metrics is None:
+        args.metrics = os.path.join(args.work_dir, 'metricas.json')
+    os.makedirs(args.work_dir, exist_ok=True)
+
+    args.outputs = [o.strip() for o in args.outputs.split(',') if o.strip()]
+    if not args.outputs or set(args.outputs) - set(OUTPUTS):
+        print(f"Error: --outputs acepta {', '.join(OUTPUTS)} (separados por comas)", file=sys.stderr)
+        sys.exit(1)
+
+    stages = build_stages(args)
+    unknown = set(args.force) - {s.name for s in stages}
+    if unknown:
+        print(f"Error: etapas desconocidas: {', '.join(sorted(unknown))} "
+              f"(disponibles: {', '.join(s.name for s in stages)})", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    ok = run_pipeline(stages, os.path.join(args.work_dir, STATE_FILE), force=args.force,
+                      parallel=args.parallel, dry_run=args.dry_run)
+    print(f"Pipeline {'completado' if ok else 'con errores'} en {time.perf_counter() - start:.1f} s")
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
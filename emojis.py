@@ -0,0 +1,86 @@
+"""
+emojis.py
+
+Recognizes the emoji the LLM puts at the start of a title as a whole grapheme
+cluster: a pictographic base followed by its variation selector (🏔️, ⚗️), skin tone
+(👍🏽), keycap (1️⃣) or tag sequence, ZWJ sequences (👩‍🔬) and flag pairs (🇦🇷).
+Characters are classified with prebuilt lookup tables, so matching costs
+O(length of the emoji) no matter how long the title is.
+
+Usage:
+    emoji, rest = split_leading_emoji('⚗️ Síntesis de materiales')   # ('⚗️', 'Síntesis de materiales')
+    emoji, rest = split_leading_emoji('Sin emoji')                   # ('📄', 'Sin emoji')
+
+"""
+
+DEFAULT_EMOJI = "📄"
+
+# Code point ranges of pictographic characters that can start an emoji
+_PICTOGRAPHIC_RANGES = (
+    (0x00A9, 0x00A9), (0x00AE, 0x00AE), (0x203C, 0x203C), (0x2049, 0x2049),
+    (0x2122, 0x2122), (0x2139, 0x2139), (0x2194, 0x2199), (0x21A9, 0x21AA),
+    (0x231A, 0x231B), (0x2328, 0x2328), (0x23CF, 0x23CF), (0x23E9, 0x23F3),
+    (0x23F8, 0x23FA), (0x24C2, 0x24C2), (0x25AA, 0x25AB), (0x25B6, 0x25B6),
+    (0x25C0, 0x25C0), (0x25FB, 0x25FE), (0x2600, 0x27BF), (0x2934, 0x2935),
+    (0x2B05, 0x2B07), (0x2B1B, 0x2B1C), (0x2B50, 0x2B50), (0x2B55, 0x2B55),
+    (0x3030, 0x3030), (0x303D, 0x303D), (0x3297, 0x3297), (0x3299, 0x3299),
+    (0x1F000, 0x1FAFF),
+)
+# Prebuilt lookup tables (a few thousand characters) so each check is one set probe
+_PICTOGRAPHIC = frozenset(chr(cp) for start, end in _PICTOGRAPHIC_RANGES for cp in range(start, end + 1))
+# Variation selectors, keycap, skin tones and tag characters that extend a cluster
+_EXTENDERS = frozenset(chr(cp) for cp in (0xFE0E, 0xFE0F, 0x20E3, *range(0x1F3FB, 0x1F400),
+                                          *range(0xE0020, 0xE0080)))
+
+_ZWJ = '\u200d'
+_KEYCAP = '\u20e3'
+_VS16 = '\ufe0f'
+_KEYCAP_BASES = frozenset('0123456789#*')
+# Symbols common in plain text (©, ®, ™, ...) are emoji only with VS16
+_TEXT_DEFAULT = frozenset('\u00a9\u00ae\u203c\u2049\u2122\u2139')
+_REGIONAL_INDICATORS = frozenset(chr(cp) for cp in range(0x1F1E6, 0x1F200))
+
+def is_pictographic(ch):
+    """True if `ch` can start an emoji."""
+    return ch in _PICTOGRAPHIC
+
+def leading_emoji_length(text):
+    """Length in code points of the emoji cluster at the start of `text` (0 if none)."""
+    n = len(text)
+    if not n:
+        return 0
+    first = text[0]
+    if first in _REGIONAL_INDICATORS:
+        # Flags are pairs of regional indicators
+        return 2 if n > 1 and text[1] in _REGIONAL_INDICATORS else 1
+    if first in _KEYCAP_BASES:
+        i = 2 if n > 1 and text[1] == _VS16 else 1
+        return i + 1 if i < n and text[i] == _KEYCAP else 0
+    if first in _TEXT_DEFAULT and (n < 2 or text[1] != _VS16):
+        return 0
+
+    i = end = 0
+    while i < n and text[i] in _PICTOGRAPHIC:
+        i += 1
+        while i < n and text[i] in _EXTENDERS:
+            i += 1
+        end = i
+        # A zero-width joiner glues the next pictograph into the same cluster
+        if i + 1 < n and text[i] == _ZWJ:
+            i += 1
+            continue
+        break
+    return end
+
+def split_leading_emoji(title, default=DEFAULT_EMOJI):
+    """
+    Split a title into (emoji, rest). Titles without a leading emoji get `default`
+    and are returned unchanged; an empty title gives ("", title).
+    """
+    if not title:
+        return "", title
+    stripped = title.lstrip()
+    length = leading_emoji_length(stripped)
+    if not length:
+        return default, title
+    return stripped[:length], stripped[length:].strip()
@@ -0,0 +1,177 @@
+"""
+envio_whatsapp.py
+
+Pluggable delivery of the WhatsApp messages rendered by generar_whatsapp.py.
+A sender only has to implement send(message); deliver() adds retries with
+exponential backoff and tracks throughput, so backends can be swapped freely:
+
+- TagUIQueueSender: writes the JSON queue that EnviarWhatsapp.tag types into
+  WhatsApp Web (the default, no API needed).
+- WebhookSender: POSTs each message as JSON to an HTTP gateway, over the pooled
+  client of cliente_http.py.
+- FileSender: appends the messages to a local text file, to try the formatting
+  or stand in for WhatsApp in tests.
+
+Usage:
+    with FileSender('OUT/whatsapp.txt') as sender:
+        stats = deliver(messages, sender, retries=3)
+    print(stats['sent'], stats['messages_per_second'])
+
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from abc import ABC, abstractmethod
+
+from cliente_http import HttpClient
+
+MESSAGE_SEPARATOR = '\n' + '=' * 40 + '\n'
+# Histogram bounds in seconds for a single send (file writes take microseconds, gateways seconds)
+SEND_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30)
+
+class SendError(Exception):
+    """A failed send; `retryable` ones (rate limits, server or network errors) are retried."""
+
+    def __init__(self, message, retryable=True, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+class Sender(ABC):
+    """
+    Base class of the delivery backends; usable as a context manager. A backend
+    without send() cannot be instantiated, so it fails before any message goes out.
+    """
+
+    name = 'sender'
+
+    @abstractmethod
+    def send(self, message):
+        """Deliver one message; raise SendError on failure."""
+
+    def close(self):
+        """Flush and release whatever the backend holds."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+class FileSender(Sender):
+    """Appends every message to a text file, separated by a rule line."""
+
+    name = 'file'
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.f = open(path, 'a', encoding='utf-8')
+
+    def send(self, message):
+        self.f.write(message + MESSAGE_SEPARATOR)
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+class TagUIQueueSender(Sender):
+    """Collects the messages and writes the JSON array EnviarWhatsapp.tag sends (atomically, on close)."""
+
+    name = 'tagui'
+
+    def __init__(self, path):
+        self.path = path
+        self.messages = []
+
+    def send(self, message):
+        self.messages.append(message)
+
+    def close(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.messages, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+class WebhookSender(Sender):
+    """
+    POSTs {"<field>": message} to a WhatsApp gateway URL. The optional token is
+    sent as a bearer Authorization header.
+    """
+
+    name = 'webhook'
+
+    def __init__(self, url, token=None, field='text', timeout=30, http=None):
+        self.url = url
+        self.field = field
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json'}
+        if token:
+            self.headers['Authorization'] = f"Bearer {token}"
+        self._own_http = http is None
+        self.http = http or HttpClient(max_per_host=1, timeout=timeout)
+
+    def send(self, message):
+        body = json.dumps({self.field: message}, ensure_ascii=False)
+        try:
+            response = self.http.post(self.url, body, headers=self.headers, timeout=self.timeout)
+        except OSError as e:
+            raise SendError(f"error de red: {e}") from e
+        if response.status == 429 or response.status >= 500:
+            retry_after = response.headers.get('Retry-After')
+            raise SendError(f"HTTP {response.status}",
+                            retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None)
+        if response.status >= 400:
+            raise SendError(f"HTTP {response.status} {response.reason}", retryable=False)
+
+    def close(self):
+        if self._own_http:
+            self.http.close()
+
+def deliver(messages, sender, retries=3, backoff=1.0, metrics=None):
+    """
+    Send every message in order through `sender`, retrying retryable failures with
+    exponential backoff and jitter. A message that still fails is counted and
+    skipped. Returns a stats dict (sent, failed, retries, chars, seconds,
+    messages_per_second).
+    """
+    stats = {'sent': 0, 'failed': 0, 'retries': 0, 'chars': 0}
+    start = time.perf_counter()
+    for number, message in enumerate(messages, start=1):
+        attempt = 0
+        while True:
+            attempt += 1
+            send_start = time.perf_counter()
+            try:
+                sender.send(message)
+            except SendError as e:
+                if not e.retryable or attempt > retries:
+                    stats['failed'] += 1
+                    print(f"Mensaje {number}: ERROR ({e})", file=sys.stderr)
+                    break
+                stats['retries'] += 1
+                delay = e.retry_after or backoff * (2 ** (attempt - 1))
+                delay += random.uniform(0, backoff)
+                print(f"  Reintento {attempt}/{retries} del mensaje {number} en {delay:.1f} s: {e}", file=sys.stderr)
+                time.sleep(delay)
+                continue
+            if metrics is not None:
+                metrics.observe('send_seconds', time.perf_counter() - send_start, SEND_BUCKETS)
+            stats['sent'] += 1
+            stats['chars'] += len(message)
+            break
+    stats['seconds'] = time.perf_counter() - start
+    stats['messages_per_second'] = stats['sent'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+    if metrics is not None:
+        metrics.set('rows_out', stats['sent'])
+        metrics.set('errors', stats['failed'])
+        metrics.set('retries', stats['retries'])
+    return stats
@@ -4,10 +4,28 @@ generar_portal.py
 
 Generates a news portal HTML from a CSV containing processed papers.
 Handles duplicated headers and produces a modern dark-themed site (YouTube Music style).
+A typed JSON Lines input (.jsonl, see registros_jsonl.py) is read without any header guessing.
+The page is streamed to the output file fragment by fragment, so large archives
+render in linear time without holding the whole document in memory.
+
+With --archive-dir the papers are also added as one day of a multi-day archive:
+a manifest, per-day and per-category pages and an index. Only the new day's
+pages are rendered, and a day whose input file did not change is skipped.
+Archives (and single pages with --search-index) get a client-side full-text
+search index, see indice_busqueda.py.
+
+The stylesheet and script shared by every page are written once as minified,
+content-hashed files in an 'assets' folder (see recursos_estaticos.py), and
+every page and asset gets precompressed .gz (and .br) siblings for static
+servers. --inline-assets keeps self-contained pages with the CSS and JS inline.
 
 Usage:
     python generar_portal.py input.csv output.html
     python generar_portal.py OUT/ProcessedPapers.csv portal_noticias.html
+    python generar_portal.py OUT/ProcessedPapers.csv portal_noticias.html --archive-dir OUT/archivo
+    python generar_portal.py OUT/ProcessedPapers.csv OUT/portal_noticias.html --search-index
+    python generar_portal.py OUT/ProcessedPapers.jsonl portal_noticias.html
+    python generar_portal.py OUT/ProcessedPapers.csv portal_noticias.html --inline-assets --no-precompress
 
 """
 
@@ -15,10 +33,21 @@ import csv
 import argparse
 import os
 import sys
+import hashlib
 import html
+import json
 import re
-from datetime import datetime
-from collections import defaultdict
+import unicodedata
+from datetime import date, datetime
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+import arxiv_ids
+import registros_jsonl
+from emojis import DEFAULT_EMOJI, split_leading_emoji
+from indice_busqueda import SearchIndex
+from recursos_estaticos import ASSETS_DIR, minify_css, minify_js, precompress, write_asset
+import telemetria
 
 def clean_text(text):
     """Clean and sanitize text for inclusion in HTML."""
@@ -29,11 +58,19 @@ def clean_text(text):
     # Preserve emojis and basic formatting
     return text.strip()
 
+@lru_cache(maxsize=1 << 16)
 def clean_url(url):
-    """Clean and validate URLs to ensure they are absolute and well-formed."""
+    """
+    Clean and validate URLs to ensure they are absolute and well-formed.
+    arXiv links, however mangled, are rebuilt from their parsed identifier.
+    """
     if not url:
         return ""
     
+    ref = arxiv_ids.parse(url)
+    if ref is not None:
+        return ref.url(arxiv_ids.link_kind(url))
+
     url = url.strip()
     
     # Remove problematic prefixes and malformed URL patterns (e.g. xn--)
@@ -80,33 +117,73 @@ def clean_url(url):
     return url
 
 def extract_emoji_from_title(title):
-    """Extract emoji from the start of a title if present, otherwise return a default."""
-    if not title:
-        return "", title
+    """Extract the emoji cluster from the start of a title if present, otherwise return a default."""
+    return split_leading_emoji(title)
 
-    # Search for emoji at the start of the title
-    emoji_pattern = r'^([🔬🤖💻🔒🧬🏥📊🔍🎯🌊📐💼🧠🤝💡🔧🚇📶🔬🆔🧮🎨🎵🎮🎪🎭🎨🎯🎲🎪🎭🏆🏅🏏🏀⚽🏈🎾🏸🏓🏑🏒🥅⛳🏹🎣🥊🥋🏔️⛰️🏕️🏜️🏝️🏟️🏛️🏗️🏘️🏚️🏠🏡🏢🏣🏤🏥🏦🏧🏨🏩🏪🏫🏬🏭🏮🏯🏰🗼🗽⛪🕌🕍🕎🔬🔭🔬🧪🧬⚗️🔬🧮🧲⚡🔋🔌💻⌨️🖥️🖨️🖱️💿💾💽📀🧮💾🔌⚡🔋🔬🧪🧬⚗️🔬🧮🧲⚡🔋])\s*(.*)$'
-    
-    match = re.match(emoji_pattern, title)
-    if match:
-        return match.group(1), match.group(2).strip()
-    
-    return "📄", title  # Default emoji
+class Paper:
+    """
+    One paper of the portal. Slots instead of a per-paper dict, plus category tuples
+    shared between papers, keep archive-sized lists small.
+    """
+
+    __slots__ = ('title', 'emoji', 'summary', 'points', 'link', 'arxiv_id', 'date', 'categories')
+
+    def __init__(self, title, emoji, summary, points, link, arxiv_id, date, categories):
+        self.title = title
+        self.emoji = emoji
+        self.summary = summary
+        self.points = points
+        self.link = link
+        self.arxiv_id = arxiv_id
+        self.date = date
+        self.categories = categories
+
+    @property
+    def category(self):
+        """Primary category (the first one of a cross-listed paper)."""
+        return self.categories[0]
+
+    def __repr__(self):
+        return f"Paper({self.arxiv_id or self.link!r}, {self.title[:40]!r})"
+
+def parse_categories(category):
+    """Tuple of interned category names from a 'categoria' cell ('📂 A; 📂 B')."""
+    # Use the categories directly from the CSV, cleaning the emoji prefix if present.
+    # Cross-listed papers carry several categories separated by ';'
+    paper_categories = []
+    for part in category.split(';'):
+        part = part.strip()
+        if part.startswith("📂"):
+            part = part[1:].strip()  # Remove emoji prefix
+        if part and part not in paper_categories:
+            paper_categories.append(sys.intern(part))
+    if not paper_categories:
+        paper_categories = ["Otros"]  # Default category if empty
+    return tuple(paper_categories)
 
 def process_csv_robust(filepath):
-    """Process the CSV robustly, handling duplicated header rows and noisy data."""
+    """
+    Process the CSV robustly, handling duplicated header rows and noisy data.
+    A typed .jsonl file needs no header guessing: its header names the columns.
+    """
     papers = []
-    headers_found = set()
+    # The same categoria cell repeats across many rows: parse it once and share the tuple
+    categories_by_cell = {}
+    cleaned_urls = 0
     
     with open(filepath, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        
-        # Find the first row that appears to be a valid header row
-        headers = None
-        for row in reader:
-            if len(row) >= 4 and any(col.lower() in ['titulo', 'title', 'resumen', 'summary'] for col in row):
-                headers = row
-                break
+        if registros_jsonl.is_jsonl(filepath):
+            headers = list(registros_jsonl.SCHEMAS['procesados'])
+            reader = registros_jsonl.read_values(filepath, 'procesados')
+        else:
+            reader = csv.reader(f)
+            
+            # Find the first row that appears to be a valid header row
+            headers = None
+            for row in reader:
+                if len(row) >= 4 and any(col.lower() in ['titulo', 'title', 'resumen', 'summary'] for col in row):
+                    headers = row
+                    break
         
         if not headers:
             print("No se encontraron headers válidos en el CSV", file=sys.stderr)
@@ -148,27 +225,28 @@ def process_csv_robust(filepath):
                 # Extract emoji from title (keep for visual appeal but don't use for categorization)
                 emoji, clean_title = extract_emoji_from_title(title)
                 
-                # Use the category directly from the CSV, clean emoji prefix if present
-                if category.startswith("📂 "):
-                    category = category[2:].strip()  # Remove emoji and space prefix
-                elif not category.strip():
-                    category = "Otros"  # Default category if empty
+                paper_categories = categories_by_cell.get(category)
+                if paper_categories is None:
+                    paper_categories = categories_by_cell[category] = parse_categories(category)
                 
-                # Debug: print cleaned URLs for problematic inputs
+                # Debug: print the first cleaned URLs for problematic inputs, then only count them
                 original_link = link.strip()
                 cleaned_link = clean_url(original_link)
                 if original_link != cleaned_link:
-                    print(f"URL limpiada: '{original_link}' → '{cleaned_link}'")
+                    cleaned_urls += 1
+                    if cleaned_urls <= 5:
+                        print(f"URL limpiada: '{original_link}' → '{cleaned_link}'")
                 
-                paper = {
-                    'title': clean_text(clean_title),
-                    'emoji': emoji,
-                    'summary': clean_text(summary),
-                    'points': clean_text(points),
-                    'link': cleaned_link,
-                    'date': date.strip(),
-                    'category': category.strip()
-                }
+                paper = Paper(
+                    title=clean_text(clean_title),
+                    emoji=sys.intern(emoji),
+                    summary=clean_text(summary),
+                    points=clean_text(points),
+                    link=cleaned_link,
+                    arxiv_id=arxiv_ids.canonical_arxiv_id(original_link),
+                    date=sys.intern(date.strip()),
+                    categories=paper_categories,
+                )
                 
                 papers.append(paper)
                 
@@ -176,59 +254,42 @@ def process_csv_robust(filepath):
                 print(f"Error processing row: {row[:3]}... - {e}", file=sys.stderr)
                 continue
     
+    if cleaned_urls > 5:
+        print(f"... {cleaned_urls} URLs limpiadas en total")
     print(f"Procesados {len(papers)} papers válidos")
     return papers
 
-def generate_html(papers, output_file):
-    """Generate the portal HTML from the processed papers list."""
-    
-    # Group papers by category
-    categories = defaultdict(list)
-    for paper in papers:
-        categories[paper['category']].append(paper)
-    
-    # Sort categories by number of papers (descending)
-    sorted_categories = sorted(categories.items(), key=lambda x: len(x[1]), reverse=True)
-    
-    current_date = datetime.now().strftime("%d de %B de %Y")
-    total_papers = len(papers)
-    
-    html_content = f"""<!DOCTYPE html>
-<html lang="es">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Papper news</title>
-    <style>
-        * {{
+# Stylesheet and script of the portal page, written verbatim (no per-run values inside)
+PORTAL_CSS = """
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: linear-gradient(135deg, #0f0f0f 0%, #1a1a1a 100%);
             color: #ffffff;
             line-height: 1.6;
             min-height: 100vh;
-        }}
+        }
         
-        .header {{
+        .header {
             background: linear-gradient(135deg, #1e1e1e 0%, #2d2d2d 100%);
             padding: 2rem 0;
             box-shadow: 0 4px 20px rgba(0,0,0,0.3);
             border-bottom: 2px solid #333;
-        }}
+        }
         
-        .header-content {{
+        .header-content {
             max-width: 1200px;
             margin: 0 auto;
             padding: 0 2rem;
             text-align: center;
-        }}
+        }
         
-        h1 {{
+        h1 {
             font-size: 2.5rem;
             font-weight: 700;
             background: linear-gradient(45deg, #ff6b6b, #4ecdc4, #45b7d1, #96ceb4);
@@ -238,61 +299,61 @@ def generate_html(papers, output_file):
             background-clip: text;
             animation: gradientShift 3s ease-in-out infinite;
             margin-bottom: 0.5rem;
-        }}
+        }
         
-        @keyframes gradientShift {{
-            0%, 100% {{ background-position: 0% 50%; }}
-            50% {{ background-position: 100% 50%; }}
-        }}
+        @keyframes gradientShift {
+            0%, 100% { background-position: 0% 50%; }
+            50% { background-position: 100% 50%; }
+        }
         
-        .subtitle {{
+        .subtitle {
             font-size: 1.1rem;
             color: #b3b3b3;
             font-weight: 300;
-        }}
+        }
         
-        .stats {{
+        .stats {
             margin: 1.5rem 0;
             display: flex;
             gap: 2rem;
             justify-content: center;
             flex-wrap: wrap;
-        }}
+        }
         
-        .stat-item {{
+        .stat-item {
             background: rgba(255,255,255,0.1);
             padding: 0.5rem 1rem;
             border-radius: 20px;
             backdrop-filter: blur(10px);
             border: 1px solid rgba(255,255,255,0.1);
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             padding: 2rem;
-        }}
+        }
         
-        .category {{
+        .category {
             margin-bottom: 3rem;
-        }}
+        }
         
-        .category-header {{
+        .category-header {
             display: flex;
             align-items: center;
             margin-bottom: 1.5rem;
             padding-bottom: 0.5rem;
             border-bottom: 2px solid #333;
-        }}
+        }
         
-        .category-title {{
+        .category-title {
             font-size: 1.5rem;
             font-weight: 600;
             color: #ffffff;
             margin-left: 0.5rem;
-        }}
+        }
         
-        .category-count {{
+        .category-count {
             background: linear-gradient(45deg, #ff6b6b, #4ecdc4);
             color: white;
             padding: 0.25rem 0.75rem;
@@ -300,15 +361,15 @@ def generate_html(papers, output_file):
             font-size: 0.9rem;
             font-weight: 600;
             margin-left: auto;
-        }}
+        }
         
-        .papers-grid {{
+        .papers-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
             gap: 1.5rem;
-        }}
+        }
         
-        .paper-card {{
+        .paper-card {
             background: linear-gradient(135deg, #1e1e1e 0%, #2a2a2a 100%);
             border-radius: 12px;
             padding: 1.5rem;
@@ -317,9 +378,9 @@ def generate_html(papers, output_file):
             transition: all 0.3s ease;
             position: relative;
             overflow: hidden;
-        }}
+        }
         
-        .paper-card::before {{
+        .paper-card::before {
             content: '';
             position: absolute;
             top: 0;
@@ -329,36 +390,36 @@ def generate_html(papers, output_file):
             background: linear-gradient(90deg, #ff6b6b, #4ecdc4, #45b7d1, #96ceb4);
             background-size: 400% 400%;
             animation: gradientShift 3s ease-in-out infinite;
-        }}
+        }
         
-        .paper-card:hover {{
+        .paper-card:hover {
             transform: translateY(-5px);
             box-shadow: 0 12px 40px rgba(0,0,0,0.4);
             border-color: rgba(255,255,255,0.2);
-        }}
+        }
         
-        .paper-emoji {{
+        .paper-emoji {
             font-size: 2rem;
             margin-bottom: 1rem;
             display: block;
-        }}
+        }
         
-        .paper-title {{
+        .paper-title {
             font-size: 1.2rem;
             font-weight: 600;
             color: #ffffff;
             margin-bottom: 1rem;
             line-height: 1.4;
-        }}
+        }
         
-        .paper-summary {{
+        .paper-summary {
             color: #b3b3b3;
             margin-bottom: 1rem;
             font-size: 0.95rem;
             line-height: 1.5;
-        }}
+        }
         
-        .paper-points {{
+        .paper-points {
             color: #d4d4d4;
             margin-bottom: 1.5rem;
             font-size: 0.9rem;
@@ -366,16 +427,16 @@ def generate_html(papers, output_file):
             padding: 1rem;
             border-radius: 8px;
             border-left: 3px solid #4ecdc4;
-        }}
+        }
         
-        .paper-footer {{
+        .paper-footer {
             display: flex;
             justify-content: space-between;
             align-items: center;
             margin-top: auto;
-        }}
+        }
         
-        .paper-link {{
+        .paper-link {
             background: linear-gradient(45deg, #ff6b6b, #4ecdc4);
             color: white;
             text-decoration: none;
@@ -387,44 +448,44 @@ def generate_html(papers, output_file):
             display: inline-flex;
             align-items: center;
             gap: 0.5rem;
-        }}
+        }
         
-        .paper-link:hover {{
+        .paper-link:hover {
             transform: scale(1.05);
             box-shadow: 0 4px 15px rgba(255,107,107,0.3);
-        }}
+        }
         
-        .paper-date {{
+        .paper-date {
             color: #888;
             font-size: 0.8rem;
-        }}
+        }
         
-        .footer {{
+        .footer {
             background: #1e1e1e;
             padding: 2rem;
             text-align: center;
             margin-top: 3rem;
             border-top: 2px solid #333;
-        }}
+        }
         
-        .footer p {{
+        .footer p {
             color: #b3b3b3;
-        }}
+        }
         
         /* Filter Section Layout */
-        .filter-section {{
+        .filter-section {
             max-width: 1200px;
             margin: 0 auto;
             padding: 1rem 2rem;
-        }}
+        }
         
         /* Filter Dropdown Styles */
-        .dropdown {{
+        .dropdown {
             position: relative;
             display: inline-block;
-        }}
+        }
         
-        .dropdown-toggle {{
+        .dropdown-toggle {
             background: #2a2a2a;
             color: #ffffff;
             border: 1px solid #404040;
@@ -434,25 +495,25 @@ def generate_html(papers, output_file):
             border-radius: 6px;
             cursor: pointer;
             transition: all 0.2s ease;
-        }}
+        }
         
-        .dropdown-toggle:hover {{
+        .dropdown-toggle:hover {
             background: #3a3a3a;
             border-color: #505050;
-        }}
+        }
         
-        .dropdown-toggle::after {{
+        .dropdown-toggle::after {
             content: "▼";
             margin-left: 8px;
             font-size: 0.7rem;
             transition: transform 0.2s ease;
-        }}
+        }
         
-        .dropdown.open .dropdown-toggle::after {{
+        .dropdown.open .dropdown-toggle::after {
             transform: rotate(180deg);
-        }}
+        }
         
-        .dropdown-menu {{
+        .dropdown-menu {
             position: absolute;
             top: 100%;
             left: 0;
@@ -468,15 +529,15 @@ def generate_html(papers, output_file):
             transition: all 0.2s ease;
             max-height: 250px;
             overflow-y: auto;
-        }}
+        }
         
-        .dropdown.open .dropdown-menu {{
+        .dropdown.open .dropdown-menu {
             opacity: 1;
             visibility: visible;
             transform: translateY(0);
-        }}
+        }
         
-        .dropdown-item {{
+        .dropdown-item {
             display: block;
             padding: 8px 12px;
             color: #ffffff;
@@ -488,49 +549,49 @@ def generate_html(papers, output_file):
             text-align: left;
             cursor: pointer;
             font-size: 0.9rem;
-        }}
+        }
         
-        .dropdown-item:hover {{
+        .dropdown-item:hover {
             background: #3a3a3a;
-        }}
+        }
         
-        .dropdown-item.active {{
+        .dropdown-item.active {
             background: #3a3a3a;
             color: #ffffff;
-        }}
+        }
         
-        .papers-count {{
+        .papers-count {
             margin: 0.5rem 0;
             color: #b3b3b3;
             font-size: 0.85rem;
             text-align: center;
-        }}
+        }
         
-        @media (max-width: 768px) {{
-            .container {{
+        @media (max-width: 768px) {
+            .container {
                 padding: 1rem;
-            }}
+            }
             
-            .filter-section {{
+            .filter-section {
                 text-align: center;
                 padding: 1rem;
-            }}
+            }
             
-            .stats {{
+            .stats {
                 gap: 1rem;
                 flex-wrap: wrap;
-            }}
+            }
             
-            h1 {{
+            h1 {
                 font-size: 2rem;
-            }}
+            }
             
-            .papers-grid {{
+            .papers-grid {
                 grid-template-columns: 1fr;
-            }}
-        }}
+            }
+        }
         
-        .scroll-top {{
+        .scroll-top {
             position: fixed;
             bottom: 2rem;
             right: 2rem;
@@ -546,19 +607,116 @@ def generate_html(papers, output_file):
             transition: all 0.3s ease;
             opacity: 0;
             visibility: hidden;
-        }}
+        }
         
-        .scroll-top.visible {{
+        .scroll-top.visible {
             opacity: 1;
             visibility: visible;
-        }}
+        }
         
-        .scroll-top:hover {{
+        .scroll-top:hover {
             transform: scale(1.1);
-        }}
-    </style>
-</head>
-<body>
+        }
+"""
+
+PORTAL_JS = """
+        // Mostrar botón de scroll to top
+        window.addEventListener('scroll', function() {
+            const scrollTop = document.querySelector('.scroll-top');
+            if (window.pageYOffset > 300) {
+                scrollTop.classList.add('visible');
+            } else {
+                scrollTop.classList.remove('visible');
+            }
+        });
+
+        // Función para scroll to top
+        function scrollToTop() {
+            window.scrollTo({
+                top: 0,
+                behavior: 'smooth'
+            });
+        }
+
+        // Animación de entrada para las tarjetas
+        const observer = new IntersectionObserver((entries) => {
+            entries.forEach((entry) => {
+                if (entry.isIntersecting) {
+                    entry.target.style.opacity = '1';
+                    entry.target.style.transform = 'translateY(0)';
+                }
+            });
+        });
+
+        document.querySelectorAll('.paper-card').forEach((card) => {
+            card.style.opacity = '0';
+            card.style.transform = 'translateY(20px)';
+            card.style.transition = 'opacity 0.6s ease, transform 0.6s ease';
+            observer.observe(card);
+        });
+
+        // Dropdown functionality
+        const dropdown = document.getElementById('categoryDropdown');
+        const dropdownToggle = dropdown.querySelector('.dropdown-toggle');
+        const categories = document.querySelectorAll('.category');
+        const papersCount = document.getElementById('papersCount');
+        
+        dropdownToggle.addEventListener('click', function() {
+            dropdown.classList.toggle('open');
+        });
+
+        function filterByCategory(category) {
+            const dropdownItems = document.querySelectorAll('.dropdown-item');
+            dropdownItems.forEach(item => item.classList.remove('active'));
+            event.target.classList.add('active');
+            
+            if (category === 'all') {
+                categories.forEach(cat => cat.style.display = 'block');
+                dropdownToggle.textContent = 'Filtrar por categoría';
+                papersCount.textContent = `Mostrando ${document.body.dataset.totalPapers} papers en ${document.body.dataset.totalCategories} categorías`;
+            } else {
+                let visiblePapers = 0;
+                categories.forEach(cat => {
+                    if (cat.dataset.category === category) {
+                        cat.style.display = 'block';
+                        visiblePapers += cat.querySelectorAll('.paper-card').length;
+                    } else {
+                        cat.style.display = 'none';
+                    }
+                });
+                dropdownToggle.textContent = category;
+                papersCount.textContent = `Mostrando ${visiblePapers} papers en 1 categoría`;
+            }
+            dropdown.classList.remove('open');
+        }
+
+        // Close dropdown when clicking outside
+        document.addEventListener('click', function(e) {
+            if (!dropdown.contains(e.target)) {
+                dropdown.classList.remove('open');
+            }
+        });
+"""
+
+# Page fragments; the per-run values are filled with str.format
+_PAGE_HEAD = """<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Papper news</title>
+"""
+
+_STYLE_OPEN = """    <style>"""
+
+_STYLE_CLOSE = """    </style>
+"""
+
+_STYLESHEET = """    <link rel="stylesheet" href="{href}">
+"""
+
+_PAGE_HEADER = """</head>
+<body data-total-papers="{total_papers}" data-total-categories="{total_categories}">
     <header class="header">
         <div class="header-content">
             <h1>🔬 ArXiv Daily Portal</h1>
@@ -566,7 +724,7 @@ def generate_html(papers, output_file):
             <div class="stats">
                 <div class="stat-item">📊 {total_papers} Papers</div>
                 <div class="stat-item">📅 {current_date}</div>
-                <div class="stat-item">🏷️ {len(sorted_categories)} Categorías</div>
+                <div class="stat-item">🏷️ {total_categories} Categorías</div>
             </div>
 
         </div>
@@ -580,68 +738,98 @@ def generate_html(papers, output_file):
             <div class="dropdown-menu">
                 <button class="dropdown-item" onclick="filterByCategory('all')">Mostrar todas</button>"""
 
-    # Add category options to dropdown (simplified)
-    for category_name, category_papers in sorted_categories:
-        html_content += f"""
-                <button class="dropdown-item" onclick="filterByCategory('{category_name}')">{category_name}</button>"""
+_DROPDOWN_ITEM = """
+                <button class="dropdown-item" onclick="filterByCategory('{name}')">{name}</button>"""
 
-    html_content += f"""
+_DROPDOWN_CLOSE = """
             </div>
         </div>
-    </section>
+"""
+
+_MAIN_OPEN = """    </section>
 
     <main class="container">
 """
 
-    # Render content for each category
-    for category_name, category_papers in sorted_categories:
-        # Get the most common emoji in the category
-        category_emoji = get_category_emoji(category_papers)
+# Search box, styles and script tag added when the page has a search index
+SEARCH_CSS = """
+        .search-box {
+            margin-top: 1rem;
+            position: relative;
+        }
+        
+        .search-box input {
+            width: 100%;
+            background: #2a2a2a;
+            color: #ffffff;
+            border: 1px solid #404040;
+            padding: 8px 16px;
+            font-size: 0.95rem;
+            border-radius: 6px;
+        }
+        
+        .search-results {
+            margin-top: 0.5rem;
+        }
+        
+        .search-result {
+            padding: 0.5rem 0;
+            border-bottom: 1px solid #333;
+        }
+        
+        .search-result a {
+            color: #ffffff;
+            text-decoration: none;
+            display: block;
+        }
         
-        html_content += f"""
-        <section class="category" data-category="{category_name}">
+        .search-result .search-meta {
+            color: #888;
+            font-size: 0.8rem;
+        }
+"""
+
+_SEARCH_BOX = """        <div class="search-box">
+            <input type="search" id="searchInput" placeholder="Buscar papers..." autocomplete="off">
+            <div id="searchResults" class="search-results"></div>
+        </div>
+"""
+
+_SEARCH_SCRIPT = """    <script src="{index}buscar.js" data-index="{index}" data-root="{root}" defer></script>
+"""
+
+_SECTION_OPEN = """
+        <section class="category" data-category="{name}">
             <div class="category-header">
-                <span style="font-size: 1.5rem;">{category_emoji}</span>
-                <h2 class="category-title">{category_name}</h2>
-                <span class="category-count">{len(category_papers)}</span>
+                <span style="font-size: 1.5rem;">{emoji}</span>
+                <h2 class="category-title">{name}</h2>
+                <span class="category-count">{count}</span>
             </div>
             
             <div class="papers-grid">
 """
-        
-        for paper in category_papers:
-            # Clean and format key points for display
-            points_formatted = paper['points'].replace('🎯', '').strip()
-            if not points_formatted.startswith('•'):
-                # Convert commas to bullets if not already present
-                points_formatted = '• ' + points_formatted.replace(',', '\n• ').replace(';', '\n• ')
-            
-            # Ensure the link is valid for the anchor
-            paper_link = clean_url(paper['link'])
-            if not paper_link or not ('http' in paper_link and '.' in paper_link):
-                paper_link = "#"  # Enlace placeholder si no es válido
-            
-            html_content += f"""
+
+_SECTION_CLOSE = """
+            </div>
+        </section>
+"""
+
+_CARD = """
                 <article class="paper-card">
-                    <span class="paper-emoji">{paper['emoji']}</span>
-                    <h3 class="paper-title">{paper['title']}</h3>
-                    <p class="paper-summary">{paper['summary']}</p>
-                    <div class="paper-points">{points_formatted}</div>
+                    <span class="paper-emoji">{emoji}</span>
+                    <h3 class="paper-title">{title}</h3>
+                    <p class="paper-summary">{summary}</p>
+                    <div class="paper-points">{points}</div>
                     <div class="paper-footer">
-                        <a href="{paper_link}" class="paper-link" target="_blank" rel="noopener">
+                        <a href="{link}" class="paper-link" target="_blank" rel="noopener">
                             📖 Leer Paper
                         </a>
-                        <span class="paper-date">{paper['date']}</span>
+                        <span class="paper-date">{date}</span>
                     </div>
                 </article>
 """
-        
-        html_content += """
-            </div>
-        </section>
-"""
 
-    html_content += f"""
+_PAGE_FOOTER = """
     </main>
 
     <footer class="footer">
@@ -651,106 +839,181 @@ def generate_html(papers, output_file):
 
     <button class="scroll-top" onclick="scrollToTop()">↑</button>
 
-    <script>
-        // Mostrar botón de scroll to top
-        window.addEventListener('scroll', function() {{
-            const scrollTop = document.querySelector('.scroll-top');
-            if (window.pageYOffset > 300) {{
-                scrollTop.classList.add('visible');
-            }} else {{
-                scrollTop.classList.remove('visible');
-            }}
-        }});
-
-        // Función para scroll to top
-        function scrollToTop() {{
-            window.scrollTo({{
-                top: 0,
-                behavior: 'smooth'
-            }});
-        }}
-
-        // Animación de entrada para las tarjetas
-        const observer = new IntersectionObserver((entries) => {{
-            entries.forEach((entry) => {{
-                if (entry.isIntersecting) {{
-                    entry.target.style.opacity = '1';
-                    entry.target.style.transform = 'translateY(0)';
-                }}
-            }});
-        }});
+"""
 
-        document.querySelectorAll('.paper-card').forEach((card) => {{
-            card.style.opacity = '0';
-            card.style.transform = 'translateY(20px)';
-            card.style.transition = 'opacity 0.6s ease, transform 0.6s ease';
-            observer.observe(card);
-        }});
+_SCRIPT_OPEN = """    <script>"""
 
-        // Dropdown functionality
-        const dropdown = document.getElementById('categoryDropdown');
-        const dropdownToggle = dropdown.querySelector('.dropdown-toggle');
-        const categories = document.querySelectorAll('.category');
-        const papersCount = document.getElementById('papersCount');
-        
-        dropdownToggle.addEventListener('click', function() {{
-            dropdown.classList.toggle('open');
-        }});
+_SCRIPT_END = """    </script>
+"""
 
-        function filterByCategory(category) {{
-            const dropdownItems = document.querySelectorAll('.dropdown-item');
-            dropdownItems.forEach(item => item.classList.remove('active'));
-            event.target.classList.add('active');
-            
-            if (category === 'all') {{
-                categories.forEach(cat => cat.style.display = 'block');
-                dropdownToggle.textContent = 'Filtrar por categoría';
-                papersCount.textContent = `Mostrando {total_papers} papers en {len(sorted_categories)} categorías`;
-            }} else {{
-                let visiblePapers = 0;
-                categories.forEach(cat => {{
-                    if (cat.dataset.category === category) {{
-                        cat.style.display = 'block';
-                        visiblePapers += cat.querySelectorAll('.paper-card').length;
-                    }} else {{
-                        cat.style.display = 'none';
-                    }}
-                }});
-                dropdownToggle.textContent = category;
-                papersCount.textContent = `Mostrando ${{visiblePapers}} papers en 1 categoría`;
-            }}
-            dropdown.classList.remove('open');
-        }}
+_SCRIPT_FILE = """    <script src="{src}"></script>
+"""
 
-        // Close dropdown when clicking outside
-        document.addEventListener('click', function(e) {{
-            if (!dropdown.contains(e.target)) {{
-                dropdown.classList.remove('open');
-            }}
-        }});
-    </script>
-</body>
+_BODY_END = """</body>
 </html>
 """
 
-    # Write the final HTML file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+def render_card(paper):
+    """Render the HTML card of one paper."""
+    # Clean and format key points for display
+    points_formatted = paper.points.replace('🎯', '').strip()
+    if not points_formatted.startswith('•'):
+        # Convert commas to bullets if not already present
+        points_formatted = '• ' + points_formatted.replace(',', '\n• ').replace(';', '\n• ')
+    
+    # Ensure the link is valid for the anchor (process_csv_robust already cleaned it)
+    paper_link = paper.link
+    if not paper_link or not ('http' in paper_link and '.' in paper_link):
+        paper_link = "#"  # Enlace placeholder si no es válido
+    
+    return _CARD.format(emoji=paper.emoji, title=paper.title, summary=paper.summary,
+                        points=points_formatted, link=paper_link, date=paper.date)
+
+def group_by_category(papers):
+    """Group papers by category (largest first); a cross-listed paper appears under each of its categories."""
+    categories = defaultdict(list)
+    for paper in papers:
+        for category in paper.categories:
+            categories[category].append(paper)
+    return sorted(categories.items(), key=lambda x: len(x[1]), reverse=True)
+
+def write_portal_assets(directory, compress=True):
+    """
+    Write the minified stylesheet (portal and search styles) and script shared by
+    every page into `directory`, under content-hash names.
+    Returns (css_name, js_name, files_written).
+    """
+    css, css_written = write_asset(directory, 'portal', 'css', minify_css(PORTAL_CSS + SEARCH_CSS), compress)
+    js, js_written = write_asset(directory, 'portal', 'js', minify_js(PORTAL_JS), compress)
+    return css, js, css_written + js_written
+
+def write_styles(write, assets=None, search=False):
+    """A <link> to the shared stylesheet when `assets` is given, the inline <style> block otherwise."""
+    if assets:
+        write(_STYLESHEET.format(href=assets[0]))
+        return
+    write(_STYLE_OPEN)
+    write(PORTAL_CSS)
+    if search:
+        write(SEARCH_CSS)
+    write(_STYLE_CLOSE)
+
+def write_page(path, render, compress=True):
+    """Stream a page to `path` through render(write), then write its precompressed siblings."""
+    with open(path, 'w', encoding='utf-8') as f:
+        result = render(f.write)
+    if compress:
+        precompress(path)
+    return result
+
+def write_portal(papers, write, current_date=None, search=None, assets=None):
+    """
+    Stream the portal page through `write` (e.g. a file's write method), fragment by
+    fragment, so the document is never held in memory as a whole. `search` is an
+    optional (index_url, root_url) pair that adds a search box backed by that index.
+    `assets` is an optional (css_url, js_url) pair of shared asset files used instead
+    of the inline stylesheet and script.
+    Returns the number of categories rendered.
+    """
+    sorted_categories = group_by_category(papers)
+    if current_date is None:
+        current_date = datetime.now().strftime("%d de %B de %Y")
+
+    write(_PAGE_HEAD)
+    write_styles(write, assets, search)
+    write(_PAGE_HEADER.format(total_papers=len(papers), total_categories=len(sorted_categories),
+                              current_date=current_date))
+
+    # Add category options to dropdown (simplified)
+    for category_name, _ in sorted_categories:
+        write(_DROPDOWN_ITEM.format(name=category_name))
+    write(_DROPDOWN_CLOSE)
+    if search:
+        write(_SEARCH_BOX)
+    write(_MAIN_OPEN)
+
+    # Render content for each category. Cross-listed cards are rendered once and kept
+    # only until they have been written under every one of their categories
+    rendered_cards = {}
+    for category_name, category_papers in sorted_categories:
+        # Get the most common emoji in the category
+        write(_SECTION_OPEN.format(name=category_name, emoji=get_category_emoji(category_papers),
+                                   count=len(category_papers)))
+        for paper in category_papers:
+            uses = len(paper.categories)
+            if uses < 2:
+                write(render_card(paper))
+                continue
+            cached = rendered_cards.get(id(paper))
+            if cached is None:
+                cached = rendered_cards[id(paper)] = [render_card(paper), uses]
+            write(cached[0])
+            cached[1] -= 1
+            if not cached[1]:
+                del rendered_cards[id(paper)]
+        write(_SECTION_CLOSE)
+
+    write(_PAGE_FOOTER.format(current_date=current_date))
+    if assets:
+        write(_SCRIPT_FILE.format(src=assets[1]))
+    else:
+        write(_SCRIPT_OPEN)
+        write(PORTAL_JS)
+        write(_SCRIPT_END)
+    if search:
+        write(_SEARCH_SCRIPT.format(index=search[0], root=search[1]))
+    write(_BODY_END)
+    return len(sorted_categories)
+
+def search_documents(papers, day, page_of):
+    """Search index documents for papers; `page_of(paper)` gives the page that shows it."""
+    for paper in papers:
+        title = html.unescape(paper.title)
+        yield {
+            'title': title,
+            'link': paper.link,
+            'page': page_of(paper),
+            'category': ', '.join(paper.categories),
+            'day': day,
+            'text': ' '.join((title, html.unescape(paper.summary), html.unescape(paper.points))),
+        }
+
+def generate_html(papers, output_file, search_index=False, inline_assets=False, compress=True):
+    """
+    Generate the portal HTML from the processed papers list. With `search_index`,
+    a search index for the page is (re)built in a 'busqueda' folder next to it.
+    Unless `inline_assets`, the stylesheet and script go to an 'assets' folder next
+    to the page. With `compress`, precompressed siblings are written as well.
+    Returns the number of categories.
+    """
+    out_dir = os.path.dirname(output_file)
+    search = None
+    if search_index:
+        page = os.path.basename(output_file)
+        index = SearchIndex(os.path.join(out_dir, SEARCH_DIR), reset=True)
+        index.add(list(search_documents(papers, papers[0].date if papers else '', lambda paper: page)))
+        index.save()
+        search = (SEARCH_DIR + '/', '')
+
+    assets = None
+    if not inline_assets:
+        css, js, _ = write_portal_assets(os.path.join(out_dir, ASSETS_DIR), compress)
+        assets = (f"{ASSETS_DIR}/{css}", f"{ASSETS_DIR}/{js}")
+
+    total_categories = write_page(
+        output_file, lambda write: write_portal(papers, write, search=search, assets=assets), compress)
     
     print(f"✅ Portal generado exitosamente: {output_file}")
-    print(f"📊 {total_papers} papers procesados en {len(sorted_categories)} categorías")
+    print(f"📊 {len(papers)} papers procesados en {total_categories} categorías")
+    return total_categories
 
 def get_category_emoji(category_papers):
-    """Get the most common emoji for a category based on its papers."""
-    emoji_count = {}
-    
-    for paper in category_papers:
-        title = paper.get('title', '')
-        emoji, _ = extract_emoji_from_title(title)
-        emoji_count[emoji] = emoji_count.get(emoji, 0) + 1
+    """Get the most common emoji for a category from the emoji stored with each paper."""
+    emoji_count = Counter(paper.emoji for paper in category_papers
+                          if paper.emoji and paper.emoji != DEFAULT_EMOJI)
     
     if emoji_count:
-        return max(emoji_count, key=emoji_count.get)
+        return emoji_count.most_common(1)[0][0]
     
     # Default emojis por categoría
     category_emojis = {
@@ -766,36 +1029,242 @@ def get_category_emoji(category_papers):
     }
     
     # Try to match category name
-    for category in category_papers:
-        cat_name = category.get('category', '')
+    for paper in category_papers:
+        cat_name = paper.category
         if cat_name in category_emojis:
             return category_emojis[cat_name]
     
-    return "📄"  # Default
+    return DEFAULT_EMOJI
+
+# Archive mode: one directory per day with its full page and one shard per category
+ARCHIVE_MANIFEST = 'manifest.json'
+SEARCH_DIR = 'busqueda'
+
+_INDEX_HEADER = """</head>
+<body>
+    <header class="header">
+        <div class="header-content">
+            <h1>🔬 ArXiv Daily Portal</h1>
+            <p class="subtitle">Archivo de ediciones diarias</p>
+            <div class="stats">
+                <div class="stat-item">📅 {total_days} Días</div>
+                <div class="stat-item">📊 {total_papers} Papers</div>
+            </div>
+        </div>
+    </header>
+
+    <section class="filter-section">
+""" + _SEARCH_BOX + """    </section>
+
+    <main class="container">
+"""
+
+_INDEX_DAY = """
+        <section class="category">
+            <div class="category-header">
+                <span style="font-size: 1.5rem;">📅</span>
+                <h2 class="category-title"><a href="{page}" class="paper-link">{label}</a></h2>
+                <span class="category-count">{count}</span>
+            </div>
+            <div class="stats">
+{links}
+            </div>
+        </section>
+"""
+
+_INDEX_CATEGORY = """                <a href="{page}" class="stat-item" style="color: #ffffff; text-decoration: none;">{name} ({count})</a>"""
+
+_INDEX_END = """
+    </main>
+""" + _SEARCH_SCRIPT.format(index=SEARCH_DIR + '/', root='') + _BODY_END
+
+def file_sha256(path):
+    """SHA-256 of a file's bytes, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def category_slug(name, taken):
+    """ASCII file name for a category shard, unique among the names in `taken`."""
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    slug = re.sub(r'[^a-z0-9]+', '-', ascii_name.lower()).strip('-') or 'categoria'
+    candidate, n = slug, 2
+    while candidate in taken:
+        candidate, n = f"{slug}-{n}", n + 1
+    taken.add(candidate)
+    return candidate
+
+def load_manifest(archive_dir):
+    """Read the archive manifest, or return an empty one."""
+    path = os.path.join(archive_dir, ARCHIVE_MANIFEST)
+    if not os.path.isfile(path):
+        return {'days': {}}
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    manifest.setdefault('days', {})
+    return manifest
+
+def save_manifest(archive_dir, manifest):
+    """Write the manifest atomically so an interrupted run never leaves it half written."""
+    path = os.path.join(archive_dir, ARCHIVE_MANIFEST)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def day_label(day):
+    """'2025-08-27' -> '27 de August de 2025', the same format as the portal header."""
+    try:
+        return datetime.strptime(day, '%Y-%m-%d').strftime("%d de %B de %Y")
+    except ValueError:
+        return day
+
+def write_day_pages(papers, day_dir, label, assets=None, compress=True):
+    """
+    Render a day's full page plus one page per category; returns the manifest entry's
+    category map. `assets` holds the shared asset file names, relative to the archive root.
+    """
+    os.makedirs(day_dir, exist_ok=True)
+    # Day pages sit one level below the archive root, next to the search index and assets folders
+    search = (f"../{SEARCH_DIR}/", '../')
+    if assets:
+        assets = tuple('../' + name for name in assets)
+    write_page(os.path.join(day_dir, 'index.html'),
+               lambda write: write_portal(papers, write, current_date=label, search=search, assets=assets),
+               compress)
+
+    shards = {}
+    taken = {'index'}
+    for category_name, category_papers in group_by_category(papers):
+        page = category_slug(category_name, taken) + '.html'
+        write_page(os.path.join(day_dir, page),
+                   lambda write: write_portal(category_papers, write, current_date=label, search=search,
+                                              assets=assets),
+                   compress)
+        shards[category_name] = {'page': page, 'count': len(category_papers)}
+    return shards
+
+def write_archive_index(archive_dir, manifest, assets=None, compress=True):
+    """Write the archive's index.html, newest day first, from the manifest alone."""
+    days = sorted(manifest['days'].items(), reverse=True)
+    path = os.path.join(archive_dir, 'index.html')
+    with open(path, 'w', encoding='utf-8') as f:
+        write = f.write
+        write(_PAGE_HEAD)
+        write_styles(write, assets, search=True)
+        write(_INDEX_HEADER.format(total_days=len(days),
+                                   total_papers=sum(entry['papers'] for _, entry in days)))
+        for day, entry in days:
+            links = '\n'.join(
+                _INDEX_CATEGORY.format(page=f"{day}/{shard['page']}", name=name, count=shard['count'])
+                for name, shard in sorted(entry['categories'].items(), key=lambda x: -x[1]['count']))
+            write(_INDEX_DAY.format(page=f"{day}/index.html", label=day_label(day),
+                                    count=entry['papers'], links=links))
+        write(_INDEX_END)
+    if compress:
+        precompress(path)
+
+def update_archive(papers, archive_dir, day, input_hash, inline_assets=False, compress=True):
+    """
+    Add (or replace) one day in the archive. Only that day's pages, its search
+    documents and the index are written; when the day's input hash is unchanged
+    nothing is rendered. Pages share the content-hashed assets of the archive's
+    'assets' folder unless `inline_assets`.
+    Returns True if the day was rendered.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    manifest = load_manifest(archive_dir)
+    previous = manifest['days'].get(day)
+    if previous is not None and previous.get('input_hash') == input_hash:
+        return False
+
+    assets = None
+    if not inline_assets:
+        css, js, _ = write_portal_assets(os.path.join(archive_dir, ASSETS_DIR), compress)
+        assets = (f"{ASSETS_DIR}/{css}", f"{ASSETS_DIR}/{js}")
+    day_dir = os.path.join(archive_dir, day)
+    shards = write_day_pages(papers, day_dir, day_label(day), assets, compress)
+
+    # Index the day's papers; a re-rendered day replaces its previous documents
+    index = SearchIndex(os.path.join(archive_dir, SEARCH_DIR))
+    if previous is not None and previous.get('docs'):
+        index.remove(*previous['docs'])
+    first, end = index.add(list(search_documents(
+        papers, day, lambda paper: f"{day}/{shards[paper.category]['page']}")))
+    index.save()
+    if previous is not None:
+        # Remove shards of categories that disappeared from a re-rendered day
+        current_pages = {shard['page'] for shard in shards.values()}
+        for shard in previous.get('categories', {}).values():
+            if shard['page'] not in current_pages:
+                stale = os.path.join(day_dir, shard['page'])
+                if os.path.isfile(stale):
+                    os.remove(stale)
+
+    manifest['days'][day] = {
+        'input_hash': input_hash,
+        'papers': len(papers),
+        'categories': shards,
+        'docs': [first, end],
+        'generated': datetime.now().isoformat(timespec='seconds'),
+    }
+    save_manifest(archive_dir, manifest)
+    write_archive_index(archive_dir, manifest, assets, compress)
+    return True
 
 def main():
     parser = argparse.ArgumentParser(description="Generate a news portal HTML from a processed CSV")
-    parser.add_argument('input_csv', help='CSV file with processed papers')
+    parser.add_argument('input_csv', help='CSV file with processed papers (or typed .jsonl)')
     parser.add_argument('output_html', help='Output HTML file for the portal')
+    parser.add_argument('--archive-dir', default=None,
+                        help='Also add the papers as one day of a multi-day archive in this directory')
+    parser.add_argument('--search-index', action='store_true',
+                        help='Build a client-side search index next to output_html (archives always get one)')
+    parser.add_argument('--day', default=None,
+                        help='Archive day (YYYY-MM-DD) the papers belong to (default: today)')
+    parser.add_argument('--inline-assets', action='store_true',
+                        help='Embed the CSS and JS in every page instead of shared content-hashed files in assets/')
+    parser.add_argument('--no-precompress', action='store_true',
+                        help='Do not write the precompressed .gz/.br siblings of pages and assets')
+    parser.add_argument('--metrics', default=None,
+                        help='JSON run report to merge this stage\'s metrics into (a .prom textfile is written next to it)')
     
     args = parser.parse_args()
     
-    if not os.path.isfile(args.input_csv):
-        print(f"Error: No se encuentra el archivo CSV: {args.input_csv}", file=sys.stderr)
-        sys.exit(1)
+    with telemetria.stage('portal', args.metrics) as metrics:
+        if not os.path.isfile(args.input_csv):
+            print(f"Error: No se encuentra el archivo CSV: {args.input_csv}", file=sys.stderr)
+            sys.exit(1)
     
-    try:
-        papers = process_csv_robust(args.input_csv)
+        try:
+            papers = process_csv_robust(args.input_csv)
         
-        if not papers:
-            print("No se encontraron papers válidos en el CSV", file=sys.stderr)
-            sys.exit(1)
+            if not papers:
+                print("No se encontraron papers válidos en el CSV", file=sys.stderr)
+                sys.exit(1)
         
-        generate_html(papers, args.output_html)
+            metrics.set('rows_in', len(papers))
+            metrics.file_size('bytes_in', args.input_csv)
+            metrics.set('categories', generate_html(papers, args.output_html, search_index=args.search_index,
+                                                    inline_assets=args.inline_assets,
+                                                    compress=not args.no_precompress))
+            metrics.file_size('bytes_out', args.output_html)
+
+            if args.archive_dir:
+                day = args.day or date.today().isoformat()
+                updated = update_archive(papers, args.archive_dir, day, file_sha256(args.input_csv),
+                                         inline_assets=args.inline_assets, compress=not args.no_precompress)
+                metrics.set('archive_updated', int(updated))
+                if updated:
+                    print(f"🗂️ Archivo actualizado: {args.archive_dir} (día {day})")
+                else:
+                    print(f"🗂️ El día {day} no cambió; el archivo no se regeneró")
         
-    except Exception as e:
-        print(f"Error al procesar el archivo: {e}", file=sys.stderr)
-        sys.exit(1)
+        except Exception as e:
+            print(f"Error al procesar el archivo: {e}", file=sys.stderr)
+            sys.exit(1)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -11,138 +11,571 @@ structure containing Title, Category, Summary and Description).
 Usage:
     python generar_prompts.py input.csv output.csv
     python generar_prompts.py input.csv output.csv --batch-size 10
+    python generar_prompts.py input.csv output.csv --max-input-tokens 12000 --max-output-tokens 8000
+    cat input.csv | python generar_prompts.py - - > output.csv
+    python generar_prompts.py OUT/AutoPapper.jsonl OUT/Prompts.jsonl
+    python generar_prompts.py backfill.csv OUT/Prompts.csv --workers 4
+
+Papers cross-listed in several categories are merged into one record (one
+summary) carrying all their categories. This reads the input twice (stdin is
+first copied to a temporary file) and keeps the categories and the IDs already
+emitted in memory, so memory grows with the number of distinct arXiv IDs.
+With --no-dedup rows are streamed in a single pass and memory use is bounded by
+a single batch regardless of input size.
+Paths ending in .jsonl are read and written as typed JSON Lines (registros_jsonl.py).
+With --workers N, cleaning and prompt assembly run on a process pool in chunks of
+rows; the prompts come out in the same order, and identical, as in serial mode.
 
 """
 
 import csv
 import argparse
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import io
+import itertools
 import os
 import sys
 import html
 import re
+import shutil
+import tempfile
+
+import registros_jsonl
+import telemetria
+from arxiv_ids import canonical_arxiv_id
+
+# Characters that can start something the normalizer rewrites: markup, any
+# whitespace other than a lone ASCII space, or a double space.
+# A plain character class lets the regex engine skip ordinary text at C speed.
+_SPECIAL_RE = re.compile(
+    '[&\\\\{}$\\t-\\r\\x1c-\\x1f\\x85\\xa0\\u1680\\u2000-\\u200a\\u2028\\u2029\\u202f\\u205f\\u3000]|  '
+)
+_SPACE_RUN_RE = re.compile(r'\s+')
+_ENTITY_RE = re.compile(r'&(?:#[0-9]{1,7}|#[xX][0-9a-fA-F]{1,6}|[A-Za-z][A-Za-z0-9]{1,31});?')
+_BACKSLASH_RE = re.compile(r'\\(?:(?P<cmd>[A-Za-z]+\*?[ \t]*\{)|(?P<linebreak>\\)|(?P<escape>[$%&_#{}]))')
+
+@functools.lru_cache(maxsize=1024)
+def _unescape_entity(entity):
+    return html.unescape(entity)
+
+def _normalize(text):
+    """
+    Single pass over `text`: decode HTML entities, strip LaTeX commands keeping
+    their (arbitrarily nested) arguments, drop $/$$ math delimiters, unescape
+    \\$ \\% \\& \\_ \\# \\{ \\} and fold every whitespace run into one space.
+    The result is not trimmed.
+    """
+    out = []
+    append = out.append
+    search = _SPECIAL_RE.search
+    # Stack of open braces: True for a command argument (dropped), False for a literal brace
+    braces = []
+    pos = 0
+    end = len(text)
+    last_space = False
+    while True:
+        m = search(text, pos)
+        if m is None:
+            break
+        i = m.start()
+        if i > pos:
+            chunk = text[pos:i]
+            if last_space and chunk[0] == ' ':
+                chunk = chunk[1:]
+            if chunk:
+                append(chunk)
+                last_space = chunk[-1] == ' '
+        ch = text[i]
+        pos = i + 1
+        piece = None
+        if ch == '\\':
+            bm = _BACKSLASH_RE.match(text, i)
+            if bm is None:
+                piece = ch
+            else:
+                pos = bm.end()
+                kind = bm.lastgroup
+                if kind == 'cmd':
+                    braces.append(True)
+                    continue
+                if kind == 'escape':
+                    piece = bm.group(kind)
+        elif ch == '&':
+            em = _ENTITY_RE.match(text, i)
+            if em is None:
+                piece = ch
+            else:
+                pos = em.end()
+                piece = _unescape_entity(em.group())
+                if piece.isspace():
+                    # e.g. &nbsp; folds like any other whitespace
+                    piece = None
+        elif ch == '{':
+            braces.append(False)
+            piece = ch
+        elif ch == '}':
+            if braces and braces.pop():
+                continue
+            piece = ch
+        elif ch == '$':
+            if text.startswith('$', pos):
+                pos += 1
+            continue
+        else:
+            pos = _SPACE_RUN_RE.match(text, i).end()
+
+        if piece is None:
+            # Whitespace run, LaTeX line break or whitespace entity
+            if not last_space:
+                append(' ')
+                last_space = True
+        else:
+            append(piece)
+            last_space = piece[-1] == ' '
+    if pos < end:
+        chunk = text[pos:]
+        if last_space and chunk[0] == ' ':
+            chunk = chunk[1:]
+        append(chunk)
+    return ''.join(out)
 
 def clean_text_one_line(text: str) -> str:
-    """Remove line breaks and duplicate whitespace, then trim the string."""
-    if text is None:
+    """Remove HTML entities, LaTeX markup, line breaks and duplicate whitespace, then trim the string."""
+    if not text:
         return ""
-    # Convert HTML entities if any
-    text = html.unescape(text)
-    # Remove LaTeX commands that can cause JavaScript issues
-    text = re.sub(r'\\texttt\{([^}]*)\}', r'\1', text)
-    text = re.sub(r'\\textbf\{([^}]*)\}', r'\1', text)
-    text = re.sub(r'\\textit\{([^}]*)\}', r'\1', text)
-    text = re.sub(r'\\text\{([^}]*)\}', r'\1', text)
-    # Remove other common LaTeX commands
-    text = re.sub(r'\\[a-zA-Z]+\{([^}]*)\}', r'\1', text)
-    # Replace any newline or return with a space
-    text = re.sub(r'[\r\n]+', ' ', text)
-    # Replace multiple spaces with one
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    return _normalize(text).strip()
 
-def build_prompt_for_batch(batch, max_per_paper_lines=3):
+def clean_column(values):
     """
-    batch: list of dicts with keys: name, Description, URL, Category
-    Returns a single-line string containing the instruction plus the formatted papers.
+    Clean a whole column (iterable of strings or None) at once.
+    Repeated values, such as categories, are normalized only once.
+    Returns a list with the same length and order as `values`.
     """
-    n = len(batch)
-    instruction = (
+    cache = {}
+    cleaned = []
+    for v in values:
+        result = cache.get(v)
+        if result is None:
+            result = cache[v] = clean_text_one_line(v)
+        cleaned.append(result)
+    return cleaned
+
+# Separator between the categories of a cross-listed paper
+CATEGORY_SEP = '; '
+# Separator between the paper entries of a prompt, and the text that precedes them
+ENTRY_SEP = " ||| "
+INSTRUCTION_END = "A continuación vienen los papers:"
+
+def build_instruction(n):
+    """Return the fixed instruction text that heads a prompt for `n` papers."""
+    return (
         f"Resume los siguientes {n} papers científicos y devuelve la respuesta en formato JSON válido. "
         f"Para cada paper traduce el título al español y crea un objeto con los campos especificados. "
         "Usa emojis apropiados (🤖 para IA, 💻 para software, 🔒 para seguridad, 🧬 para investigación, etc.). "
         "IMPORTANTE: Responde ÚNICAMENTE con el JSON válido, sin texto adicional antes o después. "
         "CRÍTICO: Usa EXACTAMENTE la categoría proporcionada en cada paper, NO crees subcategorías ni la modifiques. "
         "Mantén la categoría original tal cual está especificada. Pero traducida al español. "
+        f"Si un paper tiene varias categorías separadas por '{CATEGORY_SEP.strip()}', conserva todas, en el mismo orden y con el mismo separador. "
         "Estructura JSON requerida: "
         '{"papers": [{"titulo_español": "🔬 [emoji apropiado] Título traducido", "categoria": "[emoji 📂] Categoría EXACTA del paper (sin modificar pero traducida al español)", "resumen": "[emoji 📝] Resumen en máximo 3 líneas", "puntos_clave": "[emoji 🎯] Aspectos más importantes", "enlace": "[emoji 🔗] URL del paper"}, ...]} '
-        "A continuación vienen los papers:"
+        + INSTRUCTION_END
     )
 
+def clean_batch(batch):
+    """
+    batch: list of dicts with keys: name, Description, URL, Category
+    Returns a list of cleaned (title, category, description, url) tuples.
+    """
+    # Clean each field column-wise so repeated values are normalized once
+    titles = clean_column(row.get('name', '') or row.get('title', '') for row in batch)
+    descs = clean_column(row.get('Description', '') or row.get('abstract', '') for row in batch)
+    urls = clean_column(row.get('URL', '') for row in batch)
+    categories = clean_column(row.get('Category', '') for row in batch)
+    return list(zip(titles, categories, descs, urls))
+
+def format_entry(idx, paper):
+    """Format one cleaned paper tuple as a numbered prompt entry."""
+    title, category, desc, url = paper
+    return f"{idx}. Título Original: {title} | Categoría: {category} | Descripción: {desc} | URL: {url}"
+
+def assemble_prompt(papers):
+    """Build the single-line prompt for a list of cleaned paper tuples."""
+    # Merge everything in ONE LINE separating papers with ENTRY_SEP for clarity
+    joined_entries = ENTRY_SEP.join(format_entry(idx, paper) for idx, paper in enumerate(papers, start=1))
+    return build_instruction(len(papers)) + " " + joined_entries
+
+# Inverse of format_entry: the description may itself contain " | "
+_ENTRY_RE = re.compile(r'(\d+)\. Título Original: (.*?) \| Categoría: (.*?) \| Descripción: (.*) \| URL: (\S*)$')
+def parse_prompt_entries(prompt):
+    """
+    Recover the (title, category, description, url) tuples a prompt was assembled
+    from. Returns [] for text that was not built by assemble_prompt.
+    """
+    _, marker, body = prompt.partition(INSTRUCTION_END)
+    if not marker:
+        return []
     entries = []
-    for idx, row in enumerate(batch, start=1):
-        title = clean_text_one_line(row.get('name', '') or row.get('title', ''))
-        desc = clean_text_one_line(row.get('Description', '') or row.get('abstract', ''))
-        url = clean_text_one_line(row.get('URL', ''))
-        category = clean_text_one_line(row.get('Category', ''))
-        entry = f"{idx}. Título Original: {title} | Categoría: {category} | Descripción: {desc} | URL: {url}"
-        entries.append(entry)
-
-    # Merge everything in ONE LINE separating papers with " ||| " for clarity
-    joined_entries = " ||| ".join(entries)
-    prompt = instruction + " " + joined_entries
-    return prompt
+    for chunk in body.strip().split(ENTRY_SEP):
+        match = _ENTRY_RE.match(chunk.strip())
+        if match:
+            entries.append(match.group(2, 3, 4, 5))
+    return entries
+
+def build_prompt_for_batch(batch, max_per_paper_lines=3):
+    """
+    batch: list of dicts with keys: name, Description, URL, Category
+    Returns a single-line string containing the instruction plus the formatted papers.
+    """
+    return assemble_prompt(clean_batch(batch))
+
+# Rough characters-per-token ratio for mixed English/Spanish text. Deliberately
+# pessimistic so estimates err on the side of smaller prompts, never overflows.
+CHARS_PER_TOKEN = 3.5
+
+def estimate_tokens(text):
+    """Cheap upper-bound style token estimate for a string."""
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+def paper_cost(paper):
+    """Estimated input tokens a paper adds to a prompt, separator included."""
+    return estimate_tokens(format_entry(99, paper)) + estimate_tokens(" ||| ")
+
+def fit_paper(paper, capacity):
+    """Truncate the description of a paper that would not fit in an empty prompt on its own."""
+    cost = paper_cost(paper)
+    if cost <= capacity:
+        return paper, False
+    title, category, desc, url = paper
+    overflow_chars = int((cost - capacity) * CHARS_PER_TOKEN) + 1
+    keep = max(0, len(desc) - overflow_chars - 1)
+    return (title, category, desc[:keep].rstrip() + "…", url), True
+
+def pack_papers(papers, max_input_tokens, max_output_tokens, output_tokens_per_paper):
+    """
+    First-fit-decreasing bin packing of cleaned paper tuples into prompts.
+    Every returned bin fits in `max_input_tokens` (instruction included) and asks
+    for at most `max_output_tokens` of expected answer. Returns (bins, truncated).
+    """
+    capacity = max_input_tokens - estimate_tokens(build_instruction(99))
+    if capacity <= 0:
+        raise ValueError(f"max_input_tokens={max_input_tokens} no alcanza ni para la instrucción")
+    max_papers = max(1, max_output_tokens // output_tokens_per_paper)
+
+    truncated = 0
+    sized = []
+    for paper in papers:
+        paper, was_cut = fit_paper(paper, capacity)
+        truncated += was_cut
+        sized.append((paper_cost(paper), paper))
+    sized.sort(key=lambda item: item[0], reverse=True)
+
+    bins = []  # [used_tokens, [papers]]
+    for cost, paper in sized:
+        for b in bins:
+            if b[0] + cost <= capacity and len(b[1]) < max_papers:
+                b[0] += cost
+                b[1].append(paper)
+                break
+        else:
+            bins.append([cost, [paper]])
+    return [papers for _, papers in bins], truncated
+
+def pack_window(rows, max_input_tokens, max_output_tokens, output_tokens_per_paper):
+    """Clean and pack one window of rows; returns (prompts, papers, truncated)."""
+    papers = clean_batch(rows)
+    bins, truncated = pack_papers(papers, max_input_tokens, max_output_tokens, output_tokens_per_paper)
+    return [assemble_prompt(b) for b in bins], len(papers), truncated
+
+def iter_packed_prompts(rows, max_input_tokens, max_output_tokens, output_tokens_per_paper,
+                        window=500, stats=None, workers=1):
+    """
+    Lazily pack rows into token-budgeted prompts.
+    Packing happens over windows of `window` rows so memory stays bounded; with
+    `workers` > 1 the windows are packed on a process pool, in order.
+    If `stats` is a dict it is filled with 'papers' and 'truncated' counts.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault('papers', 0)
+    stats.setdefault('truncated', 0)
+    job = functools.partial(pack_window, max_input_tokens=max_input_tokens, max_output_tokens=max_output_tokens,
+                            output_tokens_per_paper=output_tokens_per_paper)
+    windows = chunk_iter(rows, window)
+    for prompts, papers, truncated in ordered_map(job, windows, workers):
+        stats['papers'] += papers
+        stats['truncated'] += truncated
+        yield from prompts
+
+def iter_input_rows(f, verbose=True):
+    """Yield rows of an open input CSV as dicts, skipping duplicate header rows.
+
+    Rows are produced one at a time so callers never hold the whole file in memory.
+    With verbose=False the column and duplicate-header warnings are not printed.
+    """
+    reader = csv.DictReader(f)
+    # Basic validation of columns (non-fatal, only warn if missing)
+    expected = {'name', 'Description', 'URL', 'Category'}
+    found = set(reader.fieldnames or [])
+    missing = expected - found
+    if missing and verbose:
+        # does not break; assumes that user has columns with similar names
+        print(f"Advertencia: columnas esperadas ausentes en input CSV: {missing}. Continuando...", file=sys.stderr)
+
+    # Get the actual fieldnames to compare against
+    fieldnames = reader.fieldnames or []
+    header_values = [field.strip().lower() for field in fieldnames]
+
+    for r in reader:
+        # Skip rows that are duplicate headers (where values match the column names)
+        if fieldnames:
+            row_values = [(r.get(field) or '').strip().lower() for field in fieldnames]
+            if row_values == header_values:
+                if verbose:
+                    print(f"Skipping duplicate header row: {list(r.values())}", file=sys.stderr)
+                continue
+        yield r
+
+def input_rows(path, f, verbose=True):
+    """Rows of the input file: a typed .jsonl file is read as is, a CSV through iter_input_rows."""
+    if registros_jsonl.is_jsonl(path):
+        return registros_jsonl.read_records(path, 'papers')
+    return iter_input_rows(f, verbose=verbose)
+
+def collect_categories(rows):
+    """
+    Map each arXiv ID to the ordered list of distinct categories it is listed under.
+    The map holds every distinct ID of the input.
+    """
+    categories = {}
+    for r in rows:
+        arxiv_id = canonical_arxiv_id(r.get('URL', ''))
+        if not arxiv_id:
+            continue
+        category = sys.intern((r.get('Category') or '').strip())
+        listed = categories.setdefault(arxiv_id, [])
+        if category and category not in listed:
+            listed.append(category)
+    return categories
+
+def iter_merged_rows(rows, categories):
+    """
+    Yield each cross-listed paper once, at its first occurrence, with the
+    categories collected by collect_categories() joined by CATEGORY_SEP.
+    Rows without a recognizable arXiv ID are passed through untouched. The set of
+    IDs already yielded grows with the number of distinct papers.
+    """
+    seen = set()
+    for r in rows:
+        arxiv_id = canonical_arxiv_id(r.get('URL', ''))
+        if not arxiv_id:
+            yield r
+            continue
+        if arxiv_id in seen:
+            continue
+        seen.add(arxiv_id)
+        listed = categories.get(arxiv_id)
+        if listed and len(listed) > 1:
+            r = dict(r)
+            r['Category'] = CATEGORY_SEP.join(listed)
+        yield r
 
 def read_input_csv(path):
     """Read the input CSV and return a list of rows as dicts, filtering out duplicate header rows."""
-    rows = []
     with open(path, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        # Basic validation of columns (non-fatal, only warn if missing)
-        expected = {'name', 'Description', 'URL', 'Category'}
-        found = set(reader.fieldnames or [])
-        missing = expected - found
-        if missing:
-            # does not break; assumes that user has columns with similar names
-            print(f"Advertencia: columnas esperadas ausentes en input CSV: {missing}. Continuando...", file=sys.stderr)
-        
-        # Get the actual fieldnames to compare against
-        fieldnames = reader.fieldnames or []
-        
-        for r in reader:
-            # Skip rows that are duplicate headers (where values match the column names)
-            is_header_row = False
-            if fieldnames:
-                # Check if this row contains the same values as the header
-                row_values = [r.get(field, '').strip().lower() for field in fieldnames]
-                header_values = [field.strip().lower() for field in fieldnames]
-                
-                # If row values match header names, it's a duplicate header
-                if row_values == header_values:
-                    print(f"Skipping duplicate header row: {list(r.values())}", file=sys.stderr)
-                    is_header_row = True
-            
-            if not is_header_row:
-                rows.append(r)
-    
-    return rows
+        return list(iter_input_rows(f))
 
 def write_output_csv(prompts, out_path):
-    """Write an output CSV with a single 'prompt' column."""
-    with open(out_path, 'w', newline='', encoding='utf-8') as f:
+    """Write an output CSV with a single 'prompt' column (typed JSON Lines for a .jsonl path).
+
+    `prompts` may be any iterable (including a generator); each prompt is written
+    as soon as it is produced. Returns the number of prompts written.
+    """
+    with open_output(out_path) as f:
+        return write_prompts(prompts, f, jsonl=registros_jsonl.is_jsonl(out_path))
+
+def write_prompts(prompts, f, jsonl=False):
+    """Write the 'prompt' header and every prompt to an open file, flushing per row."""
+    if jsonl:
+        writer = registros_jsonl.JsonlWriter(f, 'prompts')
+        writer.writeheader()
+    else:
         writer = csv.writer(f, quoting=csv.QUOTE_ALL)
         writer.writerow(['prompt'])
-        for p in prompts:
-            writer.writerow([p])
+    count = 0
+    for p in prompts:
+        writer.writerow({'prompt': p} if jsonl else [p])
+        f.flush()
+        count += 1
+    return count
+
+def open_input(path):
+    """Open the input CSV, or stdin when path is '-'."""
+    if path == '-':
+        return contextlib.nullcontext(io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline=''))
+    return open(path, newline='', encoding='utf-8')
+
+def open_output(path):
+    """Open the output CSV for writing, or stdout when path is '-'."""
+    if path == '-':
+        return contextlib.nullcontext(io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='', write_through=True))
+    return open(path, 'w', newline='', encoding='utf-8')
 
 def chunk_list(lst, n):
     """Yield successive n-sized chunks from lst (last chunk may be smaller)."""
     for i in range(0, len(lst), n):
         yield lst[i:i+n]
 
+def chunk_iter(iterable, n):
+    """Yield successive n-sized lists from any iterable, holding only one chunk at a time."""
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, n))
+        if not chunk:
+            return
+        yield chunk
+
+# Batches per process pool job: large enough to amortize sending the rows to a worker
+JOB_BATCHES = 50
+
+def ordered_map(fn, items, workers=1, prefetch=2):
+    """
+    map(fn, items), on a process pool when `workers` > 1. Results are yielded in
+    the order of `items`, and at most `workers * prefetch` items are in flight,
+    so a streamed input is never read ahead as a whole.
+    """
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= workers * prefetch:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def build_prompts(rows, batch_size, max_per_paper_lines=3):
+    """The prompts of a run of rows, batch_size rows per prompt."""
+    return [build_prompt_for_batch(batch, max_per_paper_lines=max_per_paper_lines)
+            for batch in chunk_iter(rows, batch_size)]
+
+def iter_prompts(rows, batch_size, max_per_paper_lines=3, workers=1):
+    """
+    Lazily turn a row iterable into prompts, one batch at a time. With `workers` > 1,
+    runs of JOB_BATCHES whole batches are built on a process pool; since every run
+    starts on a batch boundary, the prompts are the same as in serial mode.
+    """
+    if workers <= 1:
+        for batch in chunk_iter(rows, batch_size):
+            yield build_prompt_for_batch(batch, max_per_paper_lines=max_per_paper_lines)
+        return
+    job = functools.partial(build_prompts, batch_size=batch_size, max_per_paper_lines=max_per_paper_lines)
+    for prompts in ordered_map(job, chunk_iter(rows, batch_size * JOB_BATCHES), workers):
+        yield from prompts
+
 def main():
     parser = argparse.ArgumentParser(description="Genera prompts en lotes desde un CSV de papers.")
-    parser.add_argument('input_csv', help='Ruta al CSV de entrada (con columnas name, Description, URL, Category).')
-    parser.add_argument('output_csv', help='Ruta al CSV de salida que contendrá la columna "prompt".')
+    parser.add_argument('input_csv', help='Ruta al CSV de entrada (con columnas name, Description, URL, Category; .jsonl: registros tipados). Usa "-" para leer de stdin.')
+    parser.add_argument('output_csv', help='Ruta al CSV de salida que contendrá la columna "prompt" (.jsonl: registros tipados). Usa "-" para escribir en stdout.')
     parser.add_argument('--batch-size', '-b', type=int, default=10, help='Cantidad de papers por prompt (default 10).')
     parser.add_argument('--max-lines', type=int, default=3, help='Máximo de renglones por resumen pedido a la IA (default 3).')
+    parser.add_argument('--max-input-tokens', type=int, default=None,
+                        help='Activa el empaquetado por presupuesto de tokens: tokens de entrada máximos por prompt (reemplaza --batch-size).')
+    parser.add_argument('--max-output-tokens', type=int, default=8000,
+                        help='Tokens de respuesta máximos esperados por prompt al empaquetar (default 8000).')
+    parser.add_argument('--output-tokens-per-paper', type=int, default=400,
+                        help='Tokens de respuesta estimados por paper al empaquetar (default 400).')
+    parser.add_argument('--pack-window', type=int, default=500,
+                        help='Cantidad de papers que se empaquetan juntos; acota la memoria usada (default 500).')
+    parser.add_argument('--no-dedup', action='store_true',
+                        help='No unificar los papers publicados en varias categorías (cross-listings); '
+                             'lee la entrada una sola vez con memoria acotada a un lote.')
+    parser.add_argument('--cache', default=None,
+                        help='Base SQLite de cache_resumenes.py; los papers ya resumidos no se incluyen en los prompts.')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Procesos que limpian y arman los prompts en paralelo; la salida es idéntica a la serial (default 1).')
+    parser.add_argument('--metrics', default=None, help='Reporte JSON de métricas de la corrida (se combina con las otras etapas).')
     args = parser.parse_args()
 
-    if not os.path.isfile(args.input_csv):
-        print(f"Error: no se encuentra el archivo de entrada: {args.input_csv}", file=sys.stderr)
-        sys.exit(1)
+    with telemetria.stage('prompts', args.metrics) as metrics:
+        if args.workers < 1:
+            print("Error: --workers debe ser al menos 1", file=sys.stderr)
+            sys.exit(1)
+        metrics.set('workers', args.workers)
+        if args.input_csv != '-' and not os.path.isfile(args.input_csv):
+            print(f"Error: no se encuentra el archivo de entrada: {args.input_csv}", file=sys.stderr)
+            sys.exit(1)
+
+        # Stream rows -> batches -> prompts -> output; only one batch is alive at a time
+        # (plus the per-ID categories and seen IDs when deduplicating)
+        stats = {}
+        with open_input(args.input_csv) as f_in, contextlib.ExitStack() as stack:
+            categories = None
+            if not args.no_dedup:
+                # Cross-listings can be far apart: a first pass collects only the
+                # categories per arXiv ID, the second pass streams the merged rows.
+                if args.input_csv == '-':
+                    spool = stack.enter_context(tempfile.TemporaryFile('w+', newline='', encoding='utf-8'))
+                    shutil.copyfileobj(f_in, spool)
+                    f_in = spool
+                    f_in.seek(0)
+                categories = collect_categories(input_rows(args.input_csv, f_in, verbose=False))
+                f_in.seek(0)
+
+            rows = input_rows(args.input_csv, f_in)
+            first = next(rows, None)
+            if first is None:
+                print("No hay registros en el CSV de entrada. Abortando.", file=sys.stderr)
+                sys.exit(1)
+            rows = metrics.counted(itertools.chain([first], rows), 'rows_in')
+            if categories is not None:
+                rows = iter_merged_rows(rows, categories)
 
-    rows = read_input_csv(args.input_csv)
-    if not rows:
-        print("No hay registros en el CSV de entrada. Abortando.", file=sys.stderr)
-        sys.exit(1)
+            cache = None
+            if args.cache:
+                from cache_resumenes import SummaryCache, iter_uncached_rows
+                cache = SummaryCache(args.cache)
+                rows = iter_uncached_rows(rows, cache)
+            rows = metrics.counted(rows, 'papers_out')
 
-    prompts = []
-    for batch in chunk_list(rows, args.batch_size):
-        prompt = build_prompt_for_batch(batch, max_per_paper_lines=args.max_lines)
-        prompts.append(prompt)
+            if args.max_input_tokens:
+                try:
+                    # Validate the budget before the output file is created
+                    pack_papers([], args.max_input_tokens, args.max_output_tokens, args.output_tokens_per_paper)
+                except ValueError as e:
+                    print(f"Error: {e}", file=sys.stderr)
+                    sys.exit(1)
+                prompts = iter_packed_prompts(rows, args.max_input_tokens, args.max_output_tokens,
+                                              args.output_tokens_per_paper, window=args.pack_window, stats=stats,
+                                              workers=args.workers)
+            else:
+                prompts = iter_prompts(rows, args.batch_size, max_per_paper_lines=args.max_lines,
+                                       workers=args.workers)
+            total = write_output_csv(prompts, args.output_csv)
+        metrics.set('rows_out', total)
+        metrics.file_size('bytes_in', args.input_csv)
+        metrics.file_size('bytes_out', args.output_csv)
 
-    write_output_csv(prompts, args.output_csv)
-    print(f"Generados {len(prompts)} prompts en {args.output_csv}")
+        # Keep stdout clean for the CSV when streaming to it
+        status_stream = sys.stderr if args.output_csv == '-' else sys.stdout
+        if cache is not None:
+            print(f"Cache: {cache.hits} papers ya resumidos omitidos, {cache.misses} por procesar", file=status_stream)
+            metrics.set('cache_hits', cache.hits)
+            metrics.set('cache_misses', cache.misses)
+            cache.close()
+        print(f"Generados {total} prompts en {args.output_csv}", file=status_stream)
+        if args.max_input_tokens:
+            fixed = -(-stats['papers'] // args.batch_size)
+            print(f"Empaquetado por tokens: {stats['papers']} papers en {total} prompts "
+                  f"(lotes fijos de {args.batch_size}: {fixed} prompts, ahorro: {fixed - total})", file=status_stream)
+            metrics.set('truncated', stats['truncated'])
+            if stats['truncated']:
+                print(f"Advertencia: se recortó la descripción de {stats['truncated']} papers que no entraban en el presupuesto",
+                      file=status_stream)
 
 if __name__ == '__main__':
     main()
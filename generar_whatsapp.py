@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+generar_whatsapp.py
+
+Renders the WhatsApp messages from the processed papers (ProcessedPapers.csv),
+the same structured result the HTML portal is generated from, so both outputs
+cost a single LLM pass.
+
+Papers are grouped by category (largest first) and packed into as few messages
+as the maximum message length allows; a paper longer than a whole message is
+split at paragraph, line or word boundaries. --one-per-paper keeps the old
+layout of one message per paper. Messages are delivered through a pluggable
+sender (envio_whatsapp.py): the JSON queue EnviarWhatsapp.tag sends (default),
+an HTTP webhook, or a local text file.
+
+Usage:
+    python generar_whatsapp.py OUT/ProcessedPapers.csv OUT/WhatsappMensajes.json
+    python generar_whatsapp.py OUT/ProcessedPapers.csv OUT/whatsapp.txt --sender file --max-length 2000
+    python generar_whatsapp.py OUT/ProcessedPapers.csv --sender webhook --webhook-url http://localhost:3000/send
+
+"""
+
+import argparse
+import html
+import os
+import sys
+from collections import defaultdict
+
+import telemetria
+from envio_whatsapp import FileSender, TagUIQueueSender, WebhookSender, deliver
+from generar_portal import process_csv_robust
+
+CATEGORY_PREFIX = "📂"
+LINK_PREFIX = "🔗"
+# WhatsApp accepts much longer texts, but long messages are collapsed behind "Read more"
+DEFAULT_MAX_LENGTH = 4000
+MIN_MAX_LENGTH = 200
+PAPER_SEPARATOR = "\n\n" + "—" * 12 + "\n\n"
+CONTINUED = " (cont.)"
+
+def message_length(text):
+    """Length as WhatsApp counts it (UTF-16 code units: most emoji count as 2)."""
+    return len(text.encode('utf-16-le')) // 2
+
+def format_message(paper):
+    """One paper as a standalone WhatsApp message, in the layout AIOverview.tag produced."""
+    parts = [
+        f"{paper.emoji} {html.unescape(paper.title)}",
+        '; '.join(f"{CATEGORY_PREFIX} {c}" for c in paper.categories),
+        html.unescape(paper.summary),
+        html.unescape(paper.points),
+        f"{LINK_PREFIX} {paper.link}" if paper.link else '',
+    ]
+    return '\n\n'.join(part for part in parts if part)
+
+def format_block(paper):
+    """A paper inside a category message: its category is in the message header."""
+    also = paper.categories[1:]
+    parts = [
+        f"{paper.emoji} *{html.unescape(paper.title)}*",
+        f"{CATEGORY_PREFIX} También en: {'; '.join(also)}" if also else '',
+        html.unescape(paper.summary),
+        html.unescape(paper.points),
+        f"{LINK_PREFIX} {paper.link}" if paper.link else '',
+    ]
+    return '\n\n'.join(part for part in parts if part)
+
+def split_text(text, max_length, separators=('\n\n', '\n', ' ')):
+    """Split `text` into pieces of at most `max_length`, preferring paragraph, line and word breaks."""
+    if message_length(text) <= max_length:
+        return [text]
+    for level, sep in enumerate(separators):
+        parts = text.split(sep)
+        if len(parts) == 1:
+            continue
+        pieces, current = [], ''
+        for part in parts:
+            candidate = current + sep + part if current else part
+            if message_length(candidate) <= max_length:
+                current = candidate
+            elif message_length(part) > max_length:
+                # Too long even on its own: fill the current piece and split the rest at finer breaks
+                *head, current = split_text(candidate, max_length, separators[level + 1:])
+                pieces.extend(head)
+            else:
+                pieces.append(current)
+                current = part
+        if current:
+            pieces.append(current)
+        return pieces
+    # A single unbroken run of text: cut by code points
+    pieces, current = [], ''
+    for ch in text:
+        if message_length(current + ch) > max_length:
+            pieces.append(current)
+            current = ''
+        current += ch
+    return pieces + [current] if current else pieces
+
+def group_by_primary_category(papers):
+    """Group papers by their first category (largest group first); each paper appears once."""
+    groups = defaultdict(list)
+    for paper in papers:
+        groups[paper.category].append(paper)
+    return sorted(groups.items(), key=lambda x: len(x[1]), reverse=True)
+
+def pack_messages(papers, max_length=DEFAULT_MAX_LENGTH):
+    """
+    Yield messages of at most `max_length` (as counted by WhatsApp), one category
+    at a time: a "📂 *Category*" header followed by as many papers as fit.
+    A category that does not fit continues in a "(cont.)" message.
+    """
+    if max_length < MIN_MAX_LENGTH:
+        raise ValueError(f"la longitud máxima de mensaje debe ser al menos {MIN_MAX_LENGTH}")
+    for category, group in group_by_primary_category(papers):
+        header = f"{CATEGORY_PREFIX} *{category}*"
+        # Every piece must fit in a message below the (longer) continuation header
+        budget = max_length - message_length(header + CONTINUED + PAPER_SEPARATOR)
+        current, has_papers = header, False
+        for paper in group:
+            for piece in split_text(format_block(paper), budget):
+                candidate = current + (PAPER_SEPARATOR if has_papers else '\n\n') + piece
+                if message_length(candidate) <= max_length:
+                    current, has_papers = candidate, True
+                    continue
+                yield current
+                current, has_papers = f"{header}{CONTINUED}\n\n{piece}", True
+        if has_papers:
+            yield current
+
+def make_sender(args):
+    """Build the sender selected on the command line."""
+    if args.sender == 'webhook':
+        if not args.webhook_url:
+            raise ValueError("--sender webhook requiere --webhook-url")
+        return WebhookSender(args.webhook_url, token=os.environ.get('WHATSAPP_WEBHOOK_TOKEN'), field=args.webhook_field)
+    if not args.output:
+        raise ValueError(f"--sender {args.sender} requiere la ruta de salida")
+    if args.sender == 'file':
+        return FileSender(args.output)
+    return TagUIQueueSender(args.output)
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera y envía los mensajes de WhatsApp desde los papers procesados.")
+    parser.add_argument('input_csv', help='CSV de papers procesados (OUT/ProcessedPapers.csv, o .jsonl).')
+    parser.add_argument('output', nargs='?', default=None,
+                        help='Cola JSON para EnviarWhatsapp.tag (OUT/WhatsappMensajes.json) o archivo de texto con --sender file.')
+    parser.add_argument('--sender', choices=('tagui', 'file', 'webhook'), default='tagui',
+                        help='Destino de los mensajes: cola de TagUI, archivo local o webhook HTTP (default tagui).')
+    parser.add_argument('--max-length', type=int, default=DEFAULT_MAX_LENGTH,
+                        help=f'Longitud máxima de cada mensaje (default {DEFAULT_MAX_LENGTH}).')
+    parser.add_argument('--one-per-paper', action='store_true', help='Un mensaje por paper, sin agrupar por categoría.')
+    parser.add_argument('--webhook-url', default=None, help='URL del gateway de WhatsApp (con --sender webhook); token en WHATSAPP_WEBHOOK_TOKEN.')
+    parser.add_argument('--webhook-field', default='text', help='Campo JSON con el texto del mensaje (default text).')
+    parser.add_argument('--retries', type=int, default=3, help='Reintentos por mensaje ante errores transitorios (default 3).')
+    parser.add_argument('--backoff', type=float, default=1.0, help='Espera base en segundos del backoff exponencial (default 1).')
+    parser.add_argument('--metrics', default=None, help='Reporte JSON de métricas de la corrida (se combina con las otras etapas).')
+    args = parser.parse_args()
+
+    with telemetria.stage('whatsapp', args.metrics) as metrics:
+        if not os.path.isfile(args.input_csv):
+            print(f"Error: no se encuentra el archivo de entrada: {args.input_csv}", file=sys.stderr)
+            sys.exit(1)
+
+        papers = process_csv_robust(args.input_csv)
+        if not papers:
+            print("No se encontraron papers válidos en el CSV", file=sys.stderr)
+            sys.exit(1)
+
+        try:
+            if args.one_per_paper:
+                messages = [format_message(paper) for paper in papers]
+            else:
+                messages = list(pack_messages(papers, args.max_length))
+            sender = make_sender(args)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        with sender:
+            stats = deliver(messages, sender, retries=args.retries, backoff=args.backoff, metrics=metrics)
+        metrics.set('rows_in', len(papers))
+        metrics.file_size('bytes_in', args.input_csv)
+        metrics.file_size('bytes_out', args.output)
+        print(f"{len(papers)} papers en {len(messages)} mensajes; enviados {stats['sent']} por {sender.name} "
+              f"en {stats['seconds']:.2f} s ({stats['messages_per_second']:.1f} mensajes/s, {stats['retries']} reintentos)")
+        if stats['failed']:
+            print(f"Advertencia: {stats['failed']} mensajes no se pudieron enviar", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+"""
+indice_busqueda.py
+
+Precomputed full-text search index for the portal. Titles, summaries and key points
+are tokenized and accent-folded at generation time into an inverted index that a
+small script (buscar.js) queries in the browser, loading only the shards a query
+needs instead of every card.
+
+Layout of the index directory:
+    meta.json          counts, encoding parameters and the stopwords left out of the index
+    t/<prefix>.json    {term: postings} for every term starting with <prefix>
+    d/<block>.json     document table in fixed-size blocks: [title, link, page, category, day]
+    buscar.js          the browser-side search script
+
+Postings are the sorted document ids of a term, delta-encoded in base 36 and joined
+with commas, e.g. "1k,3,a". Documents are appended, so adding a day only touches
+the shards of the terms it contains and the last document block.
+
+Usage:
+    index = SearchIndex('OUT/archivo/busqueda')
+    first, end = index.add(docs)
+    index.save()
+
+"""
+
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+
+PREFIX_LEN = 2
+BLOCK_SIZE = 500
+MIN_TERM_LEN = 2
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Very common words that would only produce huge postings lists
+STOPWORDS = frozenset("""
+a al and are as at be by con de del el en es for from in is la las los of on or para
+por que se su the this to un una we with y
+""".split())
+
+def fold(text):
+    """Lower-case and strip accents: 'Visión' -> 'vision'."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def tokenize(text):
+    """Set of index terms of a text."""
+    return {t for t in _TOKEN_RE.findall(fold(text))
+            if len(t) >= MIN_TERM_LEN and t not in STOPWORDS}
+
+def _base36(n):
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    out = ''
+    while True:
+        n, r = divmod(n, 36)
+        out = digits[r] + out
+        if not n:
+            return out
+
+def encode_postings(ids):
+    """Sorted ids -> delta-encoded base-36 string."""
+    parts = []
+    previous = 0
+    for doc_id in ids:
+        parts.append(_base36(doc_id - previous))
+        previous = doc_id
+    return ','.join(parts)
+
+def decode_postings(encoded):
+    """Inverse of encode_postings()."""
+    ids = []
+    current = 0
+    for part in encoded.split(',') if encoded else ():
+        current += int(part, 36)
+        ids.append(current)
+    return ids
+
+def _read_json(path, default):
+    if not os.path.isfile(path):
+        return default
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+class SearchIndex:
+    """
+    Append-only inverted index stored in a directory. Documents added with add()
+    and ranges dropped with remove() are applied to the shards on save().
+    """
+
+    def __init__(self, directory, reset=False):
+        self.directory = directory
+        self.meta = {'version': 1, 'docs': 0, 'prefix_len': PREFIX_LEN, 'block_size': BLOCK_SIZE}
+        if not reset:
+            self.meta.update(_read_json(os.path.join(directory, 'meta.json'), {}))
+        self._reset = reset
+        self._new_postings = defaultdict(list)   # term -> new ids (ascending)
+        self._new_docs = []
+        self._removed = []                        # [start, end) ranges
+
+    def add(self, docs):
+        """
+        Index documents, each a dict with title, link, page, category, day and text.
+        Returns the [first, end) range of ids they received.
+        """
+        first = self.meta['docs'] + len(self._new_docs)
+        for offset, doc in enumerate(docs):
+            doc_id = first + offset
+            for term in tokenize(doc['text']):
+                self._new_postings[term].append(doc_id)
+            self._new_docs.append([doc['title'], doc['link'], doc['page'], doc['category'], doc['day']])
+        return first, first + len(docs)
+
+    def remove(self, first, end):
+        """Drop the documents with ids in [first, end) (e.g. a day being re-rendered)."""
+        if end > first:
+            self._removed.append((first, end))
+
+    def _shard_path(self, prefix):
+        return os.path.join(self.directory, 't', prefix + '.json')
+
+    def _is_removed(self, doc_id):
+        return any(first <= doc_id < end for first, end in self._removed)
+
+    def save(self):
+        """Write the touched term shards, the document blocks and meta.json."""
+        os.makedirs(os.path.join(self.directory, 't'), exist_ok=True)
+        os.makedirs(os.path.join(self.directory, 'd'), exist_ok=True)
+        if self._reset:
+            for folder in ('t', 'd'):
+                for name in os.listdir(os.path.join(self.directory, folder)):
+                    os.remove(os.path.join(self.directory, folder, name))
+
+        # Removals have to visit every shard; additions only the prefixes they touch
+        by_prefix = defaultdict(dict)
+        for term, ids in self._new_postings.items():
+            by_prefix[term[:PREFIX_LEN]][term] = ids
+        prefixes = set(by_prefix)
+        if self._removed:
+            prefixes.update(name[:-len('.json')] for name in os.listdir(os.path.join(self.directory, 't'))
+                            if name.endswith('.json'))
+
+        for prefix in prefixes:
+            path = self._shard_path(prefix)
+            shard = _read_json(path, {})
+            if self._removed:
+                for term in list(shard):
+                    kept = [i for i in decode_postings(shard[term]) if not self._is_removed(i)]
+                    if kept:
+                        shard[term] = encode_postings(kept)
+                    else:
+                        del shard[term]
+            for term, ids in by_prefix.get(prefix, {}).items():
+                shard[term] = encode_postings(decode_postings(shard.get(term, '')) + ids)
+            if shard:
+                _write_json(path, shard)
+            elif os.path.isfile(path):
+                os.remove(path)
+
+        self._save_docs()
+        self.meta['docs'] += len(self._new_docs)
+        # The browser drops these from queries: they have no postings to intersect
+        self.meta['stopwords'] = sorted(STOPWORDS)
+        _write_json(os.path.join(self.directory, 'meta.json'), self.meta)
+        write_search_script(self.directory)
+        self._new_postings.clear()
+        self._new_docs = []
+        self._removed = []
+        self._reset = False
+
+    def _save_docs(self):
+        block_size = self.meta['block_size']
+        blocks = {}
+
+        def block(number):
+            if number not in blocks:
+                blocks[number] = _read_json(os.path.join(self.directory, 'd', f'{number}.json'), [])
+            return blocks[number]
+
+        for first, end in self._removed:
+            for doc_id in range(first, min(end, self.meta['docs'])):
+                entries = block(doc_id // block_size)
+                if doc_id % block_size < len(entries):
+                    entries[doc_id % block_size] = None
+        for offset, doc in enumerate(self._new_docs):
+            doc_id = self.meta['docs'] + offset
+            block(doc_id // block_size).append(doc)
+        for number, entries in blocks.items():
+            _write_json(os.path.join(self.directory, 'd', f'{number}.json'), entries)
+
+# Browser side: fetches meta.json, the shard of each query term and the document
+# blocks of the best hits. The last query word matches as a prefix (search as you type).
+SEARCH_JS = r"""(function () {
+    const script = document.currentScript;
+    const base = script.dataset.index.replace(/\/?$/, '/');
+    const root = script.dataset.root || '';
+    const input = document.getElementById('searchInput');
+    const results = document.getElementById('searchResults');
+    if (!input || !results) return;
+    const cache = {};
+    const get = (path) => cache[path] || (cache[path] = fetch(base + path).then(r => r.ok ? r.json() : {}));
+    const fold = (s) => s.toLowerCase().normalize('NFKD').replace(/[\u0300-\u036f]/g, '');
+    const decode = (s) => { let n = 0; return s ? s.split(',').map(p => (n += parseInt(p, 36))) : []; };
+    let meta = null;
+    let seq = 0;
+
+    async function postings(term, prefix) {
+        const shard = await get('t/' + term.slice(0, meta.prefix_len) + '.json');
+        if (!prefix) return new Set(decode(shard[term] || ''));
+        const ids = new Set();
+        for (const key in shard) if (key.startsWith(term)) decode(shard[key]).forEach(i => ids.add(i));
+        return ids;
+    }
+
+    async function search(query) {
+        meta = meta || await get('meta.json');
+        const stop = new Set(meta.stopwords || []);
+        const words = fold(query).split(/[^a-z0-9]+/).filter(t => t.length >= 2);
+        // A lone stopword is still useful as a prefix while typing ("de" -> "deep")
+        const kept = words.filter(t => !stop.has(t));
+        const terms = kept.length ? kept : words;
+        if (!terms.length) return [];
+        let hits = null;
+        for (let k = 0; k < terms.length; k++) {
+            const ids = await postings(terms[k], k === terms.length - 1);
+            hits = hits ? new Set([...hits].filter(i => ids.has(i))) : ids;
+            if (!hits.size) return [];
+        }
+        const top = [...hits].sort((a, b) => b - a).slice(0, 50);
+        const docs = [];
+        for (const id of top) {
+            const block = await get('d/' + Math.floor(id / meta.block_size) + '.json');
+            const doc = block[id % meta.block_size];
+            if (doc) docs.push(doc);
+        }
+        return docs;
+    }
+
+    function render(docs, query) {
+        results.textContent = '';
+        if (!query.trim()) return;
+        if (!docs.length) { results.textContent = 'Sin resultados'; return; }
+        for (const [title, link, page, category, day] of docs) {
+            const item = document.createElement('div');
+            item.className = 'search-result';
+            const a = document.createElement('a');
+            a.href = link || (root + page);
+            a.target = '_blank';
+            a.rel = 'noopener';
+            a.textContent = title;
+            const info = document.createElement('a');
+            info.href = root + page;
+            info.className = 'search-meta';
+            info.textContent = [category, day].filter(Boolean).join(' • ');
+            item.append(a, info);
+            results.append(item);
+        }
+    }
+
+    input.addEventListener('input', async () => {
+        const query = input.value;
+        const mine = ++seq;
+        const docs = await search(query);
+        if (mine === seq) render(docs, query);
+    });
+})();
+"""
+
+def write_search_script(directory):
+    """Write buscar.js into the index directory unless it is already up to date."""
+    path = os.path.join(directory, 'buscar.js')
+    if os.path.isfile(path):
+        with open(path, encoding='utf-8') as f:
+            if f.read() == SEARCH_JS:
+                return
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(SEARCH_JS)
@@ -0,0 +1,207 @@
+"""
+json_incremental.py
+
+Incremental parser for model answers shaped like {"papers": [{...}, {...}]}.
+Text is fed in arbitrary chunks (e.g. streamed tokens) and every paper object is
+returned as soon as its closing brace arrives, so it can be written out before the
+answer is complete. Chatty text around the JSON is ignored, and a cut-off answer
+still yields every paper that was completed, plus a best-effort repair of the last one.
+
+Usage:
+    parser = PapersStreamParser()
+    for chunk in chunks:
+        for paper in parser.feed(chunk):
+            handle(paper)
+    leftover = parser.finish()   # repaired partial paper or None
+
+"""
+
+import json
+import re
+
+_TRAILING_COMMA_RE = re.compile(r',\s*([\]}])')
+_PAPERS_KEY_RE = re.compile(r'"papers"\s*:\s*\[')
+
+def _escape_inner_quotes(text):
+    """
+    Escape double quotes the model left unescaped inside string values
+    ("resumen": "un modelo "robusto" para..."): a quote inside a string only
+    closes it when the next non-blank character can follow a JSON string.
+    """
+    out = []
+    in_string = escape = False
+    n = len(text)
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                j = i + 1
+                while j < n and text[j] in ' \t\r\n':
+                    j += 1
+                if j < n and text[j] not in ',:}]':
+                    out.append('\\"')
+                    continue
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        out.append(ch)
+    return ''.join(out)
+
+def loads_lenient(text):
+    """
+    json.loads that repairs the usual damage in model answers: trailing commas
+    before ] or }, raw line breaks or tabs inside strings and unescaped quotes
+    inside string values.
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    text = _TRAILING_COMMA_RE.sub(r'\1', text)
+    try:
+        return json.loads(text, strict=False)
+    except ValueError:
+        return json.loads(_escape_inner_quotes(text), strict=False)
+
+def _cut_to_last_member(text):
+    """Return (text up to the last comma outside strings, brace depth there)."""
+    depth = 0
+    in_string = escape = False
+    cut, cut_depth = 0, 0
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+        elif ch == ',':
+            cut, cut_depth = i, depth
+    return text[:cut], cut_depth
+
+class PapersStreamParser:
+    """
+    Scans streamed text for the "papers" array and emits each complete object in it.
+    Only the text of the object currently being received is kept in memory.
+    """
+
+    # States
+    _SEEK = 0      # looking for "papers": [
+    _ARRAY = 1     # inside the array, between objects
+    _OBJECT = 2    # inside an object
+    _DONE = 3      # the array was closed
+
+    def __init__(self, required_fields=('titulo_español', 'enlace')):
+        self.required_fields = required_fields
+        self.emitted = 0
+        self.errors = 0
+        self._state = self._SEEK
+        self._pending = ''      # unscanned text while seeking the array
+        self._obj = []          # pieces of the object being received
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self):
+        """True once the closing bracket of the papers array was seen."""
+        return self._state == self._DONE
+
+    def feed(self, chunk):
+        """Consume a chunk of text and return the list of paper dicts it completed."""
+        papers = []
+        if self._state == self._SEEK:
+            self._pending += chunk
+            match = _PAPERS_KEY_RE.search(self._pending)
+            if not match:
+                # Keep only a tail long enough to contain a split '"papers" : ['
+                self._pending = self._pending[-64:]
+                return papers
+            chunk = self._pending[match.end():]
+            self._pending = ''
+            self._state = self._ARRAY
+
+        start = 0
+        for i, ch in enumerate(chunk):
+            state = self._state
+            if state == self._ARRAY:
+                if ch == '{':
+                    self._state = self._OBJECT
+                    self._depth = 1
+                    start = i
+                elif ch == ']':
+                    self._state = self._DONE
+                    break
+            elif state == self._OBJECT:
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif ch == '\\':
+                        self._escape = True
+                    elif ch == '"':
+                        self._in_string = False
+                elif ch == '"':
+                    self._in_string = True
+                elif ch == '{':
+                    self._depth += 1
+                elif ch == '}':
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._obj.append(chunk[start:i + 1])
+                        paper = self._parse(''.join(self._obj))
+                        self._obj = []
+                        self._state = self._ARRAY
+                        if paper is not None:
+                            papers.append(paper)
+            else:
+                break
+        if self._state == self._OBJECT:
+            self._obj.append(chunk[start:])
+        return papers
+
+    def finish(self):
+        """
+        Call once the stream has ended. If an object was cut off, drop any member cut
+        mid-string, close its braces and return it when it still has the required fields.
+        """
+        if self._state != self._OBJECT or not self._obj:
+            return None
+        text = ''.join(self._obj)
+        depth = self._depth
+        self._obj = []
+        self._state = self._DONE
+        if self._in_string:
+            # The last value was cut mid-string: drop that member instead of keeping a truncated value
+            text, depth = _cut_to_last_member(text)
+        text = text.rstrip().rstrip(',')
+        if text.endswith(':'):
+            return None
+        return self._parse(text + '}' * depth)
+
+    def _parse(self, text):
+        try:
+            paper = loads_lenient(text)
+        except ValueError:
+            self.errors += 1
+            return None
+        if not isinstance(paper, dict) or not all(paper.get(f) for f in self.required_fields):
+            self.errors += 1
+            return None
+        self.emitted += 1
+        return paper
+
+def parse_papers(text, required_fields=('titulo_español', 'enlace')):
+    """Parse a complete answer; returns (papers, partial_paper_or_None)."""
+    parser = PapersStreamParser(required_fields)
+    papers = parser.feed(text)
+    return papers, parser.finish()
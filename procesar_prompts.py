@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+procesar_prompts.py
+
+Sends every prompt of OUT/Prompts.csv to an OpenAI-compatible chat completions
+endpoint (DeepSeek by default) and writes the papers found in each JSON answer to
+OUT/ProcessedPapers.csv, with the same columns AICSV.tag writes.
+
+Prompts are dispatched concurrently (bounded by --concurrency) with per-request
+timeouts and retries with exponential backoff; each answer is used as soon as
+the API returns it instead of waiting a fixed time. Answers are streamed and
+every paper is appended to the output as soon as its JSON object is complete,
+so a cut-off answer keeps the papers it already produced. Completed prompts are
+recorded in a journal next to the output, so an interrupted run can be resumed.
+
+Every paper is repaired and checked against the batch its prompt sent
+(validar_respuestas.py); papers missing from an answer, or rejected as invalid,
+are asked for again in a smaller follow-up prompt (--followups rounds).
+Prompts and output may also be typed JSON Lines (.jsonl paths, registros_jsonl.py).
+
+The API key is read from the LLM_API_KEY (or DEEPSEEK_API_KEY) environment variable.
+
+Usage:
+    python procesar_prompts.py OUT/Prompts.csv OUT/ProcessedPapers.csv
+    python procesar_prompts.py OUT/Prompts.csv OUT/ProcessedPapers.csv --concurrency 8 --model deepseek-chat
+    python procesar_prompts.py OUT/Prompts.csv OUT/ProcessedPapers.csv --base-url http://localhost:8000/v1
+    python procesar_prompts.py OUT/Prompts.csv OUT/ProcessedPapers.csv --resume
+    python procesar_prompts.py OUT/Prompts.csv OUT/ProcessedPapers.csv --followups 2
+
+"""
+
+import csv
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date
+
+from cache_resumenes import PROCESSED_FIELDS
+import registros_jsonl
+import telemetria
+from cliente_http import HttpClient, HttpError
+from json_incremental import PapersStreamParser, parse_papers
+from validar_respuestas import BatchValidator
+
+DEFAULT_BASE_URL = os.environ.get('LLM_BASE_URL', 'https://api.deepseek.com')
+DEFAULT_MODEL = os.environ.get('LLM_MODEL', 'deepseek-chat')
+
+# JSON answer key -> ProcessedPapers.csv column
+ANSWER_FIELDS = {
+    'titulo_español': 'titulo',
+    'categoria': 'categoria',
+    'resumen': 'resumen',
+    'puntos_clave': 'puntos_clave',
+    'enlace': 'enlace',
+}
+
+class RetryableError(Exception):
+    """A failure worth retrying (rate limit, server error, timeout, unparseable answer)."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def read_prompts(path):
+    """Read the 'prompt' column of a Prompts.csv (or Prompts.jsonl)."""
+    return [r['prompt'] for r in registros_jsonl.iter_rows(path, 'prompts') if (r.get('prompt') or '').strip()]
+
+def extract_papers(content):
+    """
+    Extract the list of paper objects from a complete model answer that should
+    contain {"papers": [...]}, tolerating surrounding text and trailing commas.
+    Raises ValueError if no papers can be parsed.
+    """
+    papers, partial = parse_papers(content or '', required_fields=())
+    if partial is not None:
+        papers.append(partial)
+    if not papers:
+        raise ValueError("no se encontró un arreglo 'papers' válido en la respuesta")
+    return papers
+
+def paper_to_row(paper, processed_date):
+    """Convert one answer object to a ProcessedPapers.csv row dict."""
+    row = {column: str(paper.get(key) or '') for key, column in ANSWER_FIELDS.items()}
+    row['fecha_procesado'] = processed_date
+    return row
+
+class ChatClient:
+    """Minimal client for an OpenAI-compatible /chat/completions endpoint."""
+
+    def __init__(self, http, base_url, api_key, model, timeout=180, temperature=0.3):
+        self.http = http
+        self.url = base_url.rstrip('/') + '/chat/completions'
+        self.model = model
+        self.timeout = timeout
+        self.temperature = temperature
+        self.headers = {'Content-Type': 'application/json'}
+        if api_key:
+            self.headers['Authorization'] = f'Bearer {api_key}'
+
+    def _body(self, prompt, stream):
+        return json.dumps({
+            'model': self.model,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'temperature': self.temperature,
+            'stream': stream,
+        })
+
+    @staticmethod
+    def _check_status(status, reason, headers):
+        if status == 429 or status >= 500:
+            retry_after = headers.get('Retry-After')
+            raise RetryableError(f"HTTP {status}",
+                                 retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None)
+        if status >= 400:
+            raise HttpError(status, reason, '')
+
+    def complete(self, prompt):
+        """Return the assistant message for `prompt`; raises RetryableError or HttpError."""
+        try:
+            response = self.http.post(self.url, self._body(prompt, False), headers=self.headers, timeout=self.timeout)
+        except OSError as e:
+            raise RetryableError(f"error de red: {e}") from e
+        self._check_status(response.status, response.reason, response.headers)
+        try:
+            data = json.loads(response.text())
+            return data['choices'][0]['message']['content']
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise RetryableError(f"respuesta de la API inválida: {e}") from e
+
+    def stream_complete(self, prompt):
+        """Yield the assistant message of `prompt` piece by piece as server-sent events arrive."""
+        try:
+            with self.http.stream('POST', self.url, self._body(prompt, True),
+                                  headers=self.headers, timeout=self.timeout) as resp:
+                if resp.status >= 400:
+                    resp.read()
+                    self._check_status(resp.status, resp.reason, resp.headers)
+                for raw in resp:
+                    line = raw.decode('utf-8', errors='replace').strip()
+                    if not line.startswith('data:'):
+                        continue
+                    payload = line[5:].strip()
+                    if payload == '[DONE]':
+                        resp.read()
+                        break
+                    try:
+                        delta = json.loads(payload)['choices'][0].get('delta') or {}
+                    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+                        continue
+                    if delta.get('content'):
+                        yield delta['content']
+        except HttpError:
+            # Non-retryable status (4xx): HttpError is an OSError, keep it from being wrapped
+            raise
+        except OSError as e:
+            raise RetryableError(f"error de red: {e}") from e
+
+class RowSink:
+    """
+    Thread-safe ProcessedPapers.csv writer that flushes every row as soon as it is
+    written (typed JSON Lines with `jsonl`). When resuming, `seen` holds the links
+    already in the file and papers with those links are not written again.
+    """
+
+    def __init__(self, f, processed_date, seen=None, jsonl=False):
+        self.f = f
+        self.processed_date = processed_date
+        if jsonl:
+            self.writer = registros_jsonl.JsonlWriter(f, 'procesados')
+        else:
+            self.writer = csv.DictWriter(f, fieldnames=PROCESSED_FIELDS, quoting=csv.QUOTE_ALL)
+        self.lock = threading.Lock()
+        self.written = 0
+        self.seen = seen
+        if seen is None:
+            self.writer.writeheader()
+            f.flush()
+
+    def write(self, paper):
+        row = paper_to_row(paper, self.processed_date)
+        with self.lock:
+            if self.seen is not None:
+                key = row['enlace'] or row['titulo']
+                if key in self.seen:
+                    return
+                self.seen.add(key)
+            self.writer.writerow(row)
+            self.f.flush()
+            self.written += 1
+
+class ValidatingSink:
+    """Passes to `sink` only the papers `validator` accepts, repaired."""
+
+    def __init__(self, sink, validator):
+        self.sink = sink
+        self.validator = validator
+
+    def write(self, paper):
+        paper = self.validator.check(paper)
+        if paper is not None:
+            self.sink.write(paper)
+
+def prompt_hash(prompt):
+    """Content hash identifying a prompt in the progress journal."""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+def journal_path(output_csv):
+    """Progress journal kept next to the output: one line per completed prompt."""
+    return output_csv + '.progreso'
+
+def read_journal(path):
+    """Hashes of the prompts already completed (empty if there is no journal)."""
+    if not os.path.isfile(path):
+        return set()
+    with open(path, encoding='utf-8') as f:
+        return {line.strip() for line in f if line.strip()}
+
+def pending_prompts(prompts, output_csv):
+    """Prompts whose answers are not yet in `output_csv` according to its journal."""
+    done = read_journal(journal_path(output_csv))
+    return [p for p in prompts if prompt_hash(p) not in done]
+
+def _existing_keys(output_csv):
+    return {r.get('enlace') or r.get('titulo') for r in registros_jsonl.iter_rows(output_csv, 'procesados')}
+
+def _paper_key(paper):
+    # Fields are checked later by the batch validator, so a paper may lack both
+    return paper.get('enlace') or paper.get('titulo_español') or json.dumps(paper, sort_keys=True, ensure_ascii=False)
+
+def _backoff_sleep(error, attempt, retries, backoff):
+    delay = getattr(error, 'retry_after', None) or backoff * (2 ** (attempt - 1))
+    delay += random.uniform(0, backoff)
+    print(f"  Reintento {attempt}/{retries} en {delay:.1f} s: {error}", file=sys.stderr)
+    time.sleep(delay)
+
+def process_prompt_streaming(chat, prompt, sink, retries=4, backoff=2.0, metrics=None):
+    """
+    Stream one prompt's answer, writing every paper to `sink` as soon as its object
+    is complete. A cut-off answer is retried; papers already written are not repeated.
+    When retries run out, a repaired partial last paper is kept if possible.
+    Request latency, time to first token, answer bytes, retries and parse failures
+    go to `metrics`.
+    Returns (papers_written, attempts, seconds).
+    """
+    metrics = metrics or telemetria.StageMetrics('llm')
+    start = time.perf_counter()
+    emitted = set()
+    attempt = 0
+    while True:
+        attempt += 1
+        parser = PapersStreamParser(required_fields=())
+        request_start = time.perf_counter()
+        first_piece = True
+        try:
+            for piece in chat.stream_complete(prompt):
+                if first_piece:
+                    first_piece = False
+                    metrics.observe('llm_first_token_seconds', time.perf_counter() - request_start)
+                metrics.count('bytes_in', len(piece.encode('utf-8')))
+                for paper in parser.feed(piece):
+                    key = _paper_key(paper)
+                    if key not in emitted:
+                        emitted.add(key)
+                        sink.write(paper)
+            if not parser.done:
+                metrics.count('incomplete_answers')
+                raise RetryableError("respuesta incompleta o sin arreglo 'papers'")
+            metrics.observe('llm_latency_seconds', time.perf_counter() - request_start)
+            metrics.count('parse_failures', parser.errors)
+            return len(emitted), attempt, time.perf_counter() - start
+        except RetryableError as e:
+            metrics.observe('llm_latency_seconds', time.perf_counter() - request_start)
+            if attempt > retries:
+                partial = parser.finish()
+                metrics.count('parse_failures', parser.errors)
+                if partial is not None and _paper_key(partial) not in emitted:
+                    emitted.add(_paper_key(partial))
+                    sink.write(partial)
+                if emitted:
+                    # Keep what was recovered rather than losing the whole batch
+                    return len(emitted), attempt, time.perf_counter() - start
+                raise
+            metrics.count('parse_failures', parser.errors)
+            metrics.count('retries')
+            _backoff_sleep(e, attempt, retries, backoff)
+
+def process_prompt(chat, prompt, sink, retries=4, backoff=2.0, metrics=None):
+    """
+    Send one prompt without streaming, write its papers to `sink` and return
+    (papers_written, attempts, seconds). Retries rate limits, server errors,
+    timeouts and unparseable answers with exponential backoff and jitter.
+    Request latency, answer bytes, retries and parse failures go to `metrics`.
+    """
+    metrics = metrics or telemetria.StageMetrics('llm')
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+        request_start = time.perf_counter()
+        try:
+            content = chat.complete(prompt)
+            metrics.observe('llm_latency_seconds', time.perf_counter() - request_start)
+            metrics.count('bytes_in', len((content or '').encode('utf-8')))
+            papers = extract_papers(content)
+            break
+        except (RetryableError, ValueError) as e:
+            if isinstance(e, ValueError):
+                metrics.count('parse_failures')
+            else:
+                metrics.observe('llm_latency_seconds', time.perf_counter() - request_start)
+            if attempt > retries:
+                raise
+            metrics.count('retries')
+            _backoff_sleep(e, attempt, retries, backoff)
+    for paper in papers:
+        sink.write(paper)
+    return len(papers), attempt, time.perf_counter() - start
+
+def run(prompts, chat, output_csv, concurrency=4, retries=4, backoff=2.0, stream=True, metrics=None,
+        resume=False, followups=1):
+    """
+    Process all prompts concurrently. Rows are appended to `output_csv` as soon as
+    each paper is available, so later stages can start reading before the end.
+    Papers are validated against their prompt's batch, and up to `followups`
+    follow-up prompts ask again for the ones missing or invalid.
+    Every completed prompt is recorded in a journal next to the output; with
+    `resume`, prompts already in the journal are skipped and new rows are appended
+    to the existing output. Per-prompt timings and failures are recorded in
+    `metrics` when given. Returns (papers_written, failed_prompts).
+    """
+    metrics = metrics or telemetria.StageMetrics('llm')
+    worker = process_prompt_streaming if stream else process_prompt
+    journal = journal_path(output_csv)
+    resume = resume and os.path.isfile(output_csv)
+    done = read_journal(journal) if resume else set()
+    seen = _existing_keys(output_csv) if resume else None
+    if done:
+        print(f"Retomando: {sum(prompt_hash(p) in done for p in prompts)}/{len(prompts)} prompts ya procesados")
+    failed = 0
+    journal_lock = threading.Lock()
+    with open(output_csv, 'a' if resume else 'w', newline='', encoding='utf-8') as f, \
+            open(journal, 'a' if resume else 'w', encoding='utf-8') as journal_f, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        sink = RowSink(f, date.today().isoformat(), seen=seen, jsonl=registros_jsonl.is_jsonl(output_csv))
+
+        def task(prompt, number):
+            validator = BatchValidator(prompt)
+            checked = ValidatingSink(sink, validator)
+            _, attempts, seconds = worker(chat, prompt, checked, retries, backoff, metrics)
+            for _ in range(followups):
+                followup = validator.followup_prompt()
+                if followup is None:
+                    break
+                missing = len(validator.missing())
+                received = validator.received
+                metrics.count('followup_prompts')
+                print(f"Prompt {number}/{len(prompts)}: pidiendo de nuevo {missing} papers faltantes")
+                try:
+                    _, more_attempts, more_seconds = worker(chat, followup, checked, retries, backoff, metrics)
+                except (RetryableError, ValueError, HttpError) as e:
+                    print(f"Prompt {number}/{len(prompts)}: falló el pedido de faltantes ({e})", file=sys.stderr)
+                    break
+                attempts += more_attempts
+                seconds += more_seconds
+                metrics.count('papers_recovered', validator.received - received)
+            missing = validator.missing()
+            if missing:
+                print(f"Prompt {number}/{len(prompts)}: {len(missing)} papers sin respuesta válida: "
+                      + ', '.join(entry[3] for entry in missing), file=sys.stderr)
+            metrics.count('papers_missing', len(missing))
+            metrics.count('papers_invalid', validator.invalid)
+            metrics.count('papers_repaired', validator.repaired)
+            metrics.count('papers_unmatched', validator.unmatched)
+            # Journaled by the worker itself, so prompts finishing during an interrupt are kept
+            with journal_lock:
+                journal_f.write(prompt_hash(prompt) + '\n')
+                journal_f.flush()
+            return validator.accepted, attempts, seconds
+
+        futures = {pool.submit(task, p, number): number
+                   for number, p in enumerate(prompts, start=1) if prompt_hash(p) not in done}
+        metrics.set('prompts_resumed', len(prompts) - len(futures))
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                number = futures[future]
+                try:
+                    count, attempts, seconds = future.result()
+                except (RetryableError, ValueError, HttpError) as e:
+                    failed += 1
+                    metrics.count('errors')
+                    print(f"Prompt {number}/{len(prompts)}: ERROR ({e})", file=sys.stderr)
+                    continue
+                metrics.observe('prompt_seconds', seconds)
+                print(f"Prompt {number}/{len(prompts)}: {count} papers en {seconds:.1f} s ({attempts} intento/s)")
+        except KeyboardInterrupt:
+            # Let the prompts in flight finish (and be journaled); drop the queued ones
+            for future in futures:
+                future.cancel()
+            raise
+        return sink.written, failed
+
+def main():
+    parser = argparse.ArgumentParser(description="Procesa los prompts con una API de chat compatible con OpenAI.")
+    parser.add_argument('prompts_csv', help='CSV con la columna "prompt" (OUT/Prompts.csv, o .jsonl).')
+    parser.add_argument('output_csv', help='CSV de salida con los papers procesados (OUT/ProcessedPapers.csv, o .jsonl).')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help=f'URL base de la API (default {DEFAULT_BASE_URL}).')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help=f'Modelo a usar (default {DEFAULT_MODEL}).')
+    parser.add_argument('--concurrency', '-c', type=int, default=4, help='Prompts enviados en paralelo (default 4).')
+    parser.add_argument('--timeout', type=float, default=180, help='Timeout por pedido en segundos (default 180).')
+    parser.add_argument('--retries', type=int, default=4, help='Reintentos por prompt ante errores transitorios (default 4).')
+    parser.add_argument('--backoff', type=float, default=2.0, help='Espera base en segundos del backoff exponencial (default 2).')
+    parser.add_argument('--no-stream', action='store_true',
+                        help='Esperar la respuesta completa en lugar de procesarla en streaming.')
+    parser.add_argument('--resume', action='store_true',
+                        help='Retomar una corrida interrumpida: omite los prompts ya completados y agrega al CSV existente.')
+    parser.add_argument('--followups', type=int, default=1,
+                        help='Rondas de pedidos con solo los papers faltantes o inválidos de cada prompt (default 1, 0 desactiva).')
+    parser.add_argument('--metrics', default=None, help='Reporte JSON de métricas de la corrida (se combina con las otras etapas).')
+    args = parser.parse_args()
+
+    with telemetria.stage('llm', args.metrics) as metrics:
+        if not os.path.isfile(args.prompts_csv):
+            print(f"Error: no se encuentra el archivo de prompts: {args.prompts_csv}", file=sys.stderr)
+            sys.exit(1)
+
+        prompts = read_prompts(args.prompts_csv)
+        api_key = os.environ.get('LLM_API_KEY') or os.environ.get('DEEPSEEK_API_KEY')
+        if not api_key:
+            print("Advertencia: no se definió LLM_API_KEY ni DEEPSEEK_API_KEY; se envían pedidos sin autenticación.", file=sys.stderr)
+
+        print(f"Encontrados {len(prompts)} prompts para procesar")
+        start = time.perf_counter()
+        with HttpClient(max_per_host=max(1, args.concurrency), timeout=args.timeout) as http:
+            chat = ChatClient(http, args.base_url, api_key, args.model, timeout=args.timeout)
+            written, failed = run(prompts, chat, args.output_csv, concurrency=args.concurrency,
+                                  retries=args.retries, backoff=args.backoff, stream=not args.no_stream,
+                                  metrics=metrics, resume=args.resume, followups=args.followups)
+        metrics.set('rows_in', len(prompts))
+        metrics.set('rows_out', written)
+        metrics.set('http_requests', http.requests)
+        metrics.file_size('bytes_out', args.output_csv)
+        print(f"Procesados {len(prompts) - failed}/{len(prompts)} prompts, {written} papers guardados en "
+              f"{args.output_csv} ({time.perf_counter() - start:.1f} s)")
+
+        if prompts and failed == len(prompts):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+recursos_estaticos.py
+
+Static assets and precompressed output for the portal. The stylesheet and script
+shared by every page are minified and written once under a content-hash name
+(portal.3f9a1c2b7e.css): a file with that name never changes, so it is only
+written when the content does and browsers can cache it indefinitely.
+
+Every asset and page can also get precompressed siblings (page.html.gz, and
+page.html.br when the optional brotli package is installed), so a static server
+(nginx gzip_static / brotli_static, Caddy precompressed) serves them with no
+compression work per request.
+
+Usage:
+    css = write_asset('OUT/archivo/assets', 'portal', 'css', minify_css(PORTAL_CSS))
+    precompress('OUT/portal_noticias.html')
+
+"""
+
+import gzip
+import hashlib
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz siblings are written without it
+    brotli = None
+
+ASSETS_DIR = 'assets'
+HASH_LEN = 10
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCT_RE = re.compile(r'\s*([{};,>])\s*')
+_CSS_COLON_RE = re.compile(r':\s+')
+
+def minify_css(text):
+    """Drop comments and whitespace that CSS does not need."""
+    text = _CSS_COMMENT_RE.sub('', text)
+    text = _CSS_SPACE_RE.sub(' ', text)
+    text = _CSS_PUNCT_RE.sub(r'\1', text)
+    # Only the space after a colon: the one before may be a descendant selector (a :hover)
+    text = _CSS_COLON_RE.sub(':', text)
+    return text.replace(';}', '}').strip()
+
+def minify_js(text):
+    """
+    Conservative JS minification: indentation, blank lines and whole-line //
+    comments are removed, line breaks are kept so automatic semicolons still apply.
+    """
+    lines = (line.strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+def content_hash(text):
+    """Short hex digest naming an asset after its content."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:HASH_LEN]
+
+def _write_atomic(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def precompress(path, data=None):
+    """
+    Write the .gz (and, with brotli, .br) siblings of a file. The gzip header
+    carries no timestamp, so unchanged content compresses to identical bytes.
+    Returns the paths written.
+    """
+    if data is None:
+        with open(path, 'rb') as f:
+            data = f.read()
+    written = [path + '.gz']
+    _write_atomic(written[0], gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        written.append(path + '.br')
+        _write_atomic(written[1], brotli.compress(data))
+    return written
+
+def _siblings_complete(path):
+    return os.path.isfile(path + '.gz') and (brotli is None or os.path.isfile(path + '.br'))
+
+def write_asset(directory, stem, ext, text, compress=True):
+    """
+    Write `text` as <directory>/<stem>.<hash>.<ext> unless that file already
+    exists (same name, same content), with its precompressed siblings.
+    Returns (file_name, written).
+    """
+    name = f"{stem}.{content_hash(text)}.{ext}"
+    path = os.path.join(directory, name)
+    written = False
+    if not os.path.isfile(path):
+        os.makedirs(directory, exist_ok=True)
+        _write_atomic(path, text.encode('utf-8'))
+        written = True
+    if compress and (written or not _siblings_complete(path)):
+        precompress(path)
+    return name, written
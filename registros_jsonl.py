@@ -0,0 +1,127 @@
+"""
+registros_jsonl.py
+
+Typed JSON Lines intermediate format, an optional alternative to the CSV files
+the stages pass to each other. The first line is a header naming the schema and
+its fields; every following line is one record, a JSON array in field order:
+
+    {"schema": "procesados", "version": 1, "fields": ["titulo", "categoria", ...]}
+    ["🤖 Título", "📂 Inteligencia Artificial", "📝 ...", "🎯 ...", "🔗 https://arxiv.org/abs/2410.01234", "2025-08-27"]
+
+A path ending in .jsonl selects this format in every stage; any other path
+keeps CSV. Readers need none of the CSV guessing (duplicate header rows, header
+sniffing): the header says which column is which. Files are memory-mapped and
+decoded one line at a time straight from the mapping, and records whose field
+order matches the schema are handed out as decoded, without reshaping.
+
+Usage:
+    with open('OUT/ProcessedPapers.jsonl', 'w', encoding='utf-8') as f:
+        writer = JsonlWriter(f, 'procesados')
+        writer.writeheader()
+        writer.writerow(row)
+    rows = list(read_records('OUT/ProcessedPapers.jsonl', 'procesados'))
+
+"""
+
+import csv
+import json
+import mmap
+import os
+
+FORMAT_VERSION = 1
+EXTENSION = '.jsonl'
+
+# Fields of every intermediate file, in order
+SCHEMAS = {
+    'papers': ('name', 'Description', 'URL', 'Category'),
+    'prompts': ('prompt',),
+    'procesados': ('titulo', 'categoria', 'resumen', 'puntos_clave', 'enlace', 'fecha_procesado'),
+}
+
+def is_jsonl(path):
+    """True when `path` selects the JSON Lines format."""
+    return bool(path) and path != '-' and path.lower().endswith(EXTENSION)
+
+class JsonlWriter:
+    """Writes records of one schema; same writeheader/writerow interface as csv.DictWriter."""
+
+    def __init__(self, f, schema):
+        self.f = f
+        self.schema = schema
+        self.fields = SCHEMAS[schema]
+
+    def writeheader(self):
+        header = {'schema': self.schema, 'version': FORMAT_VERSION, 'fields': list(self.fields)}
+        self.f.write(json.dumps(header, ensure_ascii=False) + '\n')
+
+    def writerow(self, row):
+        values = ['' if row.get(field) is None else str(row[field]) for field in self.fields]
+        self.f.write(json.dumps(values, ensure_ascii=False) + '\n')
+
+    def writerows(self, rows):
+        for row in rows:
+            self.writerow(row)
+
+def dict_writer(f, path, schema, **csv_options):
+    """A JsonlWriter for .jsonl paths, otherwise a csv.DictWriter with the schema's fields."""
+    if is_jsonl(path):
+        return JsonlWriter(f, schema)
+    return csv.DictWriter(f, fieldnames=SCHEMAS[schema], **csv_options)
+
+def _iter_lines(path):
+    """Yield the non-blank lines of a file as bytes, read through a memory map."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos, size = 0, len(mm)
+            while pos < size:
+                end = mm.find(b'\n', pos)
+                if end == -1:
+                    end = size
+                if end > pos:
+                    line = mm[pos:end]
+                    if line.strip():
+                        yield line
+                pos = end + 1
+
+def read_values(path, schema):
+    """
+    Yield each record of a .jsonl file as a list in the order of `schema`'s fields.
+    Raises ValueError if the file is not of that schema.
+    """
+    lines = _iter_lines(path)
+    first = next(lines, None)
+    if first is None:
+        return
+    header = json.loads(first)
+    if not isinstance(header, dict) or header.get('schema') != schema:
+        raise ValueError(f"{path}: se esperaba el esquema '{schema}', no {header.get('schema')!r}"
+                         if isinstance(header, dict) else f"{path}: falta el encabezado del esquema")
+    if header.get('version', FORMAT_VERSION) > FORMAT_VERSION:
+        raise ValueError(f"{path}: versión de formato {header['version']} no soportada")
+    fields = SCHEMAS[schema]
+    stored = header.get('fields') or list(fields)
+    if tuple(stored) == fields:
+        for line in lines:
+            yield json.loads(line)
+        return
+    # Written with another field order (or a subset): reorder, missing fields empty
+    positions = [stored.index(field) if field in stored else None for field in fields]
+    for line in lines:
+        values = json.loads(line)
+        yield [values[i] if i is not None and i < len(values) else '' for i in positions]
+
+def read_records(path, schema):
+    """Yield each record of a .jsonl file as a dict keyed by the schema's fields."""
+    fields = SCHEMAS[schema]
+    for values in read_values(path, schema):
+        yield dict(zip(fields, values))
+
+def iter_rows(path, schema):
+    """Yield the rows of an intermediate file as dicts, whichever format it is in."""
+    if is_jsonl(path):
+        yield from read_records(path, schema)
+        return
+    with open(path, newline='', encoding='utf-8') as f:
+        yield from csv.DictReader(f)
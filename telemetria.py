@@ -0,0 +1,239 @@
+"""
+telemetria.py
+
+Per-stage run metrics for the pipeline. Every stage (download, prompts, LLM,
+cache merge, portal) records its wall time, rows in and out, bytes, error and
+parse-failure counts, and latency histograms. With --metrics PATH each stage
+merges its section into a JSON run report and rewrites a Prometheus textfile
+next to it (PATH with a .prom extension) for node_exporter's textfile collector.
+
+Usage:
+    with stage('prompts', args.metrics) as metrics:
+        for row in metrics.counted(rows, 'rows_in'):
+            ...
+        metrics.count('rows_out', total)
+        metrics.observe('llm_latency_seconds', 12.3)
+
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+
+# Upper bounds in seconds; sized for LLM requests that take from seconds to minutes
+DEFAULT_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 180, 300)
+
+METRIC_PREFIX = 'papper'
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus style (cumulative on export)."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self):
+        return {'buckets': list(self.buckets), 'counts': self.counts, 'sum': round(self.sum, 6), 'count': self.count}
+
+class StageMetrics:
+    """
+    Metrics of one stage run. Counters and histograms are thread-safe; use the
+    instance as a context manager to time the stage and record its status.
+    """
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.counters = {}
+        self.histograms = {}
+        self.status = 'running'
+        self.started = None
+        self.seconds = 0.0
+        self._start = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self._start
+        # sys.exit(0) inside the stage still counts as a success
+        failed = exc_type is not None and not (exc_type is SystemExit and not getattr(exc, 'code', 1))
+        self.status = 'error' if failed else 'ok'
+        return False
+
+    def count(self, name, value=1):
+        """Add `value` to a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        """Set a counter to an absolute value (e.g. a file size)."""
+        with self._lock:
+            self.counters[name] = value
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS):
+        """Record one sample in a histogram."""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def counted(self, iterable, name):
+        """Yield from `iterable`, adding one to counter `name` per item."""
+        for item in iterable:
+            self.count(name)
+            yield item
+
+    def file_size(self, name, path):
+        """Record the size of a file, if it is a regular file (not stdin/stdout)."""
+        if path and path != '-' and os.path.isfile(path):
+            self.set(name, os.path.getsize(path))
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'status': self.status,
+                'started': self.started,
+                'wall_seconds': round(self.seconds, 6),
+                'counters': dict(self.counters),
+                'histograms': {name: h.to_dict() for name, h in self.histograms.items()},
+            }
+
+def _atomic_write(path, text):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+@contextmanager
+def _report_lock(path, stale_after=60):
+    """
+    Exclusive lock on a report shared by stages running in parallel, held as a
+    <path>.lock file created with O_EXCL (works on Windows too). A lock older than
+    `stale_after` seconds was left by a killed process and is taken over.
+    """
+    lock_path = path + '.lock'
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > stale_after:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue   # released between the two calls
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+def prometheus_path(report_path):
+    """OUT/metricas.json -> OUT/metricas.prom"""
+    return os.path.splitext(report_path)[0] + '.prom'
+
+def to_prometheus(report):
+    """Render a run report in the Prometheus text exposition format."""
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+
+    stages = sorted(report.get('stages', {}).items())
+    family('stage_duration_seconds', 'gauge', 'Wall time of the last run of each stage.')
+    for stage, data in stages:
+        lines.append(f'{METRIC_PREFIX}_stage_duration_seconds{{stage="{stage}"}} {data["wall_seconds"]}')
+    family('stage_success', 'gauge', '1 if the last run of the stage finished without error.')
+    for stage, data in stages:
+        lines.append(f'{METRIC_PREFIX}_stage_success{{stage="{stage}"}} {int(data["status"] == "ok")}')
+    family('stage_last_run_timestamp_seconds', 'gauge', 'Unix time of the last run of each stage.')
+    for stage, data in stages:
+        lines.append(f'{METRIC_PREFIX}_stage_last_run_timestamp_seconds{{stage="{stage}"}} {data.get("finished_unix", 0)}')
+
+    counter_names = sorted({name for _, data in stages for name in data['counters']})
+    for name in counter_names:
+        family(f'stage_{name}', 'gauge', f'{name} of the last run of each stage.')
+        for stage, data in stages:
+            if name in data['counters']:
+                lines.append(f'{METRIC_PREFIX}_stage_{name}{{stage="{stage}"}} {data["counters"][name]}')
+
+    histogram_names = sorted({name for _, data in stages for name in data['histograms']})
+    for name in histogram_names:
+        family(name, 'histogram', f'{name} of the last run.')
+        for stage, data in stages:
+            h = data['histograms'].get(name)
+            if h is None:
+                continue
+            cumulative = 0
+            for bound, n in zip(h['buckets'] + ['+Inf'], h['counts']):
+                cumulative += n
+                lines.append(f'{METRIC_PREFIX}_{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{METRIC_PREFIX}_{name}_sum{{stage="{stage}"}} {h["sum"]}')
+            lines.append(f'{METRIC_PREFIX}_{name}_count{{stage="{stage}"}} {h["count"]}')
+    return '\n'.join(lines) + '\n'
+
+def write_report(metrics, path):
+    """
+    Merge this stage's metrics into the JSON run report at `path` (created if
+    missing) and rewrite the Prometheus textfile next to it. Stages running at the
+    same time take turns through a lock file, so none overwrites another's section.
+    Returns the report.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with _report_lock(path):
+        return _merge_report(metrics, path)
+
+def _merge_report(metrics, path):
+    report = {'stages': {}}
+    if os.path.isfile(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                report = json.load(f)
+        except ValueError:
+            pass
+    report.setdefault('stages', {})
+    report.setdefault('run_started', metrics.started)
+
+    entry = metrics.to_dict()
+    entry['finished_unix'] = int(time.time())
+    report['stages'][metrics.stage] = entry
+    report['updated'] = datetime.now().isoformat(timespec='seconds')
+    report['total_wall_seconds'] = round(sum(s['wall_seconds'] for s in report['stages'].values()), 6)
+
+    _atomic_write(path, json.dumps(report, indent=2, ensure_ascii=False))
+    _atomic_write(prometheus_path(path), to_prometheus(report))
+    return report
+
+@contextmanager
+def stage(name, report_path=None):
+    """
+    Time a stage and yield its StageMetrics; on exit (including sys.exit and
+    errors) the metrics are written to `report_path` when one is given.
+    """
+    metrics = StageMetrics(name)
+    try:
+        with metrics:
+            yield metrics
+    finally:
+        if report_path:
+            write_report(metrics, report_path)
@@ -0,0 +1,84 @@
+"""
+Tests of the shared arXiv identifier parsing and of clean_url, which rebuilds
+arXiv links from it and must leave every other link alone.
+
+Usage:
+    python -m unittest tests.test_arxiv_ids
+
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import arxiv_ids
+from generar_portal import clean_url
+
+class ParseTest(unittest.TestCase):
+
+    def assertParses(self, text, arxiv_id, version=None):
+        self.assertEqual(arxiv_ids.parse(text), (arxiv_id, version), text)
+
+    def test_arxiv_links(self):
+        self.assertParses('https://arxiv.org/abs/2410.01234', '2410.01234')
+        self.assertParses('https://arxiv.org/pdf/2410.01234v2.pdf', '2410.01234', 2)
+        self.assertParses('https://export.arxiv.org/abs/2410.01234v1', '2410.01234', 1)
+        self.assertParses('https://arxiv.org/html/2410.01234v3', '2410.01234', 3)
+        self.assertParses('https://arxiv.org/abs/hep-th/9901001v2', 'hep-th/9901001', 2)
+        self.assertParses('//arxiv.org/abs/math.GT/0309136', 'math.GT/0309136')
+
+    def test_links_echoed_by_the_llm(self):
+        self.assertParses('🔗 https://arxiv.org/abs/2410.01234', '2410.01234')
+        self.assertParses('https://https://arxiv.org/abs/2410.01234', '2410.01234')
+        self.assertParses('🔗 https://arxiv.org/abs/2410. 01234', '2410.01234')
+        self.assertParses('https://xn--arxiv-abc.org https://arxiv.org/abs/2410.01234', '2410.01234')
+        self.assertParses('/abs/2410.01234', '2410.01234')
+
+    def test_prefixed_and_bare_ids(self):
+        self.assertParses('arXiv:2410.01234v2', '2410.01234', 2)
+        self.assertParses('arXiv: hep-th/9901001', 'hep-th/9901001')
+        self.assertParses(' 2410.01234 ', '2410.01234')
+        self.assertParses('cond-mat/0102536', 'cond-mat/0102536')
+
+    def test_same_paper_linked_twice(self):
+        self.assertParses('https://arxiv.org/abs/2410.01234 https://arxiv.org/pdf/2410.01234', '2410.01234')
+
+    def test_no_arxiv_context(self):
+        for text in ('https://doi.org/10.1145/1234.56789',
+                     'doi:10.1109/5.1234567',
+                     'https://example.com/page/1234567',
+                     'http://example.com/math/1234567',
+                     'https://github.com/org/repo/releases/tag/2410.01234',
+                     'version 2410.01234 of the dataset'):
+            self.assertIsNone(arxiv_ids.parse(text), text)
+
+    def test_invalid_month(self):
+        self.assertIsNone(arxiv_ids.parse('https://arxiv.org/abs/2413.01234'))
+        self.assertIsNone(arxiv_ids.parse('https://arxiv.org/abs/2400.01234'))
+        self.assertIsNone(arxiv_ids.parse('arXiv:hep-th/9913001'))
+
+    def test_several_different_ids(self):
+        self.assertIsNone(arxiv_ids.parse('see arXiv:2410.01234 and arXiv:2411.00001'))
+        self.assertIsNone(arxiv_ids.parse('see 2410.01234 and 2411.00001'))
+
+    def test_canonical_id(self):
+        self.assertEqual(arxiv_ids.canonical_arxiv_id('https://arxiv.org/pdf/2410.01234v2'), '2410.01234')
+        self.assertEqual(arxiv_ids.canonical_arxiv_id('https://doi.org/10.1145/1234.56789'), '')
+
+class CleanUrlTest(unittest.TestCase):
+
+    def test_arxiv_links_are_rebuilt(self):
+        self.assertEqual(clean_url('🔗 https://https://arxiv.org/abs/2410.01234'), 'https://arxiv.org/abs/2410.01234')
+        self.assertEqual(clean_url('arxiv.org/pdf/2410.01234v2.pdf'), 'https://arxiv.org/pdf/2410.01234v2')
+
+    def test_other_links_are_unchanged(self):
+        for url in ('https://doi.org/10.1145/1234.56789',
+                    'https://example.com/page/1234567',
+                    'https://github.com/org/repo/releases/tag/2410.01234',
+                    'https://www.nature.com/articles/s41586-024-01234-5'):
+            self.assertEqual(clean_url(url), url)
+
+if __name__ == '__main__':
+    unittest.main()
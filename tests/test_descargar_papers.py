@@ -0,0 +1,171 @@
+"""
+Tests of descargar_papers.py against a local stand-in for arXiv: an http.server
+that serves a recorded /list/cs.AI/new page and answers 503 for cs.XX.
+
+Usage:
+    python -m unittest tests.test_descargar_papers
+    python -m pytest tests
+
+"""
+
+import csv
+import functools
+import http.server
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import descargar_papers
+from cliente_http import HttpClient, HttpError
+
+FIXTURES = os.path.join(ROOT, 'tests', 'fixtures')
+LISTING = os.path.join(FIXTURES, 'list_cs.AI_new.html')
+
+NEW_IDS = ['2410.01234', '2410.05678']
+CROSS_ID = '2410.09999'
+
+class ListingHandler(http.server.BaseHTTPRequestHandler):
+    """Recorded listing for cs.AI, a server error for cs.XX, 404 for anything else."""
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/list/cs.AI/new':
+            with open(LISTING, 'rb') as f:
+                body = f.read()
+            self.send_response(200)
+        elif path == '/list/cs.XX/new':
+            body = b'Service Unavailable'
+            self.send_response(503)
+        else:
+            body = b'Not Found'
+            self.send_response(404)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class ListingServerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), ListingHandler)
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.client = HttpClient()
+        self.fetcher = functools.partial(descargar_papers.fetch, client=self.client)
+
+    def tearDown(self):
+        self.client.close()
+
+    def fetch_rows(self, code='cs.AI', include_cross=False):
+        return descargar_papers.fetch_category(self.base_url, code, 'Artificial Intelligence', self.fetcher,
+                                               include_cross=include_cross)
+
+class ParseListingTest(unittest.TestCase):
+
+    def test_entries_and_sections(self):
+        with open(LISTING, encoding='utf-8') as f:
+            page = descargar_papers.parse_listing(f.read())
+        self.assertEqual(page.total_new, 2)
+        self.assertEqual([e['id'] for e in page.entries], NEW_IDS + [CROSS_ID, '2401.00042'])
+        self.assertEqual([e['section'] for e in page.entries], ['new', 'new', 'cross', 'replace'])
+
+    def test_title_and_abstract_text(self):
+        with open(LISTING, encoding='utf-8') as f:
+            first = descargar_papers.parse_listing(f.read()).entries[0]
+        # The "Title:" descriptor is dropped, nested markup and entities are flattened
+        self.assertEqual(first['title'], 'Planning with Language Models: A Survey & Benchmark')
+        self.assertEqual(first['abstract'], 'We survey planning with large language models and propose '
+                                            'a benchmark of $10^3$ tasks where agents score <40%.')
+
+class FetchCategoryTest(ListingServerTest):
+
+    def test_new_submissions_only(self):
+        rows = self.fetch_rows()
+        self.assertEqual([r['URL'] for r in rows], [f'https://arxiv.org/pdf/{i}' for i in NEW_IDS])
+        self.assertEqual(rows[1], {
+            'name': 'Causal Abstractions for Reinforcement Learning',
+            'Description': 'Causal abstractions let agents transfer policies between environments.',
+            'URL': 'https://arxiv.org/pdf/2410.05678',
+            'Category': 'Artificial Intelligence',
+        })
+
+    def test_cross_lists_when_requested(self):
+        rows = self.fetch_rows(include_cross=True)
+        self.assertEqual([r['URL'].rsplit('/', 1)[1] for r in rows], NEW_IDS + [CROSS_ID])
+
+    def test_error_status_raises(self):
+        with self.assertRaises(HttpError) as raised:
+            self.fetch_rows(code='cs.XX')
+        self.assertEqual(raised.exception.status, 503)
+
+    def test_fetch_all_reports_failed_category(self):
+        results = descargar_papers.fetch_all([('cs.AI', 'Artificial Intelligence'), ('cs.XX', 'Broken')],
+                                             self.base_url, self.client, parallel=2)
+        (_, _, ai_rows, _), (_, _, xx_rows, xx_stats) = results
+        self.assertEqual(len(ai_rows), 2)
+        self.assertIsNone(xx_rows)
+        self.assertIn('503', xx_stats['error'])
+
+class CommandLineTest(ListingServerTest):
+
+    def run_script(self, categories, *options):
+        with tempfile.TemporaryDirectory() as tmp:
+            xpaths = os.path.join(tmp, 'xpaths.csv')
+            output = os.path.join(tmp, 'AutoPapper.csv')
+            with open(xpaths, 'w', encoding='utf-8') as f:
+                f.write('xpath, category\n')
+                for code, name in categories:
+                    f.write(f'//*[@id="{code}"], "{name}"\n')
+            result = subprocess.run([sys.executable, os.path.join(ROOT, 'descargar_papers.py'), xpaths, output,
+                                     '--base-url', self.base_url, '--delay', '0', *options],
+                                    capture_output=True, text=True, timeout=60)
+            rows = None
+            if os.path.isfile(output):
+                with open(output, newline='', encoding='utf-8') as f:
+                    rows = list(csv.DictReader(f))
+        return result, rows
+
+    def test_writes_autopapper_csv(self):
+        result, rows = self.run_script([('cs.AI', 'Artificial Intelligence')])
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual([r['name'] for r in rows], ['Planning with Language Models: A Survey & Benchmark',
+                                                     'Causal Abstractions for Reinforcement Learning'])
+        self.assertEqual(list(rows[0]), ['name', 'Description', 'URL', 'Category'])
+
+    def test_cross_lists_flag(self):
+        result, rows = self.run_script([('cs.AI', 'Artificial Intelligence')], '--cross-lists')
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2]['URL'], f'https://arxiv.org/pdf/{CROSS_ID}')
+
+    def test_failed_category_is_reported(self):
+        result, rows = self.run_script([('cs.AI', 'Artificial Intelligence'), ('cs.XX', 'Broken')])
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn('Error al descargar cs.XX', result.stderr)
+        self.assertEqual(len(rows), 2)
+
+    def test_exits_when_nothing_was_downloaded(self):
+        result, rows = self.run_script([('cs.XX', 'Broken')])
+        self.assertEqual(result.returncode, 1)
+        self.assertIn('HTTP 503', result.stderr)
+        self.assertIsNone(rows)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+validar_respuestas.py
+
+Checks the papers of an LLM answer against the batch of papers the prompt sent.
+Every returned object is repaired (alternative key names, lists or numbers where
+text was expected, a missing category taken from the batch, a mangled link
+replaced by the batch URL), validated and matched to its batch entry by arXiv ID
+or URL. The batch entries that got no valid paper back are assembled into a
+smaller follow-up prompt, so recovering them costs a fraction of resending the
+whole batch.
+
+Usage:
+    validator = BatchValidator(prompt)
+    paper = validator.check(answer_object)   # repaired paper, or None if rejected
+    validator.missing()                      # batch entries without a valid paper yet
+    validator.followup_prompt()              # prompt with only those entries, or None
+
+"""
+
+from arxiv_ids import canonical_arxiv_id
+from generar_prompts import assemble_prompt, parse_prompt_entries
+
+ANSWER_KEYS = ('titulo_español', 'categoria', 'resumen', 'puntos_clave', 'enlace')
+# A paper without these cannot be published
+REQUIRED_KEYS = ('titulo_español', 'resumen', 'enlace')
+# Key names models use instead of the requested ones
+KEY_ALIASES = {
+    'titulo_espanol': 'titulo_español',
+    'título_español': 'titulo_español',
+    'titulo': 'titulo_español',
+    'título': 'titulo_español',
+    'categoría': 'categoria',
+    'puntos clave': 'puntos_clave',
+    'puntosclave': 'puntos_clave',
+    'url': 'enlace',
+    'link': 'enlace',
+}
+CATEGORY_PREFIX = '📂'
+LINK_PREFIX = '🔗'
+
+def _as_text(value):
+    """Coerce an answer value to a single string ('' for null or nested objects)."""
+    if value is None or isinstance(value, dict):
+        return ''
+    if isinstance(value, (list, tuple)):
+        return '; '.join(t for t in (_as_text(v) for v in value) if t)
+    return str(value).strip()
+
+def repair_paper(paper):
+    """
+    Return (paper, repaired): the object with the answer keys as stripped strings,
+    alternative key names mapped to the requested ones, and whether anything had
+    to be changed.
+    """
+    fixed = {}
+    repaired = False
+    for key, value in paper.items():
+        name = key.strip().lower() if isinstance(key, str) else key
+        name = KEY_ALIASES.get(name, name)
+        if name != key or name in fixed:
+            repaired = True
+            if name in fixed and fixed[name]:
+                continue
+        text = _as_text(value)
+        if name in ANSWER_KEYS and text != value:
+            repaired = True
+        fixed[name] = text
+    return fixed, repaired
+
+def entry_key(url):
+    """Join key of a batch entry or answer link: the arXiv ID, else the bare URL."""
+    return canonical_arxiv_id(url) or url.strip().rstrip('/')
+
+class BatchValidator:
+    """
+    Tracks which papers of one prompt's batch came back valid. A prompt not built
+    by generar_prompts.py has no known batch: its papers are only repaired and
+    validated, and nothing is ever reported missing.
+    """
+
+    def __init__(self, prompt):
+        self.entries = parse_prompt_entries(prompt)
+        self._by_key = {entry_key(entry[3]): entry for entry in self.entries if entry[3]}
+        self._received = set()
+        self.accepted = 0
+        self.repaired = 0
+        self.invalid = 0
+        self.unmatched = 0
+
+    def check(self, paper):
+        """Repair and validate one answer object; return it ready to write, or None."""
+        if not isinstance(paper, dict):
+            self.invalid += 1
+            return None
+        paper, repaired = repair_paper(paper)
+        key = entry_key(paper.get('enlace', ''))
+        entry = self._by_key.get(key) if key else None
+        if entry is None and self._by_key:
+            # A link too mangled to match: recover the ID from any field that mentions it
+            for value in paper.values():
+                found = self._by_key.get(canonical_arxiv_id(value))
+                if found is not None:
+                    entry, key, repaired = found, entry_key(found[3]), True
+                    break
+        if entry is not None:
+            if entry[3] not in paper.get('enlace', ''):
+                paper['enlace'] = f"{LINK_PREFIX} {entry[3]}"
+                repaired = True
+            if not paper.get('categoria'):
+                paper['categoria'] = f"{CATEGORY_PREFIX} {entry[1]}"
+                repaired = True
+        if any(not paper.get(k) for k in REQUIRED_KEYS):
+            self.invalid += 1
+            return None
+        if entry is None:
+            self.unmatched += 1
+        elif key in self._received:
+            # The same paper twice (or again in a follow-up answer)
+            return None
+        else:
+            self._received.add(key)
+        self.accepted += 1
+        self.repaired += repaired
+        return paper
+
+    @property
+    def received(self):
+        """Number of batch entries that already have a valid paper."""
+        return len(self._received)
+
+    def missing(self):
+        """Batch entries (title, category, description, url) with no valid paper yet."""
+        return [entry for key, entry in self._by_key.items() if key not in self._received]
+
+    def followup_prompt(self):
+        """A prompt asking again for only the missing papers, or None if none is missing."""
+        missing = self.missing()
+        return assemble_prompt(missing) if missing else None